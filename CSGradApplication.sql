@@ -1,3 +1,8 @@
+-- Original MySQL design of the schema. The application's tables are
+-- defined by the SQLAlchemy models in app.py and differ from this file;
+-- print their DDL with `flask schema-sql --dialect postgresql` (or mysql,
+-- sqlite).
+
 CREATE DATABASE CSGradApplication;
 USE CSGradApplication;
 
@@ -0,0 +1,364 @@
+"""Offline-trained admission-probability model.
+
+A logistic regression over applicant features (normalised GPA, GRE,
+research/internship experience, recommendation strength) and the program's
+degree, plus a per-program intercept offset shrunk towards zero so thin
+programs fall back to the global model. Probabilities are Platt-calibrated on
+a held-out slice of the records. The reach/safe cutoffs are the terciles of
+the calibrated probabilities of the training records, so all three buckets
+stay populated whatever the dataset's base rate.
+
+Training reads ``application_records`` in chunks (``flask train-admission-model``)
+and writes a small binary file: a JSON header followed by float64 arrays. The
+web process memory-maps it, so inference is a dot product per program and
+never touches the database.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b"ADMODEL1"
+FEATURES = [
+    "gpa_norm",
+    "gre",
+    "gre_missing",
+    "research",
+    "internship",
+    "recommendation",
+    "phd",
+]
+RECOMMENDATION_LEVELS = {
+    "strongly recommend": 1.0,
+    "strong": 1.0,
+    "recommend": 0.5,
+    "moderate": 0.5,
+    "average": 0.0,
+}
+GRE_SCALE = 340.0
+COEF_PENALTY = 1.0
+PROGRAM_PENALTY = 5.0
+# Quantiles of the calibrated training probabilities used as reach/safe cutoffs.
+REACH_QUANTILE = 1 / 3
+SAFE_QUANTILE = 2 / 3
+# Cutoffs as multiples of the base rate, for model files saved without them.
+REACH_BASE_RATE_MULTIPLE = 0.75
+SAFE_BASE_RATE_MULTIPLE = 1.5
+
+
+def program_key(university: str, program: str, degree: Optional[str]) -> str:
+    return f"{university}::{program}::{degree or ''}"
+
+
+def is_phd(degree: Optional[str]) -> float:
+    return 1.0 if degree and "phd" in degree.lower().replace(".", "") else 0.0
+
+
+def applicant_features(
+    gpa: Optional[float],
+    gpa_scale: Optional[float],
+    gre_total: Optional[float],
+    research: Optional[bool],
+    internship: Optional[bool],
+    recommendation: Optional[str],
+    degree: Optional[str] = None,
+) -> Optional[List[float]]:
+    """Raw feature vector in ``FEATURES`` order, or ``None`` without a GPA."""
+    if not gpa or not gpa_scale:
+        return None
+    return [
+        gpa / gpa_scale,
+        (gre_total or 0) / GRE_SCALE,
+        0.0 if gre_total else 1.0,
+        1.0 if research else 0.0,
+        1.0 if internship else 0.0,
+        RECOMMENDATION_LEVELS.get((recommendation or "").strip().lower(), 0.0),
+        is_phd(degree),
+    ]
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35, 35)))
+
+
+def _log_loss(p: np.ndarray, y: np.ndarray) -> float:
+    p = np.clip(p, 1e-12, 1 - 1e-12)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def _fit(
+    X: np.ndarray, y: np.ndarray, groups: np.ndarray, n_groups: int, max_iter: int = 50
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Penalised logistic fit: Newton steps on the coefficients alternating
+    with one-dimensional Newton steps on the per-program offsets."""
+    n_features = X.shape[1]
+    coef = np.zeros(n_features)
+    offsets = np.zeros(n_groups)
+    penalty = np.full(n_features, COEF_PENALTY)
+    penalty[0] = 0.0  # intercept
+    for _ in range(max_iter):
+        p = _sigmoid(X @ coef + offsets[groups])
+        weights = p * (1 - p)
+        hessian = (X * weights[:, None]).T @ X + np.diag(penalty)
+        gradient = X.T @ (p - y) + penalty * coef
+        step = np.linalg.solve(hessian, gradient)
+        coef -= step
+
+        p = _sigmoid(X @ coef + offsets[groups])
+        group_gradient = np.bincount(groups, p - y, n_groups) + PROGRAM_PENALTY * offsets
+        group_hessian = np.bincount(groups, p * (1 - p), n_groups) + PROGRAM_PENALTY
+        group_step = group_gradient / group_hessian
+        offsets -= group_step
+        if max(np.abs(step).max(), np.abs(group_step).max(initial=0.0)) < 1e-6:
+            break
+    return coef, offsets
+
+
+def _fit_platt(logits: np.ndarray, y: np.ndarray, max_iter: int = 50) -> Tuple[float, float]:
+    """Fit ``sigmoid(a * logit + b)`` to held-out labels."""
+    X = np.column_stack([logits, np.ones_like(logits)])
+    params = np.array([1.0, 0.0])
+    for _ in range(max_iter):
+        p = _sigmoid(X @ params)
+        hessian = (X * (p * (1 - p))[:, None]).T @ X + np.eye(2) * 1e-6
+        step = np.linalg.solve(hessian, X.T @ (p - y))
+        params -= step
+        if np.abs(step).max() < 1e-8:
+            break
+    return float(params[0]), float(params[1])
+
+
+class TrainingSet:
+    """Feature matrix accumulated chunk by chunk from application rows."""
+
+    def __init__(self) -> None:
+        self._features: List[np.ndarray] = []
+        self._labels: List[np.ndarray] = []
+        self._keys: List[str] = []
+        self._ids: List[np.ndarray] = []
+        self.skipped = 0
+
+    def add_chunk(self, rows: Iterable[Sequence[Any]]) -> int:
+        """Add ``(id, university, program, degree, result, gpa, gpa_scale,
+        gre_total, research, internship, recommendation)`` rows."""
+        features, labels, ids = [], [], []
+        for (
+            record_id,
+            university,
+            program,
+            degree,
+            result,
+            gpa,
+            gpa_scale,
+            gre_total,
+            research,
+            internship,
+            recommendation,
+        ) in rows:
+            vector = applicant_features(
+                gpa, gpa_scale, gre_total, research, internship, recommendation, degree
+            )
+            if vector is None:
+                self.skipped += 1
+                continue
+            features.append(vector)
+            labels.append(1.0 if (result or "").lower() == "accept" else 0.0)
+            ids.append(record_id)
+            self._keys.append(program_key(university, program, degree))
+        if features:
+            self._features.append(np.asarray(features, dtype=np.float64))
+            self._labels.append(np.asarray(labels, dtype=np.float64))
+            self._ids.append(np.asarray(ids, dtype=np.int64))
+        return len(features)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], np.ndarray]:
+        programs = sorted(set(self._keys))
+        position = {key: index for index, key in enumerate(programs)}
+        groups = np.fromiter((position[key] for key in self._keys), np.int64, len(self._keys))
+        return (
+            np.concatenate(self._features),
+            np.concatenate(self._labels),
+            groups,
+            programs,
+            np.concatenate(self._ids),
+        )
+
+
+def train(data: TrainingSet, holdout_every: int = 5) -> Tuple["AdmissionModel", Dict[str, Any]]:
+    """Fit the model and its calibration; return it with holdout metrics.
+
+    Every ``holdout_every``-th record (by id) is held out to fit the Platt
+    calibration and measure it; the final coefficients are refit on all rows.
+    """
+    if not len(data):
+        raise ValueError("No application records with GPA details to train on.")
+    raw, y, groups, programs, ids = data.arrays()
+    means = raw.mean(axis=0)
+    scales = raw.std(axis=0)
+    scales[scales == 0] = 1.0
+    X = np.column_stack([np.ones(len(y)), (raw - means) / scales])
+
+    holdout = ids % holdout_every == 0 if holdout_every > 1 else np.zeros(len(y), bool)
+    platt = (1.0, 0.0)
+    metrics: Dict[str, Any] = {
+        "rows": int(len(y)),
+        "skipped": data.skipped,
+        "programs": len(programs),
+        "positive_rate": round(float(y.mean()), 4),
+    }
+    if holdout.any() and (~holdout).any() and 0 < y[holdout].sum() < holdout.sum():
+        coef, offsets = _fit(X[~holdout], y[~holdout], groups[~holdout], len(programs))
+        logits = X[holdout] @ coef + offsets[groups[holdout]]
+        platt = _fit_platt(logits, y[holdout])
+        raw_p = _sigmoid(logits)
+        calibrated = _sigmoid(platt[0] * logits + platt[1])
+        metrics.update(
+            {
+                "holdout_rows": int(holdout.sum()),
+                "holdout_log_loss": round(_log_loss(raw_p, y[holdout]), 4),
+                "holdout_log_loss_calibrated": round(_log_loss(calibrated, y[holdout]), 4),
+                "holdout_brier": round(float(np.mean((calibrated - y[holdout]) ** 2)), 4),
+                "baseline_log_loss": round(
+                    _log_loss(np.full(holdout.sum(), y[~holdout].mean()), y[holdout]), 4
+                ),
+            }
+        )
+
+    coef, offsets = _fit(X, y, groups, len(programs))
+    calibrated = _sigmoid(platt[0] * (X @ coef + offsets[groups]) + platt[1])
+    quantiles = np.quantile(calibrated, [REACH_QUANTILE, SAFE_QUANTILE])
+    cutoffs = [round(float(value), 4) for value in quantiles]
+    metrics.update({"reach_cutoff": cutoffs[0], "safe_cutoff": cutoffs[1]})
+    model = AdmissionModel(
+        header={
+            "features": FEATURES,
+            "programs": programs,
+            "platt": list(platt),
+            "cutoffs": cutoffs,
+            "trained_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "metrics": metrics,
+        },
+        means=means,
+        scales=scales,
+        coef=coef,
+        offsets=offsets,
+    )
+    return model, metrics
+
+
+class AdmissionModel:
+    """Coefficients plus per-program offsets, usually memory-mapped from disk."""
+
+    def __init__(
+        self,
+        header: Dict[str, Any],
+        means: np.ndarray,
+        scales: np.ndarray,
+        coef: np.ndarray,
+        offsets: np.ndarray,
+        path: Optional[str] = None,
+    ) -> None:
+        self.header = header
+        self.means = means
+        self.scales = scales
+        self.coef = coef
+        self.offsets = offsets
+        self.path = path
+        self.platt_a, self.platt_b = header["platt"]
+        self._positions = {key: index for index, key in enumerate(header["programs"])}
+
+    @property
+    def trained_at(self) -> str:
+        return self.header["trained_at"]
+
+    @property
+    def cutoffs(self) -> Tuple[float, float]:
+        """``(reach, safe)``: probabilities below reach are reaches, from safe up safe."""
+        if "cutoffs" in self.header:
+            reach, safe = self.header["cutoffs"]
+            return reach, safe
+        rate = self.header.get("metrics", {}).get("positive_rate", 0.5)
+        return rate * REACH_BASE_RATE_MULTIPLE, rate * SAFE_BASE_RATE_MULTIPLE
+
+    def describe(self) -> Dict[str, Any]:
+        return {"trained_at": self.trained_at, **self.header.get("metrics", {})}
+
+    def align(self, keys: Sequence[str], degrees: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-program offsets and degree flags for ``keys``; unknown programs get 0."""
+        offsets = np.array(
+            [self.offsets[self._positions[key]] if key in self._positions else 0.0 for key in keys],
+            dtype=np.float64,
+        )
+        phd = np.array([is_phd(degree) for degree in degrees], dtype=np.float64)
+        return offsets, phd
+
+    def predict(
+        self, features: Sequence[Sequence[float]], offsets: np.ndarray, phd: np.ndarray
+    ) -> np.ndarray:
+        """Calibrated admit probabilities, one row per applicant, one column per
+        aligned program.
+
+        ``features`` holds ``applicant_features`` vectors; their degree slot is
+        replaced by each program's own degree.
+        """
+        z = (np.atleast_2d(np.asarray(features, dtype=np.float64)) - self.means) / self.scales
+        phd_index = FEATURES.index("phd")
+        applicant = self.coef[0] + np.delete(z, phd_index, axis=1) @ np.delete(
+            self.coef[1:], phd_index
+        )
+        phd_term = self.coef[1 + phd_index] * (phd - self.means[phd_index]) / self.scales[phd_index]
+        logits = applicant[:, None] + (phd_term + offsets)
+        return _sigmoid(self.platt_a * logits + self.platt_b)
+
+    def save(self, path: str) -> None:
+        """Write atomically so workers holding the old map keep a valid file."""
+        header = json.dumps(self.header, separators=(",", ":")).encode("utf-8")
+        header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(MAGIC)
+            handle.write(struct.pack("<I", len(header)))
+            handle.write(header)
+            for array in (self.means, self.scales, self.coef, self.offsets):
+                handle.write(np.ascontiguousarray(array, dtype="<f8").tobytes())
+        os.replace(tmp_path, path)
+
+
+def load_model(path: str) -> Optional[AdmissionModel]:
+    """Memory-map a saved model; ``None`` when the file is missing or invalid."""
+    try:
+        with open(path, "rb") as handle:
+            if handle.read(len(MAGIC)) != MAGIC:
+                return None
+            (header_length,) = struct.unpack("<I", handle.read(4))
+            header = json.loads(handle.read(header_length))
+    except (OSError, ValueError, struct.error):
+        return None
+    n_features = len(header["features"])
+    if header["features"] != FEATURES:
+        return None
+    sizes = [n_features, n_features, n_features + 1, len(header["programs"])]
+    try:
+        values = np.memmap(
+            path, dtype="<f8", mode="r", offset=len(MAGIC) + 4 + header_length, shape=(sum(sizes),)
+        )
+    except (OSError, ValueError) as exc:
+        # Typically a file truncated by an interrupted copy.
+        logger.warning("Ignoring unreadable admission model %s: %s", path, exc)
+        return None
+    bounds = np.cumsum([0] + sizes)
+    means, scales, coef, offsets = (values[start:end] for start, end in zip(bounds, bounds[1:]))
+    return AdmissionModel(header, means, scales, coef, offsets, path=path)
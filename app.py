@@ -1,17 +1,80 @@
 from __future__ import annotations
 
-from datetime import datetime
+import base64
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+import time
+from datetime import datetime, timezone
 from functools import wraps
-from typing import Any, Dict, List, Optional, Tuple
-
-from flask import Flask, jsonify, redirect, render_template, request, session, url_for
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import click
+from flask import (
+    Flask,
+    current_app,
+    g,
+    has_app_context,
+    has_request_context,
+    jsonify,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    session,
+    stream_with_context,
+    url_for,
+)
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import validates
+from sqlalchemy.schema import CreateIndex, CreateTable
 from werkzeug.security import check_password_hash, generate_password_hash
 
+import admission_model
+import importer
+import migrations
+import metrics
+import neighbors
+import postgres_backend
+import query_stats
+import search_index
+import sqlite_tuning
+from cache import AnalyticsCache, build_cache
 from config import get_config
+from json_provider import FastJSONProvider
+from match_engine import ProgramMatrix
+
+
+# Bind key of the optional read-only database (READ_REPLICA_URL).
+REPLICA_BIND = "replica"
+
+
+class RoutingSession(FlaskSession):
+    """Session that sends the reads of ``@read_replica`` handlers to the replica.
 
+    Flushes, and every request not marked ``read_replica``, use the primary,
+    as does everything when no replica is configured.
+    """
 
-db = SQLAlchemy()
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and has_request_context()
+            and g.get("read_replica")
+        ):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 class TimestampMixin:
@@ -89,7 +152,9 @@ class Education(TimestampMixin, db.Model):
     __tablename__ = "educations"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), nullable=False, index=True
+    )
     institution = db.Column(db.String(120), nullable=False)
     degree = db.Column(db.String(80))
     field_of_study = db.Column(db.String(120))
@@ -119,7 +184,9 @@ class TestScore(TimestampMixin, db.Model):
     __tablename__ = "test_scores"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), nullable=False, index=True
+    )
     test_type = db.Column(db.String(32), nullable=False)
     total_score = db.Column(db.Float)
     section = db.Column(db.String(32))
@@ -143,7 +210,9 @@ class Experience(TimestampMixin, db.Model):
     __tablename__ = "experiences"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), nullable=False, index=True
+    )
     category = db.Column(db.String(32), nullable=False)  # research, internship, work
     organization = db.Column(db.String(120), nullable=False)
     role_title = db.Column(db.String(120))
@@ -171,7 +240,9 @@ class Publication(TimestampMixin, db.Model):
     __tablename__ = "publications"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), nullable=False, index=True
+    )
     title = db.Column(db.String(200), nullable=False)
     venue = db.Column(db.String(120))
     year = db.Column(db.Integer)
@@ -195,7 +266,9 @@ class RecommendationLetter(TimestampMixin, db.Model):
     __tablename__ = "recommendation_letters"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), nullable=False, index=True
+    )
     recommender_name = db.Column(db.String(120))
     relationship = db.Column(db.String(32), nullable=False)  # Research Advisor, Course Instructor, Employer
     rating = db.Column(db.String(32))  # Strongly Recommend, Recommend
@@ -217,9 +290,26 @@ class RecommendationLetter(TimestampMixin, db.Model):
 
 class ApplicationRecord(TimestampMixin, db.Model):
     __tablename__ = "application_records"
+    __table_args__ = (
+        db.Index("ix_application_records_university_id", "university", "id"),
+        db.Index("ix_application_records_program_id", "program", "id"),
+        db.Index("ix_application_records_country", "country"),
+        db.Index("ix_application_records_degree", "degree"),
+        db.Index("ix_application_records_term", "term"),
+        db.Index("ix_application_records_result", "result"),
+        db.Index(
+            "ix_application_records_university_program_degree",
+            "university",
+            "program",
+            "degree",
+        ),
+        db.Index("ix_application_records_import_key", "import_key", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), nullable=False, index=True
+    )
     university = db.Column(db.String(120), nullable=False)
     program = db.Column(db.String(120), nullable=False)
     country = db.Column(db.String(80))
@@ -234,9 +324,32 @@ class ApplicationRecord(TimestampMixin, db.Model):
     research_experience = db.Column(db.Boolean, default=False)
     internship_experience = db.Column(db.Boolean, default=False)
     recommendation_strength = db.Column(db.String(32))
+    # Fingerprint of bulk-imported rows (see importer.py); NULL for user entries.
+    import_key = db.Column(db.String(40))
 
     user = db.relationship("User", back_populates="applications")
 
+    @validates("gpa", "gpa_scale", "gre_total")
+    def _coerce_number(self, key: str, value: Any) -> Any:
+        """Accept numeric strings from JSON clients; the summary hooks do arithmetic."""
+        if isinstance(value, str):
+            value = value.strip() or None
+        if value is None:
+            return None
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{key} must be a number") from None
+        if not math.isfinite(number):
+            raise ValueError(f"{key} must be a number")
+        if key == "gre_total":
+            if not number.is_integer():
+                raise ValueError("gre_total must be an integer")
+            return int(number)
+        return number
+
     def to_public_dict(self) -> Dict[str, Any]:
         return {
             "id": self.id,
@@ -262,39 +375,928 @@ class ApplicationRecord(TimestampMixin, db.Model):
         return data
 
 
+# Columns exposed by ``to_public_dict``, in output order.
+PUBLIC_APPLICATION_FIELDS = [
+    "id",
+    "university",
+    "program",
+    "country",
+    "degree",
+    "term",
+    "result",
+    "funding",
+    "gpa",
+    "gpa_scale",
+    "gre_total",
+    "research_experience",
+    "internship_experience",
+    "recommendation_strength",
+    "created_at",
+]
+
+
+db.Index(
+    "ix_application_records_created_at_desc",
+    ApplicationRecord.created_at.desc(),
+    ApplicationRecord.id.desc(),
+)
+
+
+# ---------------------------------------------------------------------------
+# Analytics Summaries
+# ---------------------------------------------------------------------------
+#
+# Pre-aggregated counters kept in step with ``application_records`` by the
+# mapper events below, so the analytics endpoints read a handful of summary
+# rows instead of scanning every application.
+
+
+class UniversitySummary(db.Model):
+    __tablename__ = "university_summaries"
+
+    university = db.Column(db.String(120), primary_key=True)
+    country = db.Column(db.String(80))
+    total_applications = db.Column(db.Integer, nullable=False, default=0)
+    admits = db.Column(db.Integer, nullable=False, default=0)
+    rejects = db.Column(db.Integer, nullable=False, default=0)
+    waitlists = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ProgramSummary(db.Model):
+    __tablename__ = "program_summaries"
+
+    program = db.Column(db.String(120), primary_key=True)
+    total_applications = db.Column(db.Integer, nullable=False, default=0)
+    admits = db.Column(db.Integer, nullable=False, default=0)
+
+
+class CountrySummary(db.Model):
+    __tablename__ = "country_summaries"
+
+    country = db.Column(db.String(80), primary_key=True)
+    university = db.Column(db.String(120), primary_key=True)
+    applications = db.Column(db.Integer, nullable=False, default=0)
+    admits = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ProgramGroupSummary(db.Model):
+    __tablename__ = "program_group_summaries"
+
+    university = db.Column(db.String(120), primary_key=True)
+    program = db.Column(db.String(120), primary_key=True)
+    degree_key = db.Column(db.String(32), primary_key=True)  # degree or ""
+    degree = db.Column(db.String(32))
+    total = db.Column(db.Integer, nullable=False, default=0)
+    admitted = db.Column(db.Integer, nullable=False, default=0)
+    admitted_gpa_sum = db.Column(db.Float, nullable=False, default=0.0)
+    admitted_gpa_count = db.Column(db.Integer, nullable=False, default=0)
+    admitted_gre_sum = db.Column(db.Integer, nullable=False, default=0)
+    admitted_gre_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+SUMMARY_SOURCE_FIELDS = [
+    "university",
+    "program",
+    "country",
+    "degree",
+    "result",
+    "gpa",
+    "gpa_scale",
+    "gre_total",
+]
+
+
+def _summary_rows(values: Dict[str, Any]) -> List[Tuple[Any, Dict[str, Any], Dict[str, Any]]]:
+    """Describe one record's contribution as ``(model, key, counters)`` triples."""
+    result = (values.get("result") or "").lower()
+    admitted = int(result == "accept")
+    gpa, gpa_scale, gre = values.get("gpa"), values.get("gpa_scale"), values.get("gre_total")
+    has_gpa = bool(admitted and gpa and gpa_scale)
+    has_gre = bool(admitted and gre)
+    return [
+        (
+            UniversitySummary,
+            {"university": values["university"]},
+            {
+                "total_applications": 1,
+                "admits": admitted,
+                "rejects": int(result == "reject"),
+                "waitlists": int(result == "waitlist"),
+            },
+        ),
+        (
+            ProgramSummary,
+            {"program": values["program"]},
+            {"total_applications": 1, "admits": admitted},
+        ),
+        (
+            CountrySummary,
+            {"country": values.get("country") or "Unknown", "university": values["university"]},
+            {"applications": 1, "admits": admitted},
+        ),
+        (
+            ProgramGroupSummary,
+            {
+                "university": values["university"],
+                "program": values["program"],
+                "degree_key": values.get("degree") or "",
+            },
+            {
+                "total": 1,
+                "admitted": admitted,
+                "admitted_gpa_sum": gpa / gpa_scale if has_gpa else 0.0,
+                "admitted_gpa_count": int(has_gpa),
+                "admitted_gre_sum": gre if has_gre else 0,
+                "admitted_gre_count": int(has_gre),
+            },
+        ),
+    ]
+
+
+def _summary_attributes(model, values: Dict[str, Any]) -> Dict[str, Any]:
+    if model is UniversitySummary:
+        return {"country": values.get("country") or None}
+    if model is ProgramGroupSummary:
+        return {"degree": values.get("degree")}
+    return {}
+
+
+def _merge_summary_attribute(model, name: str, current, incoming):
+    """How an upsert combines a stored descriptive column with a new record's."""
+    if model is UniversitySummary:
+        # Same as the rebuild: the smallest non-empty country seen.
+        current_blank = db.func.coalesce(current, "") == ""
+        incoming_blank = db.func.coalesce(incoming, "") == ""
+        return db.case(
+            (current_blank, incoming),
+            (incoming_blank, current),
+            (incoming < current, incoming),
+            else_=current,
+        )
+    return db.func.coalesce(db.func.nullif(current, ""), incoming)
+
+
+def _upsert_summary(connection, model, key: Dict[str, Any], counters: Dict[str, Any], values):
+    """Insert a summary row or add ``counters`` to the existing one, atomically."""
+    table = model.__table__
+    dialect = SCHEMA_DIALECTS[connection.dialect.name]
+    statement = dialect.insert(table).values(
+        **key, **counters, **_summary_attributes(model, values)
+    )
+    incoming = statement.inserted if connection.dialect.name == "mysql" else statement.excluded
+    changes = {name: table.c[name] + incoming[name] for name in counters}
+    for name in _summary_attributes(model, values):
+        changes[name] = _merge_summary_attribute(model, name, table.c[name], incoming[name])
+    if connection.dialect.name == "mysql":
+        statement = statement.on_duplicate_key_update(**changes)
+    else:
+        statement = statement.on_conflict_do_update(index_elements=list(key), set_=changes)
+    connection.execute(statement)
+
+
+def apply_summary_delta(
+    connection, values: Dict[str, Any], sign: int, record_id: Optional[int] = None
+) -> None:
+    """Add (``sign=1``) or remove (``sign=-1``) one record from the summaries.
+
+    Runs on the flushing connection so the counters commit or roll back with
+    the ``application_records`` change that produced them. Additions are a
+    single ``INSERT ... ON CONFLICT DO UPDATE`` so concurrent writers cannot
+    both insert the same row. A removal passes the record's ``record_id`` so
+    a university whose country came from that record picks it again from the
+    remaining records.
+    """
+    for model, key, counters in _summary_rows(values):
+        if sign > 0:
+            _upsert_summary(connection, model, key, counters, values)
+            continue
+        table = model.__table__
+        where = db.and_(*(table.c[name] == value for name, value in key.items()))
+        updates = {name: table.c[name] - delta for name, delta in counters.items()}
+        connection.execute(table.update().where(where).values(**updates))
+        first_counter = table.c[next(iter(counters))]
+        connection.execute(table.delete().where(db.and_(where, first_counter <= 0)))
+        if model is UniversitySummary and values.get("country"):
+            records = ApplicationRecord.__table__
+            remaining = db.select(db.func.min(db.func.nullif(records.c.country, ""))).where(
+                records.c.university == values["university"], records.c.id != record_id
+            )
+            connection.execute(
+                table.update()
+                .where(where, table.c.country == values["country"])
+                .values(country=remaining.scalar_subquery())
+            )
+
+
+def _stored_summary_values(connection, record_id: int) -> Optional[Dict[str, Any]]:
+    table = ApplicationRecord.__table__
+    row = connection.execute(
+        db.select(*(table.c[name] for name in SUMMARY_SOURCE_FIELDS)).where(
+            table.c.id == record_id
+        )
+    ).first()
+    return dict(row._mapping) if row is not None else None
+
+
+@db.event.listens_for(ApplicationRecord, "after_insert")
+def _summaries_after_insert(mapper, connection, target) -> None:
+    state = db.inspect(target).dict
+    apply_summary_delta(connection, {name: state.get(name) for name in SUMMARY_SOURCE_FIELDS}, 1)
+
+
+@db.event.listens_for(ApplicationRecord, "before_update")
+def _summaries_before_update(mapper, connection, target) -> None:
+    state = db.inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in SUMMARY_SOURCE_FIELDS):
+        return
+    previous = _stored_summary_values(connection, target.id)
+    if previous is not None:
+        apply_summary_delta(connection, previous, -1, target.id)
+    apply_summary_delta(
+        connection, {name: getattr(target, name) for name in SUMMARY_SOURCE_FIELDS}, 1
+    )
+
+
+@db.event.listens_for(ApplicationRecord, "before_delete")
+def _summaries_before_delete(mapper, connection, target) -> None:
+    previous = _stored_summary_values(connection, target.id)
+    if previous is not None:
+        apply_summary_delta(connection, previous, -1, target.id)
+
+
+@db.event.listens_for(db.session, "after_flush")
+def _track_application_writes(session, flush_context) -> None:
+    changed = (*session.new, *session.dirty, *session.deleted)
+    if any(isinstance(obj, ApplicationRecord) for obj in changed):
+        session.info["applications_changed"] = True
+        if has_app_context() and "neighbor_index" in current_app.extensions:
+            _track_neighbor_changes(session)
+
+
+def _track_neighbor_changes(session) -> None:
+    changes = session.info.setdefault("neighbor_changes", {})
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, ApplicationRecord):
+            changes[obj.id] = (obj.user_id, neighbors.record_features(*neighbor_values(obj)))
+    for obj in session.deleted:
+        if isinstance(obj, ApplicationRecord):
+            changes[obj.id] = None
+
+
+@db.event.listens_for(db.session, "after_commit")
+def _bump_version_after_commit(session) -> None:
+    if session.info.pop("applications_changed", False):
+        bump_dataset_version()
+    changes = session.info.pop("neighbor_changes", None)
+    if changes and has_app_context():
+        state = current_app.extensions.get("neighbor_index")
+        if state:
+            state["index"].apply(changes)
+
+
+@db.event.listens_for(db.session, "after_rollback")
+def _discard_pending_writes(session) -> None:
+    session.info.pop("applications_changed", None)
+    session.info.pop("neighbor_changes", None)
+
+
 # ---------------------------------------------------------------------------
 # Application Factory & Utilities
 # ---------------------------------------------------------------------------
 
+# Dialect modules by name, for the upserts that differ between databases and
+# as `flask schema-sql` targets (compiling DDL needs no database driver).
+SCHEMA_DIALECTS = {"mysql": mysql, "postgresql": postgresql, "sqlite": sqlite}
+
 
-def create_app(config_name: Optional[str] = None) -> Flask:
+def create_app(
+    config_name: Optional[str] = None, config_overrides: Optional[Dict[str, Any]] = None
+) -> Flask:
     app = Flask(__name__, template_folder="templates", static_folder="static")
     app.config.from_object(get_config(config_name))
+    app.config.update(config_overrides or {})
+    if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            **postgres_backend.pool_options(app.config),
+            **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+        }
+    replica_url = app.config["READ_REPLICA_URL"]
+    if replica_url:
+        # Binds do not inherit SQLALCHEMY_ENGINE_OPTIONS.
+        replica = {"url": replica_url}
+        if not replica_url.startswith("sqlite"):
+            replica.update(postgres_backend.pool_options(app.config))
+        app.config["SQLALCHEMY_BINDS"] = {
+            **app.config.get("SQLALCHEMY_BINDS", {}),
+            REPLICA_BIND: replica,
+        }
+    app.json = FastJSONProvider(app)
     db.init_app(app)
+    app.extensions["analytics_cache"] = build_cache(
+        app.config["ANALYTICS_CACHE_BACKEND"],
+        app.config.get("ANALYTICS_CACHE_DIR"),
+        app.config["ANALYTICS_CACHE_MAX_ENTRIES"],
+        app.config["ANALYTICS_CACHE_TTL"],
+    )
+    app.extensions["metrics"] = metrics.build_metrics(
+        app.config["METRICS_ENABLED"], app.config.get("METRICS_DIR")
+    )
 
     with app.app_context():
-        db.create_all()
+        app.extensions["sqlite_write_lock"] = sqlite_tuning.configure_sqlite(
+            db.engine,
+            sqlite_tuning.pragmas_from_config(app.config),
+            app.config["SQLITE_SERIALIZE_WRITES"],
+        )
+        if REPLICA_BIND in db.engines:
+            # A read-only connection cannot switch the journal mode.
+            pragmas = sqlite_tuning.pragmas_from_config(app.config)
+            pragmas.pop("journal_mode", None)
+            sqlite_tuning.configure_sqlite(db.engines[REPLICA_BIND], pragmas)
+        db.create_all(bind_key=None)
+        migrations.upgrade(db.engine, db.metadata)
+        app.extensions["search_backend"] = search_index.ensure_search_index(db.engine)
+        ensure_analytics_summaries()
+        get_admission_model()
+        for engine in db.engines.values():
+            query_stats.instrument_engine(engine, app.config["SLOW_QUERY_MS"], app.logger)
 
     register_routes(app)
+    register_commands(app)
     return app
 
 
+def register_commands(app: Flask) -> None:
+    @app.cli.command("rebuild-summaries")
+    def rebuild_summaries_command():
+        """Recompute the analytics summary tables from application_records."""
+        for table, rows in rebuild_analytics_summaries().items():
+            print(f"{table}: {rows} rows")
+
+    @app.cli.command("db-upgrade")
+    def db_upgrade_command():
+        """Apply pending schema migrations."""
+        applied = migrations.upgrade(db.engine, db.metadata)
+        print(f"Applied migrations: {applied or 'none'}")
+        print(f"Schema version: {migrations.current_version(db.engine)}")
+
+    @app.cli.command("schema-sql")
+    @click.option(
+        "--dialect",
+        type=click.Choice(sorted(SCHEMA_DIALECTS)),
+        default="postgresql",
+        show_default=True,
+    )
+    def schema_sql_command(dialect: str):
+        """Print the CREATE TABLE / CREATE INDEX statements of the models."""
+        target = SCHEMA_DIALECTS[dialect].dialect()
+        tables = [*db.metadata.sorted_tables, migrations.schema_migrations]
+        for table in tables:
+            ddl = str(CreateTable(table).compile(dialect=target)).strip()
+            print("\n".join(line.rstrip() for line in ddl.splitlines()) + ";\n")
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                print(f"{CreateIndex(index).compile(dialect=target)};")
+            if table.indexes:
+                print()
+
+    @app.cli.command("train-admission-model")
+    @click.option("--chunk-size", default=5000, show_default=True, help="Rows read per batch.")
+    @click.option("--output", default=None, help="Model file (defaults to ADMISSION_MODEL_PATH).")
+    def train_admission_model_command(chunk_size: int, output: Optional[str]):
+        """Fit the admission-probability model used by match suggestions."""
+        path = output or current_app.config["ADMISSION_MODEL_PATH"]
+        scores = train_admission_model(path, chunk_size)
+        for name, value in scores.items():
+            print(f"{name}: {value}")
+        print(f"Wrote {path}")
+
+    @app.cli.command("import-applications")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option(
+        "--format",
+        "fmt",
+        type=click.Choice(importer.FORMATS),
+        default=None,
+        help="Input format (defaults to the file extension).",
+    )
+    @click.option("--chunk-size", default=5000, show_default=True, help="Rows per transaction.")
+    @click.option(
+        "--user-email",
+        default=None,
+        help="Account that owns imported rows (defaults to IMPORT_USER_EMAIL).",
+    )
+    def import_applications_command(
+        path: str, fmt: Optional[str], chunk_size: int, user_email: Optional[str]
+    ):
+        """Bulk-load historical application records from CSV or NDJSON."""
+
+        def progress(stats: importer.ImportStats) -> None:
+            print(
+                f"{stats.read} read, {stats.inserted} inserted, {stats.duplicates} duplicate, "
+                f"{stats.invalid} invalid ({stats.read / max(stats.elapsed, 1e-9):.0f} rows/s)"
+            )
+
+        with open(path, encoding="utf-8", newline="") as stream:
+            stats = import_application_file(
+                stream, importer.detect_format(path, fmt), chunk_size, user_email, progress
+            )
+        for error in stats.errors:
+            print(f"line {error['line']}: {error['error']}")
+
+
+def get_analytics_cache() -> Optional[AnalyticsCache]:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("analytics_cache")
+
+
+def get_metrics() -> Optional[metrics.AppMetrics]:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("metrics")
+
+
+def get_admission_model() -> Optional[admission_model.AdmissionModel]:
+    """Return the memory-mapped admission model, reloading it after retraining."""
+    path = current_app.config.get("ADMISSION_MODEL_PATH")
+    try:
+        mtime = os.stat(path).st_mtime_ns if path else None
+    except OSError:
+        mtime = None
+    loaded = current_app.extensions.get("admission_model")
+    if loaded is None or loaded[0] != mtime:
+        loaded = (mtime, admission_model.load_model(path) if mtime else None)
+        current_app.extensions["admission_model"] = loaded
+    return loaded[1]
+
+
+def probability_cutoffs(model: admission_model.AdmissionModel) -> Tuple[float, float]:
+    """``(reach, safe)`` admit probabilities: the model's, unless configured."""
+    reach, safe = model.cutoffs
+    configured_reach = current_app.config["MATCH_REACH_PROBABILITY"]
+    configured_safe = current_app.config["MATCH_SAFE_PROBABILITY"]
+    return (
+        float(configured_reach) if configured_reach not in (None, "") else reach,
+        float(configured_safe) if configured_safe not in (None, "") else safe,
+    )
+
+
+def iter_training_chunks(chunk_size: int):
+    """Yield application rows for model training, ``chunk_size`` at a time."""
+    record = ApplicationRecord
+    statement = (
+        db.select(
+            record.id,
+            record.university,
+            record.program,
+            record.degree,
+            record.result,
+            record.gpa,
+            record.gpa_scale,
+            record.gre_total,
+            record.research_experience,
+            record.internship_experience,
+            record.recommendation_strength,
+        )
+        .order_by(record.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    yield from db.session.execute(statement).partitions()
+
+
+def train_admission_model(path: str, chunk_size: int = 5000) -> Dict[str, Any]:
+    """Train on every application record, save to ``path`` and return metrics."""
+    data = admission_model.TrainingSet()
+    for chunk in iter_training_chunks(chunk_size):
+        data.add_chunk(chunk)
+    model, metrics = admission_model.train(data)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    model.save(path)
+    return metrics
+
+
+NEIGHBOR_SOURCE_FIELDS = [
+    "gpa",
+    "gpa_scale",
+    "gre_total",
+    "research_experience",
+    "internship_experience",
+    "recommendation_strength",
+]
+
+
+def neighbor_values(record: Any) -> List[Any]:
+    return [getattr(record, name) for name in NEIGHBOR_SOURCE_FIELDS]
+
+
+def get_neighbor_index() -> neighbors.NeighborIndex:
+    """Return this process's nearest-neighbour index.
+
+    Built from every record on first use and rebuilt after
+    ``NEIGHBOR_INDEX_MAX_AGE`` seconds. Local writes are applied on commit;
+    records inserted by other processes are picked up with a primary-key
+    range query on each call.
+    """
+    columns = [ApplicationRecord.id, ApplicationRecord.user_id] + [
+        getattr(ApplicationRecord, name) for name in NEIGHBOR_SOURCE_FIELDS
+    ]
+    state = current_app.extensions.get("neighbor_index")
+    now = time.monotonic()
+    if state is None or now - state["built_at"] > current_app.config["NEIGHBOR_INDEX_MAX_AGE"]:
+        rows = db.session.execute(db.select(*columns)).all()
+        state = {"index": neighbors.NeighborIndex(neighbors.build_rows(rows)), "built_at": now}
+        current_app.extensions["neighbor_index"] = state
+        return state["index"]
+
+    index = state["index"]
+    rows = db.session.execute(db.select(*columns).where(ApplicationRecord.id > index.max_id)).all()
+    if rows:
+        index.apply(
+            {
+                record_id: (user_id, features)
+                for record_id, user_id, features in neighbors.build_rows(rows)
+            }
+        )
+    return index
+
+
+MATCH_BATCH_MAX_PROFILES = 1000
+
+
+def batch_profile_features(profile: Any) -> Optional[List[float]]:
+    """Validate one hypothetical profile from ``/api/match/batch``."""
+    if not isinstance(profile, dict):
+        return None
+    try:
+        gpa = float(profile["gpa"])
+        gpa_scale = float(profile.get("gpa_scale") or 4.0)
+        gre_total = float(profile["gre_total"]) if profile.get("gre_total") else None
+    except (KeyError, TypeError, ValueError):
+        return None
+    numbers = (gpa, gpa_scale) if gre_total is None else (gpa, gpa_scale, gre_total)
+    if not all(math.isfinite(number) for number in numbers) or gpa <= 0 or gpa_scale <= 0:
+        return None
+    return admission_model.applicant_features(
+        gpa,
+        gpa_scale,
+        gre_total,
+        bool(profile.get("research_experience")),
+        bool(profile.get("internship_experience")),
+        profile.get("recommendation_strength"),
+    )
+
+
+def bump_dataset_version() -> None:
+    """Invalidate cached analytics after application data changes."""
+    cache = get_analytics_cache()
+    if cache is not None:
+        cache.bump()
+
+
+def cached_analytics(fn):
+    """Serve ``fn`` from the analytics cache for the current dataset version."""
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        cache = get_analytics_cache()
+        app_metrics = get_metrics()
+        if cache is None and app_metrics is None:
+            return fn(*args, **kwargs)
+        computed = False
+
+        def compute():
+            nonlocal computed
+            computed = True
+            started = time.perf_counter()
+            result = fn(*args, **kwargs)
+            if app_metrics is not None:
+                app_metrics.compute_time.observe(
+                    time.perf_counter() - started, function=fn.__name__
+                )
+            return result
+
+        if cache is None:
+            return compute()
+        result = cache.get_or_compute(fn.__name__, compute, args, sorted(kwargs.items()))
+        if app_metrics is not None:
+            app_metrics.cache_lookups.inc(
+                function=fn.__name__, result="miss" if computed else "hit"
+            )
+        return result
+
+    return wrapper
+
+
+def conditional_get(fn):
+    """Answer repeat public reads with ``304 Not Modified``.
+
+    With a cache shared by all workers (the file backend) the strong ETag
+    combines the dataset version with the request path and normalized query
+    args, so it is known before the handler runs and a matching
+    ``If-None-Match`` skips serialization entirely. A per-process version
+    (the memory backend) never sees writes made by other workers or CLI
+    commands, so without a shared cache the ETag falls back to a body hash
+    and no ``Last-Modified`` is sent: there is no write time every worker
+    agrees on.
+    """
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        max_age = current_app.config["PUBLIC_CACHE_MAX_AGE"]
+        cache = get_analytics_cache()
+        if cache is None or not cache.shared:
+            response = make_response(fn(*args, **kwargs))
+            if response.is_streamed:
+                return response
+            response.add_etag()
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+            return response.make_conditional(request)
+
+        normalized_args = sorted(request.args.items(multi=True))
+        tag_source = f"{cache.epoch}:{cache.version}:{request.path}:{normalized_args!r}"
+        etag = hashlib.sha1(tag_source.encode("utf-8")).hexdigest()
+        # HTTP dates have whole-second resolution: round up, and only send the
+        # date once that second is over, so a later write in the same second
+        # can never fall at or before a date a client already holds.
+        last_modified = math.ceil(cache.last_modified)
+        settled = last_modified <= time.time()
+
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains(etag)
+        else:
+            since = request.if_modified_since
+            not_modified = (
+                settled and since is not None and last_modified <= since.timestamp()
+            )
+
+        if not_modified:
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        if settled:
+            response.last_modified = datetime.fromtimestamp(last_modified, tz=timezone.utc)
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        return response
+
+    return wrapper
+
+
+def read_replica(fn):
+    """Run the handler's queries on the read-only bind when one is configured.
+
+    For handlers that never write; replica lag means a row committed a moment
+    ago may not be visible yet. Within ``READ_REPLICA_MAX_LAG`` seconds of the
+    last dataset write the primary is read instead: analytics computed then
+    are cached, and ETags issued, under the new dataset version, so they must
+    not come from a replica that has not caught up.
+    """
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        cache = get_analytics_cache()
+        max_lag = current_app.config["READ_REPLICA_MAX_LAG"]
+        g.read_replica = cache is None or time.time() - cache.last_modified >= max_lag
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
 def login_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        user = get_current_user()
+        user = get_current_identity()
+        if not user:
+            return jsonify({"error": "Authentication required"}), 401
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def admin_required(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        user = get_current_identity()
         if not user:
             return jsonify({"error": "Authentication required"}), 401
+        if user.email not in current_app.config["ADMIN_EMAILS"]:
+            return jsonify({"error": "Forbidden"}), 403
         return fn(*args, **kwargs)
 
     return wrapper
 
 
+class SessionUser(NamedTuple):
+    """The parts of ``User`` kept in the signed session cookie."""
+
+    id: int
+    email: str
+
+
+def log_in(user: User) -> None:
+    session["user_id"] = user.id
+    if current_app.config["SESSION_USER_SNAPSHOT"]:
+        session["user"] = {"id": user.id, "email": user.email}
+    g.current_user = user
+    g.current_identity = SessionUser(user.id, user.email)
+
+
+def log_out() -> None:
+    session.pop("user_id", None)
+    session.pop("user", None)
+    g.pop("current_user", None)
+    g.pop("current_identity", None)
+
+
 def get_current_user() -> Optional[User]:
-    user_id = session.get("user_id")
-    if not user_id:
+    """Return the logged-in ``User`` row, loading it at most once per request."""
+    if "current_user" not in g:
+        user_id = session.get("user_id")
+        g.current_user = db.session.get(User, user_id) if user_id else None
+    return g.current_user
+
+
+def get_current_identity() -> Optional[SessionUser]:
+    """Return the logged-in user's id and email.
+
+    Read from the signed session snapshot when there is one, so handlers that
+    only need the id never load the ``User`` row.
+    """
+    if "current_identity" not in g:
+        snapshot = session.get("user")
+        if snapshot and snapshot.get("id") == session.get("user_id"):
+            g.current_identity = SessionUser(snapshot["id"], snapshot["email"])
+        else:
+            user = get_current_user()
+            g.current_identity = SessionUser(user.id, user.email) if user else None
+    return g.current_identity
+
+
+def apply_search_filters(query, filters: Dict[str, Optional[str]], text_query: Optional[str]):
+    """Filter ``query`` through the full-text index when the database has one.
+
+    Returns ``(query, relevance)`` where ``relevance`` sorts best matches
+    first in ascending order, or is ``None`` when no text search applied.
+    With FTS5 the text fields match word prefixes ("Stan" finds "Stanford");
+    without an index they fall back to substring ``ILIKE`` filters.
+    """
+    backend = current_app.extensions.get("search_backend")
+    remaining = dict(filters)
+    relevance = None
+
+    if backend == "fts5":
+        text_filters = {
+            field: remaining.pop(field, None) for field in search_index.FIELD_COLUMNS
+        }
+        match = search_index.fts5_match_expression(text_filters, text_query)
+        if match:
+            fts = db.table(search_index.FTS_TABLE, db.column("rowid"))
+            hits = (
+                db.select(
+                    fts.c.rowid.label("record_id"),
+                    db.literal_column(f"bm25({search_index.FTS_TABLE})").label("rank"),
+                )
+                .select_from(fts)
+                .where(db.literal_column(search_index.FTS_TABLE).op("MATCH")(match))
+                .subquery()
+            )
+            query = query.join(hits, hits.c.record_id == ApplicationRecord.id)
+            relevance = hits.c.rank
+    elif backend == "postgresql":
+        tsquery = search_index.pg_tsquery(text_query)
+        if tsquery:
+            ts = db.func.to_tsquery("simple", tsquery)
+            document = search_index.pg_document()
+            query = query.filter(document.op("@@")(ts))
+            relevance = db.desc(db.func.ts_rank(document, ts))
+    elif text_query:
+        query = query.filter(
+            db.or_(
+                *(
+                    getattr(ApplicationRecord, column).ilike(f"%{text_query}%")
+                    for column in search_index.SEARCH_COLUMNS
+                )
+            )
+        )
+
+    for field, value in remaining.items():
+        if value:
+            query = query.filter(getattr(ApplicationRecord, field).ilike(f"%{value}%"))
+    return query, relevance
+
+
+def build_search_query(args) -> Tuple[Any, str]:
+    """Apply the public search filters and ordering from query ``args``.
+
+    Returns the ORM query and the effective sort: ``"relevance"`` or one of
+    ``KEYSET_SORTS``. Shared by search and export so both accept the same
+    parameters.
+    """
+    filters = {
+        field: args.get(field)
+        for field in ("university", "country", "program", "degree", "term", "result")
+    }
+    query, relevance = apply_search_filters(ApplicationRecord.query, filters, args.get("q"))
+
+    sort = args.get("sort") or ("relevance" if relevance is not None else "recent")
+    if sort == "relevance" and relevance is not None:
+        return query.order_by(relevance, ApplicationRecord.created_at.desc()), sort
+    if sort not in KEYSET_SORTS:
+        sort = "recent"
+    column, descending = KEYSET_SORTS[sort]
+    if descending:
+        query = query.order_by(column.desc(), ApplicationRecord.id.desc())
+    else:
+        query = query.order_by(column.asc(), ApplicationRecord.id.asc())
+    return query, sort
+
+
+# Keyset pagination: sort name -> (column, descending). Every sort is
+# tie-broken on ``id`` in the same direction, matching the
+# (created_at DESC, id DESC), (university, id) and (program, id) indexes.
+KEYSET_SORTS = {
+    "recent": (ApplicationRecord.created_at, True),
+    "university": (ApplicationRecord.university, False),
+    "program": (ApplicationRecord.program, False),
+}
+
+
+def encode_cursor(sort: str, record: Any) -> str:
+    """Opaque token pointing just past ``record`` (model or row) in ``sort`` order."""
+    value = getattr(record, KEYSET_SORTS[sort][0].key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, record.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort: str) -> Optional[Tuple[Any, int]]:
+    """Return ``(sort_value, id)`` or ``None`` for malformed or mismatched tokens."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        cursor_sort, value, record_id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort or not isinstance(record_id, int):
+            return None
+        if sort == "recent":
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, str):
+            return None
+    except (ValueError, TypeError):
         return None
-    return db.session.get(User, user_id)
+    return value, record_id
+
+
+def keyset_after(sort: str, value: Any, record_id: int):
+    """Row-value predicate selecting records that follow the cursor position."""
+    column, descending = KEYSET_SORTS[sort]
+    position = db.tuple_(column, ApplicationRecord.id)
+    boundary = db.tuple_(db.literal(value, column.type), db.literal(record_id))
+    return position < boundary if descending else position > boundary
+
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+
+def _export_batches(rows, fields: List[str]):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield public_rows_to_dicts(batch, fields)
+            batch = []
+    if batch:
+        yield public_rows_to_dicts(batch, fields)
+
+
+def export_ndjson(rows, fields: List[str]):
+    """Yield one JSON document per line, a batch of rows per chunk."""
+    dumps = current_app.json.dumps_bytes
+    for batch in _export_batches(rows, fields):
+        yield b"".join(dumps(item) + b"\n" for item in batch)
+
+
+def export_csv(rows, fields: List[str]):
+    """Yield a header chunk, then one CSV chunk per batch of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue()
+    for batch in _export_batches(rows, fields):
+        buffer.seek(0)
+        buffer.truncate()
+        for item in batch:
+            if item.get("created_at") is not None:
+                item["created_at"] = item["created_at"].isoformat()
+            writer.writerow([item[name] for name in fields])
+        yield buffer.getvalue()
 
 
 def update_model_from_json(model, data: Dict[str, Any], fields: List[str]) -> None:
@@ -303,12 +1305,369 @@ def update_model_from_json(model, data: Dict[str, Any], fields: List[str]) -> No
             setattr(model, field, data[field])
 
 
+class BulkResource(NamedTuple):
+    model: Any
+    fields: List[str]
+    required: List[str]
+
+
+# Collections accepting POST /api/<name>/bulk; fields mirror the single-item
+# endpoints.
+BULK_RESOURCES = {
+    "education": BulkResource(
+        Education,
+        [
+            "institution",
+            "degree",
+            "field_of_study",
+            "start_year",
+            "end_year",
+            "gpa",
+            "gpa_scale",
+            "currently_enrolled",
+        ],
+        ["institution"],
+    ),
+    "scores": BulkResource(
+        TestScore,
+        ["test_type", "total_score", "section", "score_details", "test_date"],
+        ["test_type"],
+    ),
+    "experiences": BulkResource(
+        Experience,
+        [
+            "category",
+            "organization",
+            "role_title",
+            "description",
+            "start_date",
+            "end_date",
+            "ongoing",
+        ],
+        ["category", "organization"],
+    ),
+    "publications": BulkResource(
+        Publication, ["title", "venue", "year", "first_author", "url"], ["title"]
+    ),
+    "recommendation-letters": BulkResource(
+        RecommendationLetter,
+        ["recommender_name", "relationship", "rating", "organization", "notes"],
+        ["relationship"],
+    ),
+    "applications": BulkResource(
+        ApplicationRecord,
+        [
+            "university",
+            "program",
+            "country",
+            "degree",
+            "term",
+            "result",
+            "funding",
+            "notes",
+            "gpa",
+            "gpa_scale",
+            "gre_total",
+            "research_experience",
+            "internship_experience",
+            "recommendation_strength",
+        ],
+        ["university", "program", "result"],
+    ),
+}
+BULK_MAX_ITEMS = 500
+
+
+def _item_dict(record: Any) -> Dict[str, Any]:
+    return record.to_user_dict() if isinstance(record, ApplicationRecord) else record.to_dict()
+
+
+def coerce_bulk_fields(
+    model: Any, item: Dict[str, Any], fields: List[str]
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Pick ``fields`` from ``item`` converted to their column types.
+
+    Returns ``(values, error)``. Numeric strings are accepted for number
+    columns and numbers for text columns; anything else that the column
+    cannot store is an error rather than a failed flush.
+    """
+    columns = model.__table__.columns
+    values: Dict[str, Any] = {}
+    for field in fields:
+        if field not in item:
+            continue
+        value = item[field]
+        column_type = columns[field].type
+        if value is None:
+            if not columns[field].nullable:
+                return {}, f"{field} cannot be null"
+        elif isinstance(column_type, db.Boolean):
+            if not isinstance(value, bool):
+                return {}, f"{field} must be true or false"
+        elif isinstance(column_type, (db.Integer, db.Float)):
+            try:
+                if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+                    raise ValueError
+                number = float(value)
+                if not math.isfinite(number):
+                    raise ValueError
+            except ValueError:
+                return {}, f"{field} must be a number"
+            if isinstance(column_type, db.Integer):
+                if not number.is_integer():
+                    return {}, f"{field} must be an integer"
+                value = value if isinstance(value, int) else int(number)
+            else:
+                value = number
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        elif not isinstance(value, str):
+            return {}, f"{field} must be a string"
+        values[field] = value
+    return values, None
+
+
+def validate_bulk_payload(
+    resource: BulkResource, user_id: int, payload: Dict[str, Any]
+) -> Tuple[Dict[str, List[Any]], List[Dict[str, Any]]]:
+    """Check a whole bulk request before anything is written.
+
+    Returns ``(operations, errors)``; ``operations`` holds the create
+    mappings, ``(id, changes)`` updates and delete ids.
+    """
+    creates = payload.get("create") or []
+    updates = payload.get("update") or []
+    deletes = payload.get("delete") or []
+    errors: List[Dict[str, Any]] = []
+    if not all(isinstance(items, list) for items in (creates, updates, deletes)):
+        return {}, [{"error": "create, update and delete must be lists"}]
+    if len(creates) + len(updates) + len(deletes) > BULK_MAX_ITEMS:
+        return {}, [{"error": f"At most {BULK_MAX_ITEMS} items per request"}]
+
+    operations: Dict[str, List[Any]] = {"create": [], "update": [], "delete": []}
+    # Payload index of every accepted update and delete, for error reporting.
+    positions: Dict[str, List[int]] = {"update": [], "delete": []}
+    for index, item in enumerate(creates):
+        if not isinstance(item, dict):
+            errors.append({"op": "create", "index": index, "error": "Item must be an object"})
+            continue
+        missing = [field for field in resource.required if not item.get(field)]
+        if missing:
+            errors.append(
+                {"op": "create", "index": index, "error": f"{', '.join(missing)} required"}
+            )
+            continue
+        mapping, error = coerce_bulk_fields(resource.model, item, resource.fields)
+        if error:
+            errors.append({"op": "create", "index": index, "error": error})
+            continue
+        operations["create"].append({"user_id": user_id, **mapping})
+
+    for index, item in enumerate(updates):
+        if not isinstance(item, dict) or type(item.get("id")) is not int:
+            errors.append({"op": "update", "index": index, "error": "Item needs an integer id"})
+            continue
+        changes, error = coerce_bulk_fields(resource.model, item, resource.fields)
+        if error:
+            errors.append({"op": "update", "index": index, "error": error})
+            continue
+        blank = [field for field in resource.required if field in changes and not changes[field]]
+        if blank:
+            errors.append(
+                {"op": "update", "index": index, "error": f"{', '.join(blank)} cannot be empty"}
+            )
+            continue
+        operations["update"].append((item["id"], changes))
+        positions["update"].append(index)
+
+    for index, item in enumerate(deletes):
+        if type(item) is not int:  # bool is an int subclass
+            errors.append({"op": "delete", "index": index, "error": "Expected an integer id"})
+            continue
+        operations["delete"].append(item)
+        positions["delete"].append(index)
+
+    targets = [record_id for record_id, _ in operations["update"]] + operations["delete"]
+    if len(set(targets)) != len(targets):
+        errors.append({"error": "Each id may appear only once across update and delete"})
+    model = resource.model
+    owned = set(
+        db.session.scalars(
+            db.select(model.id).where(model.user_id == user_id, model.id.in_(targets))
+        )
+    ) if targets else set()
+    for op in ("update", "delete"):
+        for index, target in zip(positions[op], operations[op]):
+            record_id = target[0] if op == "update" else target
+            if record_id not in owned:
+                errors.append({"op": op, "index": index, "id": record_id, "error": "Not found"})
+    return operations, errors
+
+
+def apply_bulk_changes(
+    resource: BulkResource, user_id: int, operations: Dict[str, List[Any]]
+) -> List[Dict[str, Any]]:
+    """Apply validated operations in one transaction and return per-item results.
+
+    Profile sub-resources go through ORM bulk statements (executemany).
+    Application records use the unit of work instead so the summary and
+    neighbour-index hooks see every row; SQLAlchemy still batches the INSERTs.
+    """
+    model = resource.model
+    results: List[Dict[str, Any]] = []
+    update_ids = [record_id for record_id, _ in operations["update"]]
+
+    if model is ApplicationRecord:
+        targets = update_ids + operations["delete"]
+        loaded = (
+            {record.id: record for record in model.query.filter(model.id.in_(targets))}
+            if targets
+            else {}
+        )
+        for record_id in operations["delete"]:
+            db.session.delete(loaded[record_id])
+        for record_id, changes in operations["update"]:
+            update_model_from_json(loaded[record_id], changes, resource.fields)
+        created = [model(**mapping) for mapping in operations["create"]]
+        db.session.add_all(created)
+        db.session.flush()
+        updated = [loaded[record_id] for record_id in update_ids]
+    else:
+        if operations["delete"]:
+            db.session.execute(
+                db.delete(model).where(
+                    model.user_id == user_id, model.id.in_(operations["delete"])
+                )
+            )
+        changed = [
+            {"id": record_id, **changes} for record_id, changes in operations["update"] if changes
+        ]
+        if changed:
+            db.session.execute(db.update(model), changed)
+        created = (
+            list(
+                db.session.scalars(
+                    db.insert(model).returning(model, sort_by_parameter_order=True),
+                    operations["create"],
+                )
+            )
+            if operations["create"]
+            else []
+        )
+        by_id = (
+            {record.id: record for record in model.query.filter(model.id.in_(update_ids))}
+            if update_ids
+            else {}
+        )
+        updated = [by_id[record_id] for record_id in update_ids]
+
+    for op, records in (("create", created), ("update", updated)):
+        for index, record in enumerate(records):
+            results.append({"op": op, "index": index, "id": record.id, "data": _item_dict(record)})
+    for index, record_id in enumerate(operations["delete"]):
+        results.append({"op": "delete", "index": index, "id": record_id})
+    db.session.commit()
+    return results
+
+
+def parse_public_fields(raw: Optional[str]) -> Tuple[List[str], List[str]]:
+    """Split a ``fields=`` parameter into ``(known, unknown)`` field names.
+
+    An empty or missing parameter selects every public field.
+    """
+    if not raw:
+        return list(PUBLIC_APPLICATION_FIELDS), []
+    requested = [name.strip() for name in raw.split(",") if name.strip()]
+    known = [name for name in PUBLIC_APPLICATION_FIELDS if name in requested]
+    unknown = [name for name in requested if name not in PUBLIC_APPLICATION_FIELDS]
+    return known, unknown
+
+
+def public_columns(fields: List[str]) -> List[Any]:
+    return [getattr(ApplicationRecord, name) for name in fields]
+
+
+def public_rows_to_dicts(rows, fields: List[str]) -> List[Dict[str, Any]]:
+    """Serialize projected rows without building ORM instances.
+
+    Rows may carry extra trailing columns (e.g. keyset sort keys); only the
+    leading ``fields`` are emitted. ``created_at`` stays a ``datetime``; the
+    JSON provider writes it in the same ISO 8601 form as ``to_public_dict``.
+    """
+    return [dict(zip(fields, row)) for row in rows]
+
+
+PROFILE_COLLECTIONS = {
+    "educations": Education,
+    "test_scores": TestScore,
+    "experiences": Experience,
+    "publications": Publication,
+    "recommendation_letters": RecommendationLetter,
+}
+PROFILE_SECTIONS = ["user", "profile", *PROFILE_COLLECTIONS]
+
+
+def parse_profile_sections(raw: Optional[str]) -> Tuple[List[str], List[str]]:
+    """Split an ``include=`` parameter into ``(known, unknown)`` section names."""
+    if not raw:
+        return list(PROFILE_SECTIONS), []
+    requested = [name.strip() for name in raw.split(",") if name.strip()]
+    known = [name for name in PROFILE_SECTIONS if name in requested]
+    unknown = [name for name in requested if name not in PROFILE_SECTIONS]
+    return known, unknown
+
+
+def load_profile_collections(user_id: int, names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Load several profile collections in a single ``UNION ALL`` round trip.
+
+    Each branch fills its own table's columns and ``NULL`` for the others,
+    so one wide result carries every section; rows are turned back into
+    detached model instances so the usual ``to_dict`` applies.
+    """
+    layout = [
+        (name, column)
+        for name in names
+        for column in PROFILE_COLLECTIONS[name].__table__.columns
+        if column.name != "id"
+    ]
+    branches = []
+    for position, name in enumerate(names):
+        table = PROFILE_COLLECTIONS[name].__table__
+        branches.append(
+            db.select(
+                db.literal(position, db.Integer).label("section"),
+                table.c.id.label("id"),
+                *[
+                    (column if owner == name else db.cast(db.null(), column.type)).label(
+                        f"{owner}__{column.name}"
+                    )
+                    for owner, column in layout
+                ],
+            ).where(table.c.user_id == user_id)
+        )
+    loaded: Dict[str, List[Dict[str, Any]]] = {name: [] for name in names}
+    if not branches:
+        return loaded
+    statement = db.union_all(*branches) if len(branches) > 1 else branches[0]
+    for row in db.session.execute(statement.order_by("section", "id")).mappings():
+        name = names[row["section"]]
+        values = {
+            column.name: row[f"{owner}__{column.name}"] for owner, column in layout if owner == name
+        }
+        loaded[name].append(PROFILE_COLLECTIONS[name](id=row["id"], **values).to_dict())
+    return loaded
+
+
+@cached_analytics
 def get_public_stats() -> Dict[str, Any]:
-    total_applications = ApplicationRecord.query.count()
-    university_count = db.session.query(ApplicationRecord.university).distinct().count()
-    program_count = db.session.query(ApplicationRecord.program).distinct().count()
+    total_applications = (
+        db.session.query(db.func.sum(UniversitySummary.total_applications)).scalar() or 0
+    )
+    university_count = UniversitySummary.query.count()
+    program_count = ProgramSummary.query.count()
     recent = (
-        ApplicationRecord.query.order_by(ApplicationRecord.created_at.desc())
+        ApplicationRecord.query.with_entities(*public_columns(PUBLIC_APPLICATION_FIELDS))
+        .order_by(ApplicationRecord.created_at.desc(), ApplicationRecord.id.desc())
         .limit(5)
         .all()
     )
@@ -316,10 +1675,47 @@ def get_public_stats() -> Dict[str, Any]:
         "total_applications": total_applications,
         "universities": university_count,
         "programs": program_count,
-        "recent_applications": [record.to_public_dict() for record in recent],
+        "recent_applications": public_rows_to_dicts(recent, PUBLIC_APPLICATION_FIELDS),
     }
 
 
+def get_import_user(email: Optional[str] = None) -> User:
+    """Return the account imported records belong to, creating it if needed."""
+    email = (email or current_app.config["IMPORT_USER_EMAIL"]).strip().lower()
+    user = User.query.filter_by(email=email).first()
+    if user is None:
+        # Random password: the account owns rows but is not meant for logging in.
+        user = User(email=email, password_hash=generate_password_hash(os.urandom(16).hex()))
+        db.session.add(user)
+        db.session.commit()
+    return user
+
+
+def import_application_file(
+    stream, fmt: str, chunk_size: int = 5000, user_email: Optional[str] = None, progress=None
+) -> importer.ImportStats:
+    """Import ``stream`` into ``application_records`` and refresh the summaries."""
+    user = get_import_user(user_email)
+    stats = importer.ImportStats()
+    try:
+        importer.import_rows(
+            db.session,
+            ApplicationRecord.__table__,
+            importer.read_rows(stream, fmt),
+            user.id,
+            chunk_size,
+            progress,
+            stats,
+        )
+    finally:
+        if stats.inserted:
+            # The Core inserts skip the incremental summary hooks; chunks
+            # committed before a failure still need them.
+            db.session.rollback()
+            rebuild_analytics_summaries()
+    return stats
+
+
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
@@ -328,7 +1724,96 @@ def get_public_stats() -> Dict[str, Any]:
 def register_routes(app: Flask) -> None:
     @app.context_processor
     def inject_current_user():
-        return {"current_user": get_current_user()}
+        return {"current_user": get_current_identity()}
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        app_metrics = get_metrics()
+        if app_metrics is not None:
+            app_metrics.in_flight.inc()
+            g.metrics_in_flight = True
+
+    @app.teardown_request
+    def finish_request_metrics(error):
+        if g.pop("metrics_in_flight", False):
+            get_metrics().in_flight.dec()
+
+    def when_body_sent(response, callback) -> None:
+        """Call ``callback(g)`` once the body's queries have all run.
+
+        A streamed body (exports, ``yield_per`` handlers) runs its queries
+        after ``after_request``, so the callback waits for the response to be
+        closed; the request's ``g`` is passed explicitly since the context is
+        gone by then.
+        """
+        if response.is_streamed:
+            request_globals = g._get_current_object()
+            response.call_on_close(lambda: callback(request_globals))
+        else:
+            callback(g)
+
+    @app.after_request
+    def record_request_metrics(response):
+        app_metrics = get_metrics()
+        if app_metrics is None:
+            return response
+        endpoint = request.endpoint or "unmatched"
+        elapsed = time.perf_counter() - g.get("request_started", time.perf_counter())
+        app_metrics.requests.inc(
+            endpoint=endpoint, method=request.method, status=response.status_code
+        )
+        app_metrics.latency.observe(elapsed, endpoint=endpoint, method=request.method)
+        if response.content_length is not None:
+            app_metrics.response_size.observe(response.content_length, endpoint=endpoint)
+
+        def record_queries(request_globals) -> None:
+            app_metrics.db_time.observe(request_globals.get("query_time", 0.0), endpoint=endpoint)
+            queries = request_globals.get("query_count", 0)
+            if queries:
+                app_metrics.queries.inc(queries, endpoint=endpoint)
+
+        when_body_sent(response, record_queries)
+        return response
+
+    @app.after_request
+    def add_query_stats(response):
+        # Headers go out before a streamed body, so they count only the
+        # queries run so far; the budget below covers the whole body.
+        count = g.get("query_count", 0)
+        if app.config["QUERY_COUNT_HEADER"]:
+            response.headers["X-Query-Count"] = str(count)
+        if app.config["SERVER_TIMING_HEADER"]:
+            elapsed = time.perf_counter() - g.get("request_started", time.perf_counter())
+            response.headers["Server-Timing"] = query_stats.server_timing(
+                count, g.get("query_time", 0.0), elapsed
+            )
+        budget = app.config["QUERY_BUDGET"]
+        if budget and (app.debug or app.testing):
+            method, path = request.method, request.path
+
+            def check_budget(request_globals) -> None:
+                count = request_globals.get("query_count", 0)
+                if count > budget:
+                    raise query_stats.QueryBudgetExceeded(
+                        f"{method} {path} ran {count} SQL statements (QUERY_BUDGET={budget})"
+                    )
+
+            when_body_sent(response, check_budget)
+        return response
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        """Prometheus scrape target, aggregated over all worker processes."""
+        app_metrics = get_metrics()
+        if app_metrics is None:
+            return jsonify({"error": "Resource not found"}), 404
+        token = app.config["METRICS_TOKEN"]
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            return jsonify({"error": "Authentication required"}), 401
+        return current_app.response_class(
+            app_metrics.registry.render(), content_type=metrics.CONTENT_TYPE
+        )
 
     @app.errorhandler(400)
     def bad_request(error):
@@ -348,30 +1833,33 @@ def register_routes(app: Flask) -> None:
         return jsonify({"error": "Internal server error"}), 500
 
     @app.route("/")
+    @read_replica
     def home():
         stats = get_public_stats()
         return render_template("index.html", stats=stats)
 
     @app.route("/explore")
+    @read_replica
     def explore_page():
         stats = get_public_stats()
         return render_template("explore.html", stats=stats)
 
     @app.route("/universities")
+    @read_replica
     def universities_page():
         stats = get_public_stats()
         return render_template("universities.html", stats=stats)
 
     @app.route("/auth")
     def auth_page():
-        if get_current_user():
+        if get_current_identity():
             return redirect(url_for("dashboard_page"))
         next_url = request.args.get("next") or url_for("dashboard_page")
         return render_template("auth.html", next_url=next_url)
 
     @app.route("/dashboard")
     def dashboard_page():
-        user = get_current_user()
+        user = get_current_identity()
         if not user:
             next_url = request.args.get("next") or request.path
             return redirect(url_for("auth_page", next=next_url))
@@ -393,7 +1881,7 @@ def register_routes(app: Flask) -> None:
         user = User(email=email, password_hash=generate_password_hash(password))
         db.session.add(user)
         db.session.commit()
-        session["user_id"] = user.id
+        log_in(user)
 
         return jsonify({"message": "Registered successfully", "user": user.to_dict()})
 
@@ -406,32 +1894,41 @@ def register_routes(app: Flask) -> None:
         if not user or not password or not check_password_hash(user.password_hash, password):
             return jsonify({"error": "Invalid credentials"}), 401
 
-        session["user_id"] = user.id
+        log_in(user)
         return jsonify({"message": "Logged in", "user": user.to_dict()})
 
     @app.route("/api/logout", methods=["POST"])
     def logout():
-        session.pop("user_id", None)
+        log_out()
         return jsonify({"message": "Logged out"})
 
     # -------- Profile --------
     @app.route("/api/profile", methods=["GET"])
     @login_required
     def get_profile():
-        user = get_current_user()
-        assert user
-        profile = user.profile.to_dict() if user.profile else {}
-        return jsonify(
-            {
-                "user": user.to_dict(),
-                "profile": profile,
-                "educations": [e.to_dict() for e in user.educations],
-                "test_scores": [score.to_dict() for score in user.test_scores],
-                "experiences": [exp.to_dict() for exp in user.experiences],
-                "publications": [pub.to_dict() for pub in user.publications],
-                "recommendation_letters": [letter.to_dict() for letter in user.recommendation_letters],
-            }
-        )
+        identity = get_current_identity()
+        assert identity
+        sections, unknown = parse_profile_sections(request.args.get("include"))
+        if unknown:
+            return jsonify({"error": f"Unknown sections: {', '.join(unknown)}"}), 400
+
+        payload: Dict[str, Any] = {}
+        profile = None
+        if "user" in sections:
+            user = db.session.execute(
+                db.select(User)
+                .options(db.joinedload(User.profile))
+                .where(User.id == identity.id)
+            ).scalar_one()
+            payload["user"] = user.to_dict()
+            profile = user.profile
+        elif "profile" in sections:
+            profile = Profile.query.filter_by(user_id=identity.id).first()
+        if "profile" in sections:
+            payload["profile"] = profile.to_dict() if profile else {}
+        collections = [name for name in sections if name in PROFILE_COLLECTIONS]
+        payload.update(load_profile_collections(identity.id, collections))
+        return jsonify(payload)
 
     @app.route("/api/profile", methods=["PUT"])
     @login_required
@@ -463,17 +1960,18 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/education", methods=["GET", "POST"])
     @login_required
     def education_collection():
-        user = get_current_user()
+        user = get_current_identity()
         assert user
         if request.method == "GET":
-            return jsonify([edu.to_dict() for edu in user.educations])
+            educations = Education.query.filter_by(user_id=user.id)
+            return jsonify([edu.to_dict() for edu in educations])
 
         payload = request.get_json(silent=True) or {}
         required_fields = ["institution"]
         if not all(payload.get(field) for field in required_fields):
             return jsonify({"error": "Institution is required"}), 400
 
-        edu = Education(user=user)
+        edu = Education(user_id=user.id)
         fields = [
             "institution",
             "degree",
@@ -492,7 +1990,7 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/education/<int:education_id>", methods=["PUT", "DELETE"])
     @login_required
     def education_resource(education_id: int):
-        user = get_current_user()
+        user = get_current_identity()
         assert user
         education = Education.query.filter_by(id=education_id, user_id=user.id).first()
         if not education:
@@ -522,16 +2020,17 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/scores", methods=["GET", "POST"])
     @login_required
     def score_collection():
-        user = get_current_user()
+        user = get_current_identity()
         assert user
         if request.method == "GET":
-            return jsonify([score.to_dict() for score in user.test_scores])
+            scores = TestScore.query.filter_by(user_id=user.id)
+            return jsonify([score.to_dict() for score in scores])
 
         payload = request.get_json(silent=True) or {}
         if not payload.get("test_type"):
             return jsonify({"error": "test_type is required"}), 400
 
-        score = TestScore(user=user)
+        score = TestScore(user_id=user.id)
         fields = [
             "test_type",
             "total_score",
@@ -547,7 +2046,7 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/scores/<int:score_id>", methods=["PUT", "DELETE"])
     @login_required
     def score_resource(score_id: int):
-        user = get_current_user()
+        user = get_current_identity()
         assert user
         score = TestScore.query.filter_by(id=score_id, user_id=user.id).first()
         if not score:
@@ -574,16 +2073,17 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/experiences", methods=["GET", "POST"])
     @login_required
     def experience_collection():
-        user = get_current_user()
+        user = get_current_identity()
         assert user
         if request.method == "GET":
-            return jsonify([exp.to_dict() for exp in user.experiences])
+            experiences = Experience.query.filter_by(user_id=user.id)
+            return jsonify([exp.to_dict() for exp in experiences])
 
         payload = request.get_json(silent=True) or {}
         if not payload.get("category") or not payload.get("organization"):
             return jsonify({"error": "category and organization are required"}), 400
 
-        experience = Experience(user=user)
+        experience = Experience(user_id=user.id)
         fields = [
             "category",
             "organization",
@@ -601,7 +2101,7 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/experiences/<int:experience_id>", methods=["PUT", "DELETE"])
     @login_required
     def experience_resource(experience_id: int):
-        user = get_current_user()
+        user = get_current_identity()
         assert user
         experience = Experience.query.filter_by(id=experience_id, user_id=user.id).first()
         if not experience:
@@ -630,16 +2130,17 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/publications", methods=["GET", "POST"])
     @login_required
     def publication_collection():
-        user = get_current_user()
+        user = get_current_identity()
         assert user
         if request.method == "GET":
-            return jsonify([pub.to_dict() for pub in user.publications])
+            publications = Publication.query.filter_by(user_id=user.id)
+            return jsonify([pub.to_dict() for pub in publications])
 
         payload = request.get_json(silent=True) or {}
         if not payload.get("title"):
             return jsonify({"error": "title is required"}), 400
 
-        publication = Publication(user=user)
+        publication = Publication(user_id=user.id)
         fields = ["title", "venue", "year", "first_author", "url"]
         update_model_from_json(publication, payload, fields)
         db.session.add(publication)
@@ -649,7 +2150,7 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/publications/<int:publication_id>", methods=["PUT", "DELETE"])
     @login_required
     def publication_resource(publication_id: int):
-        user = get_current_user()
+        user = get_current_identity()
         assert user
         publication = Publication.query.filter_by(id=publication_id, user_id=user.id).first()
         if not publication:
@@ -670,16 +2171,17 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/recommendation-letters", methods=["GET", "POST"])
     @login_required
     def recommendation_letter_collection():
-        user = get_current_user()
+        user = get_current_identity()
         assert user
         if request.method == "GET":
-            return jsonify([letter.to_dict() for letter in user.recommendation_letters])
+            letters = RecommendationLetter.query.filter_by(user_id=user.id)
+            return jsonify([letter.to_dict() for letter in letters])
 
         payload = request.get_json(silent=True) or {}
         if not payload.get("relationship"):
             return jsonify({"error": "relationship is required"}), 400
 
-        letter = RecommendationLetter(user=user)
+        letter = RecommendationLetter(user_id=user.id)
         fields = ["recommender_name", "relationship", "rating", "organization", "notes"]
         update_model_from_json(letter, payload, fields)
         db.session.add(letter)
@@ -689,7 +2191,7 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/recommendation-letters/<int:letter_id>", methods=["PUT", "DELETE"])
     @login_required
     def recommendation_letter_resource(letter_id: int):
-        user = get_current_user()
+        user = get_current_identity()
         assert user
         letter = RecommendationLetter.query.filter_by(id=letter_id, user_id=user.id).first()
         if not letter:
@@ -710,20 +2212,21 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/applications/my", methods=["GET"])
     @login_required
     def my_applications():
-        user = get_current_user()
+        user = get_current_identity()
         assert user
-        return jsonify([record.to_user_dict() for record in user.applications])
+        records = ApplicationRecord.query.filter_by(user_id=user.id)
+        return jsonify([record.to_user_dict() for record in records])
 
     @app.route("/api/applications", methods=["POST"])
     @login_required
     def create_application():
-        user = get_current_user()
+        user = get_current_identity()
         assert user
         payload = request.get_json(silent=True) or {}
         if not payload.get("university") or not payload.get("program") or not payload.get("result"):
             return jsonify({"error": "university, program, and result are required"}), 400
 
-        record = ApplicationRecord(user=user)
+        record = ApplicationRecord(user_id=user.id)
         fields = [
             "university",
             "program",
@@ -740,7 +2243,10 @@ def register_routes(app: Flask) -> None:
             "internship_experience",
             "recommendation_strength",
         ]
-        update_model_from_json(record, payload, fields)
+        try:
+            update_model_from_json(record, payload, fields)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
         db.session.add(record)
         db.session.commit()
         return jsonify(record.to_user_dict()), 201
@@ -748,7 +2254,7 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/applications/<int:application_id>", methods=["PUT", "DELETE"])
     @login_required
     def application_resource(application_id: int):
-        user = get_current_user()
+        user = get_current_identity()
         assert user
         record = ApplicationRecord.query.filter_by(id=application_id, user_id=user.id).first()
         if not record:
@@ -776,294 +2282,478 @@ def register_routes(app: Flask) -> None:
             "internship_experience",
             "recommendation_strength",
         ]
-        update_model_from_json(record, payload, fields)
+        try:
+            update_model_from_json(record, payload, fields)
+        except ValueError as exc:
+            db.session.rollback()
+            return jsonify({"error": str(exc)}), 400
         db.session.commit()
         return jsonify(record.to_user_dict())
 
     # -------- Public Search & Stats --------
     @app.route("/api/public/stats")
+    @read_replica
+    @conditional_get
     def public_stats_endpoint():
         return jsonify(get_public_stats())
 
     @app.route("/api/analytics/universities")
+    @read_replica
+    @conditional_get
     def universities_distribution():
         """Get university distribution analytics."""
         return jsonify(get_university_distribution())
 
     @app.route("/api/analytics/programs")
+    @read_replica
+    @conditional_get
     def programs_distribution():
         """Get program distribution analytics."""
         return jsonify(get_program_distribution())
 
     @app.route("/api/analytics/regional")
+    @read_replica
+    @conditional_get
     def regional_distribution():
         """Get regional/country-based distribution."""
         return jsonify(get_regional_data())
 
     @app.route("/api/search/applications", methods=["GET"])
+    @read_replica
+    @conditional_get
     def search_applications():
-        query = ApplicationRecord.query
-        filters = {
-            "university": request.args.get("university"),
-            "country": request.args.get("country"),
-            "program": request.args.get("program"),
-            "degree": request.args.get("degree"),
-            "term": request.args.get("term"),
-            "result": request.args.get("result"),
-        }
-        for field, value in filters.items():
-            if value:
-                query = query.filter(getattr(ApplicationRecord, field).ilike(f"%{value}%"))
-
-        sort = request.args.get("sort", "recent")
-        if sort == "university":
-            query = query.order_by(ApplicationRecord.university.asc())
-        elif sort == "program":
-            query = query.order_by(ApplicationRecord.program.asc())
-        else:
-            query = query.order_by(ApplicationRecord.created_at.desc())
+        query, sort = build_search_query(request.args)
+        paginated = "cursor" in request.args
+        if paginated and sort == "relevance":
+            return jsonify({"error": "Cursor pagination is not available for relevance sort"}), 400
+        if request.args.get("cursor"):
+            position = decode_cursor(request.args["cursor"], sort)
+            if position is None:
+                return jsonify({"error": "Invalid cursor"}), 400
+            query = query.filter(keyset_after(sort, *position))
+
+        fields, unknown = parse_public_fields(request.args.get("fields"))
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+        # Project only public columns (never ``notes``); keyset keys ride
+        # along at the end when the client did not ask for them.
+        selected = list(fields)
+        if paginated:
+            selected += [
+                name for name in (KEYSET_SORTS[sort][0].key, "id") if name not in selected
+            ]
+        query = query.with_entities(*public_columns(selected))
+
+        limit = min(max(int(request.args.get("limit", 50)), 1), 200)
+        if not paginated:
+            rows = query.limit(limit).all()
+            return jsonify(public_rows_to_dicts(rows, fields))
+
+        rows = query.limit(limit + 1).all()
+        next_cursor = encode_cursor(sort, rows[limit - 1]) if len(rows) > limit else None
+        return jsonify(
+            {
+                "data": public_rows_to_dicts(rows[:limit], fields),
+                "next_cursor": next_cursor,
+            }
+        )
+
+    @app.route("/api/export/applications", methods=["GET"])
+    @read_replica
+    @conditional_get
+    def export_applications():
+        """Stream every matching public record as NDJSON or CSV."""
+        export_format = request.args.get("format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+        fields, unknown = parse_public_fields(request.args.get("fields"))
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+
+        query, _ = build_search_query(request.args)
+        rows = query.with_entities(*public_columns(fields)).yield_per(EXPORT_BATCH_SIZE)
+        encode = export_ndjson if export_format == "ndjson" else export_csv
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        response = current_app.response_class(
+            stream_with_context(encode(rows, fields)), mimetype=mimetype
+        )
+        response.headers["Content-Disposition"] = f"attachment; filename=applications.{extension}"
+        return response
+
+    @app.route("/api/<resource_name>/bulk", methods=["POST"])
+    @login_required
+    def bulk_write(resource_name: str):
+        resource = BULK_RESOURCES.get(resource_name)
+        if resource is None:
+            return jsonify({"error": "Not found"}), 404
+        user = get_current_identity()
+        assert user
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return jsonify({"error": "Expected a JSON object with create, update or delete"}), 400
+
+        operations, errors = validate_bulk_payload(resource, user.id, payload)
+        if errors:
+            return (
+                jsonify({"error": "Validation failed; nothing was written", "errors": errors}),
+                400,
+            )
+        results = apply_bulk_changes(resource, user.id, operations)
+        return jsonify(
+            {
+                "results": results,
+                "created": len(operations["create"]),
+                "updated": len(operations["update"]),
+                "deleted": len(operations["delete"]),
+            }
+        )
 
-        limit = min(int(request.args.get("limit", 50)), 200)
-        records = query.limit(limit).all()
-        return jsonify([record.to_public_dict() for record in records])
+    @app.route("/api/admin/import", methods=["POST"])
+    @admin_required
+    def admin_import():
+        upload = request.files.get("file")
+        name = upload.filename if upload else None
+        try:
+            fmt = importer.detect_format(name, request.args.get("format"))
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        chunk_size = request.args.get("chunk_size", 5000, type=int)
+        if chunk_size <= 0:
+            return jsonify({"error": "chunk_size must be positive"}), 400
+        binary = upload.stream if upload else request.stream
+        stream = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+        try:
+            stats = import_application_file(
+                stream, fmt, chunk_size, request.args.get("user_email")
+            )
+        except UnicodeDecodeError:
+            return jsonify({"error": "Upload must be UTF-8 text"}), 400
+        return jsonify(stats.as_dict())
 
     # -------- Match Suggestions --------
     @app.route("/api/match/suggestions", methods=["GET"])
     @login_required
     def match_suggestions():
-        user = get_current_user()
+        user = get_current_identity()
         assert user
-        if not user.profile or not user.profile.gpa or not user.profile.gpa_scale:
+        profile = Profile.query.filter_by(user_id=user.id).first()
+        if not profile or not profile.gpa or not profile.gpa_scale:
             return (
                 jsonify({"error": "Complete your profile with GPA details to get suggestions."}),
                 400,
             )
 
-        user_gpa_norm = user.profile.gpa / (user.profile.gpa_scale or 1)
-        user_gre = user.profile.gre_total or 0
+        user_gpa_norm = profile.gpa / (profile.gpa_scale or 1)
+        user_gre = profile.gre_total or 0
 
-        stats = aggregate_program_stats()
-        if not stats:
+        matrix = get_program_matrix()
+        if not len(matrix):
             return jsonify({"message": "Not enough admitted records for suggestions", "data": []})
 
-        reach: List[Dict[str, Any]] = []
-        match: List[Dict[str, Any]] = []
-        safe: List[Dict[str, Any]] = []
-
-        for key, info in stats.items():
-            avg_gpa = info.get("avg_gpa")
-            if avg_gpa is None:
-                continue
-            gpa_gap = user_gpa_norm - avg_gpa
-            gre_gap = 0.0
-            if info.get("avg_gre") and user_gre:
-                gre_gap = (user_gre - info["avg_gre"]) / 340.0
-            composite = (gpa_gap * 0.7) + (gre_gap * 0.3)
-            entry = {
-                "program_key": key,
-                "university": info["university"],
-                "program": info["program"],
-                "degree": info["degree"],
-                "avg_gpa": round(avg_gpa, 3),
-                "avg_gre": info.get("avg_gre"),
-                "admit_rate": info.get("admit_rate"),
-                "sample_size": info["total"],
-                "score_gap": round(composite, 3),
-            }
-            if composite >= 0.05:
-                safe.append(entry)
-            elif composite <= -0.05:
-                reach.append(entry)
-            else:
-                match.append(entry)
+        model = get_admission_model()
+        if model is None:
+            return jsonify(matrix.suggest(user_gpa_norm, user_gre))
+        features = admission_model.applicant_features(
+            profile.gpa,
+            profile.gpa_scale,
+            profile.gre_total,
+            profile.research_experience,
+            profile.internship_experience,
+            profile.recommendation_strength,
+        )
+        payload = matrix.suggest_with_model(model, features, cutoffs=probability_cutoffs(model))
+        payload["model"] = {"trained_at": model.trained_at}
+        return jsonify(payload)
 
-        result_payload = {
-            "reach": sorted(reach, key=lambda r: r["score_gap"])[:5],
-            "match": sorted(match, key=lambda r: abs(r["score_gap"]))[:5],
-            "safe": sorted(safe, key=lambda r: -r["score_gap"])[:5],
-        }
-        return jsonify(result_payload)
+    @app.route("/api/match/neighbors", methods=["GET"])
+    @login_required
+    def match_neighbors():
+        user = get_current_identity()
+        assert user
+        profile = Profile.query.filter_by(user_id=user.id).first()
+        features = neighbors.record_features(*neighbor_values(profile)) if profile else None
+        if features is None:
+            return (
+                jsonify(
+                    {"error": "Complete your profile with GPA details to find similar applicants."}
+                ),
+                400,
+            )
+        try:
+            k = min(max(int(request.args.get("k", 10)), 1), 50)
+        except ValueError:
+            return jsonify({"error": "k must be an integer"}), 400
+
+        found = get_neighbor_index().query(features, k, exclude_user=user.id)
+        rows = (
+            ApplicationRecord.query.with_entities(*public_columns(PUBLIC_APPLICATION_FIELDS))
+            .filter(ApplicationRecord.id.in_([record_id for record_id, _ in found]))
+            .all()
+        )
+        by_id = {row["id"]: row for row in public_rows_to_dicts(rows, PUBLIC_APPLICATION_FIELDS)}
+        data = [
+            {**by_id[record_id], "distance": round(distance, 4)}
+            for record_id, distance in found
+            if record_id in by_id
+        ]
+        outcomes: Dict[str, int] = {}
+        for row in data:
+            outcomes[row["result"]] = outcomes.get(row["result"], 0) + 1
+        return jsonify({"data": data, "outcomes": outcomes})
 
+    @app.route("/api/match/batch", methods=["POST"])
+    @login_required
+    def match_batch():
+        payload = request.get_json(silent=True) or {}
+        profiles = payload.get("profiles")
+        if not isinstance(profiles, list) or not profiles:
+            return jsonify({"error": "profiles must be a non-empty list"}), 400
+        if len(profiles) > MATCH_BATCH_MAX_PROFILES:
+            return (
+                jsonify({"error": f"At most {MATCH_BATCH_MAX_PROFILES} profiles per request"}),
+                400,
+            )
+        try:
+            limit = min(max(int(payload.get("limit", 5)), 1), 50)
+        except (TypeError, ValueError):
+            return jsonify({"error": "limit must be an integer"}), 400
+
+        features = []
+        for position, profile in enumerate(profiles):
+            vector = batch_profile_features(profile)
+            if vector is None:
+                error = f"profiles[{position}] needs finite numeric gpa, gpa_scale and gre_total"
+                return jsonify({"error": error}), 400
+            features.append(vector)
+
+        matrix = get_program_matrix()
+        if not len(matrix):
+            return jsonify({"message": "Not enough admitted records for suggestions", "data": []})
 
+        model = get_admission_model()
+        if model is None:
+            results = matrix.suggest_batch(
+                [vector[0] for vector in features],
+                [vector[1] * admission_model.GRE_SCALE for vector in features],
+                limit,
+            )
+        else:
+            results = matrix.suggest_batch_with_model(
+                model, features, limit, probability_cutoffs(model)
+            )
+        for profile, result in zip(profiles, results):
+            if profile.get("label") is not None:
+                result["label"] = profile["label"]
+        body: Dict[str, Any] = {"results": results}
+        if model is not None:
+            body["model"] = {"trained_at": model.trained_at}
+        return jsonify(body)
+
+
+def _result_count(value: str):
+    """SQL ``SUM(CASE ...)`` counting records whose result matches ``value``."""
+    return db.func.sum(
+        db.case((db.func.lower(ApplicationRecord.result) == value, 1), else_=0)
+    )
+
+
+def _admit_rate(admits: int, total: int) -> float:
+    return round(admits / total, 3) if total > 0 else 0
+
+
+def rebuild_analytics_summaries() -> Dict[str, int]:
+    """Recompute every summary table from ``application_records``.
+
+    Used for backfills after bulk loads that bypass the ORM (and therefore the
+    incremental mapper events). Everything runs as ``INSERT ... SELECT`` with
+    ``GROUP BY`` so no application rows are materialized in Python.
+    """
+    record = ApplicationRecord
+    admitted = db.func.lower(record.result) == "accept"
+    has_gpa = db.and_(admitted, record.gpa != 0, record.gpa_scale != 0)
+    has_gre = db.and_(admitted, record.gre_total != 0)
+    degree_key = db.func.coalesce(record.degree, "")
+    country_key = db.case(
+        (db.func.coalesce(record.country, "") == "", "Unknown"), else_=record.country
+    )
+
+    def count_if(condition):
+        return db.func.sum(db.case((condition, 1), else_=0))
+
+    sources = [
+        (
+            UniversitySummary,
+            db.select(
+                record.university,
+                db.func.min(db.func.nullif(record.country, "")),
+                db.func.count(record.id),
+                _result_count("accept"),
+                _result_count("reject"),
+                _result_count("waitlist"),
+            ).group_by(record.university),
+        ),
+        (
+            ProgramSummary,
+            db.select(
+                record.program, db.func.count(record.id), _result_count("accept")
+            ).group_by(record.program),
+        ),
+        (
+            CountrySummary,
+            db.select(
+                country_key, record.university, db.func.count(record.id), _result_count("accept")
+            ).group_by(country_key, record.university),
+        ),
+        (
+            ProgramGroupSummary,
+            db.select(
+                record.university,
+                record.program,
+                degree_key,
+                db.func.min(record.degree),
+                db.func.count(record.id),
+                _result_count("accept"),
+                db.func.coalesce(
+                    db.func.sum(db.case((has_gpa, record.gpa / record.gpa_scale), else_=0.0)), 0.0
+                ),
+                count_if(has_gpa),
+                db.func.coalesce(
+                    db.func.sum(db.case((has_gre, record.gre_total), else_=0)), 0
+                ),
+                count_if(has_gre),
+            ).group_by(record.university, record.program, degree_key),
+        ),
+    ]
+
+    counts: Dict[str, int] = {}
+    for model, select in sources:
+        table = model.__table__
+        db.session.execute(table.delete())
+        db.session.execute(table.insert().from_select([c.name for c in table.columns], select))
+        counts[table.name] = db.session.query(model).count()
+    db.session.commit()
+    bump_dataset_version()
+    return counts
+
+
+def ensure_analytics_summaries() -> None:
+    """Backfill the summaries once for databases created before they existed."""
+    if db.session.query(UniversitySummary.university).first() is not None:
+        return
+    if db.session.query(ApplicationRecord.id).first() is None:
+        return
+    rebuild_analytics_summaries()
+
+
+@cached_analytics
 def aggregate_program_stats() -> Dict[str, Dict[str, Any]]:
-    records = ApplicationRecord.query.all()
     stats: Dict[str, Dict[str, Any]] = {}
-    for record in records:
-        key = f"{record.university}::{record.program}::{record.degree or ''}"
-        entry = stats.setdefault(
-            key,
-            {
-                "university": record.university,
-                "program": record.program,
-                "degree": record.degree,
-                "gpa_values": [],
-                "gre_values": [],
-                "total": 0,
-                "admitted": 0,
-            },
-        )
-        normalized_gpa = None
-        if record.gpa and record.gpa_scale:
-            normalized_gpa = record.gpa / record.gpa_scale
-
-        if record.result and record.result.lower() == "accept":
-            entry["admitted"] += 1
-            if normalized_gpa is not None:
-                entry["gpa_values"].append(normalized_gpa)
-            if record.gre_total:
-                entry["gre_values"].append(record.gre_total)
-
-        entry["total"] += 1
-
-    for key, info in stats.items():
-        if info["gpa_values"]:
-            info["avg_gpa"] = sum(info["gpa_values"]) / len(info["gpa_values"])
-        else:
-            info["avg_gpa"] = None
-        if info["gre_values"]:
-            info["avg_gre"] = int(sum(info["gre_values"]) / len(info["gre_values"]))
-        else:
-            info["avg_gre"] = None
-        info["admit_rate"] = round(info["admitted"] / info["total"], 3) if info["total"] else 0
-        info.pop("gpa_values", None)
-        info.pop("gre_values", None)
+    for group in ProgramGroupSummary.query.all():
+        stats[f"{group.university}::{group.program}::{group.degree_key}"] = {
+            "university": group.university,
+            "program": group.program,
+            "degree": group.degree,
+            "total": group.total,
+            "admitted": group.admitted,
+            "avg_gpa": (
+                group.admitted_gpa_sum / group.admitted_gpa_count
+                if group.admitted_gpa_count
+                else None
+            ),
+            "avg_gre": (
+                int(group.admitted_gre_sum / group.admitted_gre_count)
+                if group.admitted_gre_count
+                else None
+            ),
+            "admit_rate": _admit_rate(group.admitted, group.total),
+        }
     return stats
 
 
-def get_university_distribution() -> Dict[str, Any]:
-    """Get university distribution data for visualization."""
-    records = ApplicationRecord.query.all()
-    university_stats: Dict[str, Dict[str, Any]] = {}
-
-    for record in records:
-        uni = record.university
-        if uni not in university_stats:
-            university_stats[uni] = {
-                "university": uni,
-                "country": record.country,
-                "total_applications": 0,
-                "admits": 0,
-                "rejects": 0,
-                "waitlists": 0,
-                "programs": set(),
-                "admit_rate": 0.0,
-            }
+def _distinct_pairs(key_column, value_column) -> Dict[Any, List[Any]]:
+    """Map each ``key_column`` value to its distinct ``value_column`` values."""
+    rows = (
+        db.session.query(key_column, value_column)
+        .distinct()
+        .order_by(key_column, value_column)
+        .all()
+    )
+    pairs: Dict[Any, List[Any]] = {}
+    for key, value in rows:
+        pairs.setdefault(key, []).append(value)
+    return pairs
 
-        stats = university_stats[uni]
-        stats["total_applications"] += 1
-        if record.program:
-            stats["programs"].add(record.program)
-
-        result = (record.result or "").lower()
-        if result == "accept":
-            stats["admits"] += 1
-        elif result == "reject":
-            stats["rejects"] += 1
-        elif result == "waitlist":
-            stats["waitlists"] += 1
-
-    # Convert sets to lists and calculate admit rates
-    for uni_data in university_stats.values():
-        uni_data["programs"] = list(uni_data["programs"])
-        uni_data["admit_rate"] = round(
-            uni_data["admits"] / uni_data["total_applications"], 3
-            if uni_data["total_applications"] > 0
-            else 0
-        )
 
+@cached_analytics
+def get_program_matrix() -> ProgramMatrix:
+    """Columnar program stats for vectorized match scoring, one per dataset version."""
+    return ProgramMatrix(aggregate_program_stats())
+
+
+@cached_analytics
+def get_university_distribution() -> Dict[str, Any]:
+    """Get university distribution data for visualization."""
+    programs = _distinct_pairs(ProgramGroupSummary.university, ProgramGroupSummary.program)
+    universities = [
+        {
+            "university": summary.university,
+            "country": summary.country,
+            "total_applications": summary.total_applications,
+            "admits": summary.admits,
+            "rejects": summary.rejects,
+            "waitlists": summary.waitlists,
+            "programs": programs.get(summary.university, []),
+            "admit_rate": _admit_rate(summary.admits, summary.total_applications),
+        }
+        for summary in UniversitySummary.query.order_by(UniversitySummary.university).all()
+    ]
     return {
-        "total_universities": len(university_stats),
-        "universities": list(university_stats.values()),
+        "total_universities": len(universities),
+        "universities": universities,
     }
 
 
+@cached_analytics
 def get_program_distribution() -> Dict[str, Any]:
     """Get program distribution data for visualization."""
-    records = ApplicationRecord.query.all()
-    program_stats: Dict[str, Dict[str, Any]] = {}
-
-    for record in records:
-        program = record.program
-        if program not in program_stats:
-            program_stats[program] = {
-                "program": program,
-                "total_applications": 0,
-                "admits": 0,
-                "universities": set(),
-                "admit_rate": 0.0,
-            }
-
-        stats = program_stats[program]
-        stats["total_applications"] += 1
-        stats["universities"].add(record.university)
-
-        result = (record.result or "").lower()
-        if result == "accept":
-            stats["admits"] += 1
-
-    # Convert sets to lists and calculate admit rates
-    for prog_data in program_stats.values():
-        prog_data["universities"] = list(prog_data["universities"])
-        prog_data["admit_rate"] = round(
-            prog_data["admits"] / prog_data["total_applications"], 3
-            if prog_data["total_applications"] > 0
-            else 0
-        )
-
+    universities = _distinct_pairs(ProgramGroupSummary.program, ProgramGroupSummary.university)
+    programs = [
+        {
+            "program": summary.program,
+            "total_applications": summary.total_applications,
+            "admits": summary.admits,
+            "universities": universities.get(summary.program, []),
+            "admit_rate": _admit_rate(summary.admits, summary.total_applications),
+        }
+        for summary in ProgramSummary.query.order_by(ProgramSummary.program).all()
+    ]
     return {
-        "total_programs": len(program_stats),
-        "programs": list(program_stats.values()),
+        "total_programs": len(programs),
+        "programs": programs,
     }
 
 
+@cached_analytics
 def get_regional_data() -> Dict[str, Any]:
     """Get university data grouped by region/country."""
-    records = ApplicationRecord.query.all()
     regional_data: Dict[str, Dict[str, Any]] = {}
-
-    for record in records:
-        country = record.country or "Unknown"
-        if country not in regional_data:
-            regional_data[country] = {
-                "country": country,
-                "universities": {},
-                "total_applications": 0,
-            }
-
-        region_stats = regional_data[country]
-        region_stats["total_applications"] += 1
-
-        uni = record.university
-        if uni not in region_stats["universities"]:
-            region_stats["universities"][uni] = {
-                "university": uni,
-                "applications": 0,
-                "admits": 0,
-            }
-
-        uni_stats = region_stats["universities"][uni]
-        uni_stats["applications"] += 1
-        if (record.result or "").lower() == "accept":
-            uni_stats["admits"] += 1
-
-    # Convert to list format for easier frontend processing
-    regions = []
-    for country, data in regional_data.items():
-        universities = []
-        for uni, stats in data["universities"].items():
-            universities.append({
-                "university": uni,
-                "applications": stats["applications"],
-                "admits": stats["admits"],
-                "admit_rate": round(stats["admits"] / stats["applications"], 3) if stats["applications"] > 0 else 0,
-            })
-
-        regions.append({
-            "country": country,
-            "total_applications": data["total_applications"],
-            "universities": universities,
+    summaries = CountrySummary.query.order_by(
+        CountrySummary.country, CountrySummary.university
+    ).all()
+    for summary in summaries:
+        region = regional_data.setdefault(
+            summary.country,
+            {"country": summary.country, "total_applications": 0, "universities": []},
+        )
+        region["total_applications"] += summary.applications
+        region["universities"].append({
+            "university": summary.university,
+            "applications": summary.applications,
+            "admits": summary.admits,
+            "admit_rate": _admit_rate(summary.admits, summary.applications),
         })
 
+    regions = list(regional_data.values())
     return {"regions": sorted(regions, key=lambda x: x["total_applications"], reverse=True)}
 
 
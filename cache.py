@@ -0,0 +1,325 @@
+"""Versioned cache for analytics and public statistics.
+
+Entries are keyed by a dataset version counter that is bumped whenever
+application data is committed, so a write never has to hunt down the keys
+it invalidates: readers simply stop asking for the old version and the stale
+entries age out through LRU/TTL eviction.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:  # pragma: no cover - fcntl is unavailable on Windows
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+
+_MISSING = object()
+
+
+class CacheBackend:
+    """Storage interface used by :class:`AnalyticsCache`."""
+
+    # Whether every process sees the same entries and version counter.
+    shared = False
+
+    def get(self, key: str) -> Any:
+        """Return the stored value, or ``_MISSING`` when absent or expired."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def get_version(self) -> int:
+        raise NotImplementedError
+
+    def bump_version(self) -> int:
+        raise NotImplementedError
+
+    def get_epoch(self) -> str:
+        """Token distinguishing independent version sequences.
+
+        Two counters that both read ``5`` only describe the same data when
+        they share an epoch (the same process, or the same cache directory).
+        """
+        raise NotImplementedError
+
+    def get_last_modified(self) -> float:
+        """Unix timestamp of the most recent version bump."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process LRU dictionary with a TTL.
+
+    Each gunicorn worker keeps its own copy and its own version counter, so
+    a write in one worker only reaches the others once their entries expire.
+    Use :class:`FileCacheBackend` when workers must agree immediately.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._version = 0
+        self._epoch = uuid.uuid4().hex[:12]
+        self._last_modified = time.time()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> int:
+        with self._lock:
+            self._version += 1
+            self._last_modified = time.time()
+            return self._version
+
+    def get_epoch(self) -> str:
+        return self._epoch
+
+    def get_last_modified(self) -> float:
+        return self._last_modified
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FileCacheBackend(CacheBackend):
+    """Pickle-per-entry store in a directory shared by every worker.
+
+    Point ``directory`` at a tmpfs such as ``/dev/shm`` to keep the shared
+    copy in memory. The dataset version lives in the same directory, so a
+    commit in any worker invalidates the cache for all of them.
+    """
+
+    shared = True
+
+    def __init__(self, directory: str, max_entries: int = 256, ttl: float = 300.0):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self._version_path = os.path.join(directory, "version")
+        self._lock_path = os.path.join(directory, "version.lock")
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.pkl")
+
+    def _entry_paths(self):
+        return [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".pkl")
+        ]
+
+    def get(self, key: str) -> Any:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                expires_at, stored_key, value = pickle.load(handle)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return _MISSING
+        if stored_key != key:
+            return _MISSING
+        if expires_at < time.time():
+            self._remove(path)
+            return _MISSING
+        try:
+            os.utime(path)  # mtime doubles as the LRU clock
+        except OSError:
+            pass
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            pickle.dump((time.time() + self.ttl, key, value), handle, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        paths = self._entry_paths()
+        if len(paths) <= self.max_entries:
+            return
+        by_age = []
+        for path in paths:
+            try:
+                by_age.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        by_age.sort()
+        for _, path in by_age[: len(by_age) - self.max_entries]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        for path in self._entry_paths():
+            self._remove(path)
+
+    def _read_version_file(self) -> Tuple[str, int]:
+        """Return ``(epoch, version)``; the file holds ``"<epoch> <version>"``."""
+        try:
+            with open(self._version_path, "r", encoding="ascii") as handle:
+                epoch, version = handle.read().split()
+                return epoch, int(version)
+        except (OSError, ValueError):
+            return "", 0
+
+    def get_version(self) -> int:
+        return self._read_version_file()[1]
+
+    def get_epoch(self) -> str:
+        epoch = self._read_version_file()[0]
+        if not epoch:
+            # Start a fresh sequence so counters from a wiped directory never
+            # collide with tags handed out before the wipe.
+            self.bump_version()
+            epoch = self._read_version_file()[0]
+        return epoch
+
+    def get_last_modified(self) -> float:
+        try:
+            return os.path.getmtime(self._version_path)
+        except OSError:
+            return time.time()
+
+    def bump_version(self) -> int:
+        with open(self._lock_path, "a+") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                epoch, version = self._read_version_file()
+                epoch = epoch or uuid.uuid4().hex[:12]
+                version += 1
+                tmp_path = f"{self._version_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="ascii") as handle:
+                    handle.write(f"{epoch} {version}")
+                os.replace(tmp_path, self._version_path)
+                return version
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        return len(self._entry_paths())
+
+
+class AnalyticsCache:
+    """Memoizes analytics results under the current dataset version."""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> int:
+        return self.backend.get_version()
+
+    @property
+    def epoch(self) -> str:
+        return self.backend.get_epoch()
+
+    @property
+    def last_modified(self) -> float:
+        return self.backend.get_last_modified()
+
+    @property
+    def shared(self) -> bool:
+        return self.backend.shared
+
+    def bump(self) -> int:
+        return self.backend.bump_version()
+
+    def get_or_compute(self, name: str, compute: Callable[[], Any], *key_parts: Any) -> Any:
+        key = f"{name}:v{self.version}:{key_parts!r}"
+        value = self.backend.get(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        self.backend.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "version": self.version,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def build_cache(
+    backend: str = "memory",
+    directory: Optional[str] = None,
+    max_entries: int = 256,
+    ttl: float = 300.0,
+) -> Optional[AnalyticsCache]:
+    """Create the cache configured by ``ANALYTICS_CACHE_*`` settings.
+
+    ``backend`` is ``"memory"``, ``"file"`` or ``"none"`` (caching disabled).
+    """
+    if backend == "none":
+        return None
+    if backend == "file":
+        if not directory:
+            raise ValueError("ANALYTICS_CACHE_DIR is required for the file cache backend")
+        return AnalyticsCache(FileCacheBackend(directory, max_entries, ttl))
+    if backend == "memory":
+        return AnalyticsCache(MemoryCacheBackend(max_entries, ttl))
+    raise ValueError(f"Unknown analytics cache backend: {backend!r}")
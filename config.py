@@ -2,19 +2,120 @@ import os
 from typing import Optional, Type
 
 
-class Config:
-    SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-key-change-me")
-    SQLALCHEMY_DATABASE_URI = os.environ.get(
+def _database_url() -> str:
+    url = os.environ.get(
         "DATABASE_URL",
         f"sqlite:///{os.path.join(os.path.dirname(__file__), 'instance', 'app.db')}",
     )
+    # Heroku-style URLs use a scheme SQLAlchemy 1.4+ no longer accepts.
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://") :]
+    return url
+
+
+class Config:
+    SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-key-change-me")
+    SQLALCHEMY_DATABASE_URI = _database_url()
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Optional read-only database for the public pages and read endpoints: a
+    # replica DSN, or the primary SQLite file opened read-only with
+    # sqlite:///file:/path/to/app.db?mode=ro&uri=true. Writes and signed-in
+    # endpoints always use DATABASE_URL.
+    READ_REPLICA_URL = os.environ.get("READ_REPLICA_URL", "")
+    # Seconds after a dataset write during which replica reads go to the
+    # primary, so analytics cached under the new version include the write.
+    READ_REPLICA_MAX_LAG = float(os.environ.get("READ_REPLICA_MAX_LAG", "5"))
     JSON_SORT_KEYS = False
 
+    # Analytics cache: "memory" (per process), "file" (shared by all workers;
+    # use a tmpfs directory such as /dev/shm/csgrad-cache for a RAM-backed
+    # copy) or "none".
+    ANALYTICS_CACHE_BACKEND = os.environ.get("ANALYTICS_CACHE_BACKEND", "memory")
+    ANALYTICS_CACHE_DIR = os.environ.get(
+        "ANALYTICS_CACHE_DIR",
+        os.path.join(os.path.dirname(__file__), "instance", "cache"),
+    )
+    ANALYTICS_CACHE_TTL = float(os.environ.get("ANALYTICS_CACHE_TTL", 300))
+    ANALYTICS_CACHE_MAX_ENTRIES = int(os.environ.get("ANALYTICS_CACHE_MAX_ENTRIES", 256))
+    # Cache-Control max-age for public read endpoints; clients and proxies
+    # revalidate with If-None-Match afterwards.
+    PUBLIC_CACHE_MAX_AGE = int(os.environ.get("PUBLIC_CACHE_MAX_AGE", 60))
+    # Written by `flask train-admission-model`; match suggestions fall back to
+    # the GPA/GRE gap heuristic while the file is missing.
+    ADMISSION_MODEL_PATH = os.environ.get(
+        "ADMISSION_MODEL_PATH",
+        os.path.join(os.path.dirname(__file__), "instance", "admission_model.bin"),
+    )
+    # Admit probabilities below the reach cutoff are reaches and those from the
+    # safe cutoff up are safeties. Empty uses the model's own cutoffs, the
+    # terciles of its calibrated training probabilities.
+    MATCH_REACH_PROBABILITY = os.environ.get("MATCH_REACH_PROBABILITY", "")
+    MATCH_SAFE_PROBABILITY = os.environ.get("MATCH_SAFE_PROBABILITY", "")
+    # Seconds before a worker rebuilds its nearest-neighbour index, which picks
+    # up updates and deletes made by other workers.
+    NEIGHBOR_INDEX_MAX_AGE = float(os.environ.get("NEIGHBOR_INDEX_MAX_AGE", 600))
+    # Keep the user's id and email in the signed session cookie so requests
+    # that only need them skip the users-table lookup.
+    SESSION_USER_SNAPSHOT = os.environ.get("SESSION_USER_SNAPSHOT", "1") == "1"
+    # Add an X-Query-Count header with the number of SQL statements a request ran.
+    QUERY_COUNT_HEADER = os.environ.get("QUERY_COUNT_HEADER", "0") == "1"
+    # Add a Server-Timing header with the request's SQL count, DB time and total time.
+    SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER", "0") == "1"
+    # Log statements slower than this (milliseconds) with their query plan; 0 disables.
+    SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 500))
+    # Development only: with debug or testing on, a request that runs more SQL
+    # statements than this raises QueryBudgetExceeded (catches N+1 loops); 0 disables.
+    QUERY_BUDGET = int(os.environ.get("QUERY_BUDGET", 0))
+    # SQLite pragmas applied to every new connection; set one to "" to keep
+    # SQLite's default. WAL lets readers run while a write is in progress.
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "wal")
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "normal")
+    SQLITE_BUSY_TIMEOUT_MS = os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")
+    SQLITE_MMAP_SIZE = os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))
+    # Negative values are KiB: -65536 is a 64 MiB page cache per connection.
+    SQLITE_CACHE_SIZE = os.environ.get("SQLITE_CACHE_SIZE", "-65536")
+    # Queue write transactions behind one process- and file-wide lock instead
+    # of letting concurrent writers race for SQLite's lock.
+    SQLITE_SERIALIZE_WRITES = os.environ.get("SQLITE_SERIALIZE_WRITES", "0") == "1"
+    # Connection pool for server databases (PostgreSQL). DB_MAX_CONNECTIONS is
+    # this app's share of the server's max_connections, split between the
+    # WEB_CONCURRENCY worker processes (gunicorn reads the same variable);
+    # each worker pools WEB_THREADS connections plus as many as overflow.
+    # Set DB_POOL_SIZE / DB_MAX_OVERFLOW to override the derived values.
+    WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 1))
+    WEB_THREADS = int(os.environ.get("WEB_THREADS", 1))
+    DB_MAX_CONNECTIONS = int(os.environ.get("DB_MAX_CONNECTIONS", 80))
+    DB_POOL_SIZE = os.environ.get("DB_POOL_SIZE", "")
+    DB_MAX_OVERFLOW = os.environ.get("DB_MAX_OVERFLOW", "")
+    # Recycle connections before idle timeouts in the server or a proxy (PgBouncer).
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+    # Prometheus metrics at /metrics, off unless METRICS_ENABLED=1. Each worker
+    # process writes its own file in METRICS_DIR and the endpoint sums them;
+    # run gunicorn with gunicorn.conf.py so the directory is cleared on start
+    # and exited workers are archived. Set METRICS_TOKEN to require
+    # "Authorization: Bearer <token>".
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "0") == "1"
+    METRICS_DIR = os.environ.get(
+        "METRICS_DIR",
+        os.path.join(os.path.dirname(__file__), "instance", "metrics"),
+    )
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+    # Comma-separated emails allowed to call /api/admin/* endpoints.
+    ADMIN_EMAILS = {
+        email.strip().lower()
+        for email in os.environ.get("ADMIN_EMAILS", "").split(",")
+        if email.strip()
+    }
+    # Account that owns rows loaded by `flask import-applications`.
+    IMPORT_USER_EMAIL = os.environ.get("IMPORT_USER_EMAIL", "imports@localhost")
+
 
 class TestConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    READ_REPLICA_URL = ""
+    METRICS_ENABLED = False
 
 
 config_by_name: dict[str, Type[Config]] = {
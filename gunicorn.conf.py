@@ -0,0 +1,25 @@
+"""Gunicorn settings: ``gunicorn -c gunicorn.conf.py app:app``.
+
+Worker processes and threads follow ``WEB_CONCURRENCY`` / ``WEB_THREADS``,
+the same values the connection pool is sized from. With metrics enabled the
+hooks keep ``METRICS_DIR`` in step with the workers (see ``metrics.py``).
+"""
+
+import metrics
+from config import Config
+
+
+workers = Config.WEB_CONCURRENCY
+threads = Config.WEB_THREADS
+
+
+def on_starting(server):
+    """Drop samples left by a previous run before any worker starts."""
+    if Config.METRICS_ENABLED:
+        metrics.clear(Config.METRICS_DIR)
+
+
+def child_exit(server, worker):
+    """Archive an exited worker's counters and stop counting its gauges."""
+    if Config.METRICS_ENABLED:
+        metrics.mark_process_dead(Config.METRICS_DIR, worker.pid)
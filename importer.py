@@ -0,0 +1,379 @@
+"""Bulk import of historical application records from CSV or NDJSON.
+
+Rows are streamed from the source, normalised (result spelling, degree,
+country, GPA scale), fingerprinted, and inserted in chunks: each chunk is one
+executemany INSERT (a ``COPY`` on PostgreSQL) and one commit. Duplicates are
+detected through the ``import_key`` fingerprint, which has a unique index.
+Rows with a ``source_id`` are keyed by it, so overlapping sources never load
+the same record twice. Other rows are keyed by their normalised content:
+re-running an import, or loading a file with rows added or reordered, skips
+the records already present, and the n-th repeat of identical content within
+one file gets its own key so identical applicants are all kept. Apart from
+those per-file repeat counts (one entry per distinct row), memory use is
+bounded by the chunk size whatever the file size. A chunk that collides with
+a concurrent import is retried row by row, the collisions counted as
+duplicates.
+
+Core inserts bypass the ORM hooks that maintain the analytics summaries, so
+callers rebuild those afterwards, including after a failed import whose
+earlier chunks were committed (``app.import_application_file`` does).
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import math
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+import postgres_backend
+
+
+FORMATS = ("csv", "ndjson")
+RESULT_ALIASES = {
+    "accept": "Accept",
+    "accepted": "Accept",
+    "admit": "Accept",
+    "admitted": "Accept",
+    "offer": "Accept",
+    "reject": "Reject",
+    "rejected": "Reject",
+    "denied": "Reject",
+    "deny": "Reject",
+    "waitlist": "Waitlist",
+    "waitlisted": "Waitlist",
+    "wait list": "Waitlist",
+    "wait-listed": "Waitlist",
+    "interview": "Interview",
+    "pending": "Pending",
+}
+DEGREE_ALIASES = {
+    "ms": "Master",
+    "m.s.": "Master",
+    "msc": "Master",
+    "m.sc.": "Master",
+    "meng": "Master",
+    "master": "Master",
+    "masters": "Master",
+    "master's": "Master",
+    "phd": "PhD",
+    "ph.d.": "PhD",
+    "ph.d": "PhD",
+    "doctorate": "PhD",
+}
+COUNTRY_ALIASES = {
+    "us": "USA",
+    "u.s.": "USA",
+    "usa": "USA",
+    "united states": "USA",
+    "united states of america": "USA",
+    "uk": "UK",
+    "u.k.": "UK",
+    "united kingdom": "UK",
+    "england": "UK",
+    "scotland": "UK",
+    "great britain": "UK",
+    "korea": "South Korea",
+    "republic of korea": "South Korea",
+    "hk": "Hong Kong",
+}
+GPA_SCALES = (4.0, 4.3, 5.0, 10.0, 20.0, 100.0)
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+FALSE_VALUES = {"", "0", "false", "f", "no", "n"}
+TEXT_FIELDS = ["university", "program", "funding", "notes", "recommendation_strength"]
+# Columns written for every row; executemany needs identical keys per row.
+INSERT_FIELDS = [
+    "user_id",
+    "university",
+    "program",
+    "country",
+    "degree",
+    "term",
+    "result",
+    "funding",
+    "notes",
+    "gpa",
+    "gpa_scale",
+    "gre_total",
+    "research_experience",
+    "internship_experience",
+    "recommendation_strength",
+    "import_key",
+    "created_at",
+    "updated_at",
+]
+KEY_FIELDS = ["university", "program", "degree", "term", "result", "gpa", "gpa_scale", "gre_total"]
+# Also fingerprinted for rows without a source_id, with their repeat count.
+ROW_FIELDS = KEY_FIELDS + [
+    "country",
+    "funding",
+    "notes",
+    "research_experience",
+    "internship_experience",
+    "recommendation_strength",
+]
+MAX_ERRORS = 50
+DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class ImportStats:
+    """Running totals for one import."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def record_error(self, line: int, message: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "read": self.read,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "seconds": round(self.elapsed, 2),
+            "rows_per_second": round(self.read / self.elapsed) if self.elapsed else 0,
+            "errors": self.errors,
+        }
+
+
+def detect_format(name: Optional[str], requested: Optional[str] = None) -> str:
+    if requested:
+        if requested not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        return requested
+    if name and name.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Yield ``(line_number, raw_row)`` pairs without loading the whole file."""
+    if fmt == "ndjson":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError:
+                yield line_number, None
+    else:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _boolean(value: Any, field: str) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = (_text(value) or "").lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"{field} must be a boolean")
+
+
+def normalize_country(value: Any) -> Optional[str]:
+    text = _text(value)
+    if text is None:
+        return None
+    alias = COUNTRY_ALIASES.get(text.lower())
+    if alias:
+        return alias
+    return text.title() if text.islower() or (text.isupper() and len(text) > 3) else text
+
+
+def normalize_gpa(gpa: Any, scale: Any) -> Tuple[Optional[float], Optional[float]]:
+    """Parse a GPA (``3.7`` or ``"3.7/4.0"``) and infer the scale when missing."""
+    text = _text(gpa)
+    if text is None:
+        return None, None
+    if "/" in text:
+        text, scale = text.split("/", 1)
+    try:
+        value = float(text)
+        scale_value = float(scale) if _text(scale) else None
+    except ValueError:
+        raise ValueError("gpa and gpa_scale must be numbers") from None
+    if not math.isfinite(value) or (scale_value is not None and not math.isfinite(scale_value)):
+        raise ValueError("gpa and gpa_scale must be numbers")
+    if scale_value is None:
+        scale_value = next((option for option in GPA_SCALES if value <= option), None)
+    if value <= 0 or scale_value is None or value > scale_value:
+        raise ValueError("gpa must be positive and not exceed gpa_scale")
+    return value, scale_value
+
+
+def normalize_row(
+    raw: Any, user_id: int, now: datetime, occurrences: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """Return an insertable row or raise ``ValueError`` describing the problem.
+
+    ``occurrences`` counts the content keys seen so far in the same source, so
+    repeats of identical rows without a ``source_id`` get distinct keys.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("Row is not an object")
+    row: Dict[str, Any] = {field: _text(raw.get(field)) for field in TEXT_FIELDS}
+    if not row["university"] or not row["program"]:
+        raise ValueError("university and program are required")
+    result = (_text(raw.get("result")) or "").lower()
+    if result not in RESULT_ALIASES:
+        raise ValueError(f"Unknown result {raw.get('result')!r}")
+    row["result"] = RESULT_ALIASES[result]
+    degree = _text(raw.get("degree"))
+    row["degree"] = DEGREE_ALIASES.get(degree.lower(), degree) if degree else None
+    term = _text(raw.get("term"))
+    row["term"] = " ".join(part.capitalize() for part in term.split()) if term else None
+    row["country"] = normalize_country(raw.get("country"))
+    row["gpa"], row["gpa_scale"] = normalize_gpa(raw.get("gpa"), raw.get("gpa_scale"))
+
+    gre = _text(raw.get("gre_total"))
+    try:
+        row["gre_total"] = int(float(gre)) if gre else None
+    except (ValueError, OverflowError):  # int(inf) overflows
+        raise ValueError("gre_total must be a number") from None
+    if row["gre_total"] is not None and not 260 <= row["gre_total"] <= 340:
+        raise ValueError("gre_total must be between 260 and 340")
+    for field in ("research_experience", "internship_experience"):
+        row[field] = _boolean(raw.get(field), field)
+
+    created = _text(raw.get("created_at"))
+    try:
+        row["created_at"] = datetime.fromisoformat(created) if created else now
+    except ValueError:
+        raise ValueError("created_at must be an ISO 8601 date") from None
+    row["updated_at"] = now
+    row["user_id"] = user_id
+    source_id = _text(raw.get("source_id"))
+    key = import_key(row, source_id, created)
+    if not source_id and occurrences is not None:
+        repeat = occurrences.get(key, 0)
+        occurrences[key] = repeat + 1
+        if repeat:
+            key = import_key(row, source_id, created, repeat)
+    row["import_key"] = key
+    return row
+
+
+def import_key(
+    row: Dict[str, Any],
+    source_id: Optional[str] = None,
+    created: Optional[str] = None,
+    repeat: int = 0,
+) -> str:
+    """Fingerprint of the normalised row and the source's own id.
+
+    Without a ``source_id`` every column is hashed, plus ``repeat``: how many
+    identical rows came before this one in the same source.
+    """
+    fields = KEY_FIELDS if source_id else ROW_FIELDS
+    parts = [str(row.get(field) or "").lower() for field in fields]
+    if source_id:
+        parts.append(source_id)
+    else:
+        parts.append(created or "")
+        if repeat:
+            parts.append(str(repeat))
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def import_rows(
+    session: Any,
+    table: Any,
+    rows: Iterable[Tuple[int, Any]],
+    user_id: int,
+    chunk_size: int = 5000,
+    progress: Optional[Callable[[ImportStats], None]] = None,
+    stats: Optional[ImportStats] = None,
+) -> ImportStats:
+    """Normalise, dedupe and insert ``rows`` into ``table`` one chunk per commit.
+
+    Pass ``stats`` to keep the totals of the chunks already committed when a
+    later chunk fails.
+    """
+    stats = stats if stats is not None else ImportStats()
+    chunk: List[Dict[str, Any]] = []
+    occurrences: Dict[str, int] = {}
+    for line_number, raw in rows:
+        stats.read += 1
+        try:
+            chunk.append(normalize_row(raw, user_id, datetime.utcnow(), occurrences))
+        except ValueError as exc:
+            stats.record_error(line_number, str(exc))
+        if len(chunk) >= chunk_size:
+            _insert_chunk(session, table, chunk, stats)
+            chunk = []
+            if progress:
+                progress(stats)
+    if chunk:
+        _insert_chunk(session, table, chunk, stats)
+    if progress:
+        progress(stats)
+    return stats
+
+
+def _insert_chunk(session: Any, table: Any, chunk: List[Dict[str, Any]], stats: ImportStats) -> None:
+    keys = {row["import_key"] for row in chunk}
+    existing = set(
+        session.execute(
+            table.select().with_only_columns(table.c.import_key).where(table.c.import_key.in_(keys))
+        ).scalars()
+    )
+    fresh: Dict[str, Dict[str, Any]] = {}
+    for row in chunk:
+        if row["import_key"] in existing or row["import_key"] in fresh:
+            stats.duplicates += 1
+        else:
+            fresh[row["import_key"]] = {field: row[field] for field in INSERT_FIELDS}
+    try:
+        if fresh:
+            postgres_backend.insert_rows(session.connection(), table, list(fresh.values()))
+        session.commit()
+    except IntegrityError:
+        # A concurrent import committed some of these keys after the check.
+        session.rollback()
+        inserted = _insert_each(session, table, list(fresh.values()))
+        session.commit()
+        stats.duplicates += len(fresh) - inserted
+        stats.inserted += inserted
+        return
+    stats.inserted += len(fresh)
+
+
+def _insert_each(session: Any, table: Any, rows: List[Dict[str, Any]]) -> int:
+    """Insert ``rows`` one at a time, skipping keys that already exist."""
+    connection = session.connection()
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = DIALECT_INSERTS[dialect](table).on_conflict_do_nothing(
+            index_elements=["import_key"]
+        )
+    else:
+        insert = table.insert().prefix_with("IGNORE")  # MySQL
+    return sum(connection.execute(insert, row).rowcount for row in rows)
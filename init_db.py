@@ -1,21 +1,36 @@
 #!/usr/bin/env python3
 """
 Database initialization script with realistic CS graduate application data.
-Generates 500+ application records with varied universities, programs, degrees, and outcomes.
+Generates users with profiles, background records and 3-8 application records
+each across varied universities, programs, degrees, and outcomes.
+
+Rows are generated column-wise with NumPy in blocks of users and written with
+Core bulk inserts (``COPY`` on PostgreSQL), optionally from a process pool;
+``--users 200000`` yields about 1.1M applications.
 """
 
-import random
+import argparse
+import os
+import secrets
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Index, create_engine, select
+
+import migrations
+import postgres_backend
+import search_index
+import snapshots
 from app import create_app, db
 from app import (
-    User,
-    Profile,
-    Education,
-    TestScore,
-    Experience,
-    Publication,
-    RecommendationLetter,
     ApplicationRecord,
+    bump_dataset_version,
+    rebuild_analytics_summaries,
 )
 
 
@@ -208,255 +223,446 @@ JOURNALS = ["Q1", "Q2", "Q3", "Q4"]
 RECOMMENDATION_TYPES = ["Research Advisor", "Course Instructor", "Employer"]
 
 
-def generate_email(first_name: str, last_name: str) -> str:
-    """Generate a unique email address."""
-    return f"{first_name.lower()}.{last_name.lower()}{random.randint(100, 9999)}@example.com"
-
-
-def generate_gpa() -> tuple[float, float]:
-    """Generate realistic GPA with scale."""
-    # Most students have GPA between 3.0 and 4.0
-    gpa = round(random.gauss(3.6, 0.3), 2)
-    gpa = max(0.0, min(4.0, gpa))
-    return gpa, 4.0
-
+ROLE_TITLES = ["Software Engineer", "Research Assistant", "Data Scientist", "Intern", "ML Engineer"]
 
-def generate_gre_score() -> int:
-    """Generate realistic GRE score (260-340 range)."""
-    # Most scores concentrated around 320-330
-    score = int(random.gauss(320, 12))
-    score = max(260, min(340, score))
-    return score
+VENUES = ["ICML", "NeurIPS", "ICCV", "CVPR", "ACL", "IEEE"]
 
+RECOMMENDER_NAMES = [
+    "Prof. Johnson",
+    "Dr. Chen",
+    "Prof. Smith",
+    "Dr. Davis",
+    "Prof. Kumar",
+    "Dr. Martinez",
+]
 
-def generate_toefl_score() -> int:
-    """Generate realistic TOEFL score (0-120 range)."""
-    # Most non-native speakers score 90-110
-    score = int(random.gauss(100, 10))
-    score = max(0, min(120, score))
-    return score
+RECOMMENDATION_RATINGS = ["Strongly Recommend", "Recommend"]
+
+TERMS = ["Fall 2022", "Spring 2023", "Fall 2023", "Spring 2024", "Fall 2024"]
+
+FUNDING = ["Full Scholarship", "Partial Scholarship", "No Funding", "TA Position"]
+
+# Users are generated in fixed-size blocks, each with its own seed derived from
+# (seed, block number), so the data depends only on the seed and user count,
+# not on how blocks are spread over worker processes.
+BLOCK_USERS = 5000
+MAX_APPLICATIONS = 8
+# created_at values are spread over the two years before this instant.
+GENERATED_UNTIL = datetime(2024, 12, 31)
+# Parent tables first; only users keep their generated ids.
+LOAD_ORDER = [
+    "users",
+    "profiles",
+    "educations",
+    "test_scores",
+    "experiences",
+    "publications",
+    "recommendation_letters",
+    "application_records",
+]
 
 
-def generate_admission_result() -> str:
-    """Generate realistic admission result with varying probabilities."""
-    # Top programs: 10-30% admit rate
-    # Mid programs: 30-50% admit rate
-    # Easier programs: 50-80% admit rate
-    r = random.random()
-    if r < 0.25:
-        return "Accept"
-    elif r < 0.5:
-        return "Reject"
+def _choice(rng: np.random.Generator, options: Sequence[Any], size: int) -> List[Any]:
+    return np.asarray(options, dtype=object)[rng.integers(len(options), size=size)].tolist()
+
+
+def _optional(values: np.ndarray, present: np.ndarray) -> List[Any]:
+    """``values`` as Python scalars, with ``None`` where ``present`` is false."""
+    return [value if keep else None for value, keep in zip(values.tolist(), present.tolist())]
+
+
+def _rows(**columns: Sequence[Any]) -> List[Dict[str, Any]]:
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def _timestamps(rng: np.random.Generator, size: int) -> List[datetime]:
+    minutes = rng.integers(0, 2 * 365 * 24 * 60, size=size).tolist()
+    return [GENERATED_UNTIL - timedelta(minutes=offset) for offset in minutes]
+
+
+def generate_block(
+    block: int, seed: int, num_users: int, block_users: int = BLOCK_USERS
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Generate the rows for users ``block * block_users + 1`` onwards.
+
+    Values are drawn as NumPy arrays per column (same distributions as the
+    original per-user generator) and returned as insert-ready dicts keyed by
+    table name.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(block,)))
+    first = block * block_users + 1
+    n = min(block_users, num_users - first + 1)
+    user_ids = np.arange(first, first + n)
+    ids = user_ids.tolist()
+    first_names = _choice(rng, FIRST_NAMES, n)
+    last_names = _choice(rng, LAST_NAMES, n)
+    created = _timestamps(rng, n)
+    rows: Dict[str, List[Dict[str, Any]]] = {}
+
+    rows["users"] = _rows(
+        id=ids,
+        email=[
+            f"{first.lower()}.{last.lower()}.{user_id}@example.com"
+            for first, last, user_id in zip(first_names, last_names, ids)
+        ],
+        password_hash=["hashed_password_placeholder"] * n,
+        created_at=created,
+        updated_at=created,
+    )
+
+    # Profiles; applications copy these numbers.
+    gpa = np.clip(np.round(rng.normal(3.6, 0.3, n), 2), 0.0, 4.0)
+    gre = np.clip(rng.normal(320, 12, n).astype(int), 260, 340)
+    has_gre = rng.random(n) > 0.3
+    toefl = np.clip(rng.normal(100, 10, n).astype(int), 0, 120)
+    research = rng.random(n) > 0.4
+    internship = rng.random(n) > 0.3
+    recommendation = _choice(rng, RECOMMENDATION_RATINGS, n)
+    rows["profiles"] = _rows(
+        user_id=ids,
+        preferred_name=[f"{first} {last}" for first, last in zip(first_names, last_names)],
+        gpa=gpa.tolist(),
+        gpa_scale=[4.0] * n,
+        gre_total=_optional(gre, has_gre),
+        toefl_total=_optional(toefl, rng.random(n) > 0.5),
+        research_experience=research.tolist(),
+        internship_experience=internship.tolist(),
+        recommendation_strength=recommendation,
+        notes=[f"Applicant {user_id}" for user_id in ids],
+        created_at=created,
+        updated_at=created,
+    )
+
+    rows["educations"] = _rows(
+        user_id=ids,
+        institution=_choice(rng, UNIVERSITIES_UNDERGRAD, n),
+        degree=np.where(rng.random(n) > 0.2, "Bachelor", "Master").tolist(),
+        field_of_study=["Computer Science"] * n,
+        start_year=rng.integers(2015, 2021, n).tolist(),
+        end_year=rng.integers(2019, 2024, n).tolist(),
+        gpa=np.round(rng.uniform(2.8, 4.0, n), 2).tolist(),
+        gpa_scale=[4.0] * n,
+        currently_enrolled=[False] * n,
+        created_at=created,
+        updated_at=created,
+    )
+
+    # 80% have a GRE record, 60% a TOEFL or IELTS record.
+    gre_users = user_ids[rng.random(n) > 0.2]
+    sections = rng.integers([150, 150, 3], [171, 171, 7], size=(len(gre_users), 3)).tolist()
+    english_users = user_ids[rng.random(n) > 0.4]
+    is_toefl = rng.random(len(english_users)) < 0.5
+    english_scores = np.where(
+        is_toefl,
+        np.clip(rng.normal(100, 10, len(english_users)).astype(int), 0, 120),
+        rng.integers(6, 10, len(english_users)),
+    )
+    score_count = len(gre_users) + len(english_users)
+    test_dates = [
+        f"{year}-{month:02d}"
+        for year, month in zip(
+            rng.integers(2021, 2024, score_count).tolist(),
+            rng.integers(1, 13, score_count).tolist(),
+        )
+    ]
+    score_created = _timestamps(rng, score_count)
+    rows["test_scores"] = _rows(
+        user_id=gre_users.tolist() + english_users.tolist(),
+        test_type=["GRE"] * len(gre_users) + np.where(is_toefl, "TOEFL", "IELTS").tolist(),
+        total_score=np.clip(rng.normal(320, 12, len(gre_users)).astype(int), 260, 340).tolist()
+        + english_scores.tolist(),
+        section=["Quantitative"] * len(gre_users) + [None] * len(english_users),
+        score_details=[f"Q: {q}, V: {v}, AW: {aw}" for q, v, aw in sections]
+        + [None] * len(english_users),
+        test_date=test_dates,
+        created_at=score_created,
+        updated_at=score_created,
+    )
+
+    experience_users = np.repeat(user_ids, rng.integers(1, 4, n))
+    m = len(experience_users)
+    experience_created = _timestamps(rng, m)
+    rows["experiences"] = _rows(
+        user_id=experience_users.tolist(),
+        category=_choice(rng, ["Work", "Research", "Internship"], m),
+        organization=_choice(rng, COMPANIES, m),
+        role_title=_choice(rng, ROLE_TITLES, m),
+        description=["Worked on various projects and tasks"] * m,
+        start_date=[
+            f"{year}-{month:02d}"
+            for year, month in zip(
+                rng.integers(2019, 2023, m).tolist(), rng.integers(1, 13, m).tolist()
+            )
+        ],
+        end_date=[
+            f"{year}-{month:02d}"
+            for year, month in zip(
+                rng.integers(2020, 2024, m).tolist(), rng.integers(1, 13, m).tolist()
+            )
+        ],
+        ongoing=(rng.random(m) > 0.7).tolist(),
+        created_at=experience_created,
+        updated_at=experience_created,
+    )
+
+    # 40% have one to three publications.
+    publication_counts = np.where(rng.random(n) > 0.6, rng.integers(1, 4, n), 0)
+    publication_users = np.repeat(user_ids, publication_counts)
+    paper_numbers = (
+        np.arange(len(publication_users))
+        - np.repeat(np.cumsum(publication_counts) - publication_counts, publication_counts)
+        + 1
+    ).tolist()
+    m = len(publication_users)
+    publication_created = _timestamps(rng, m)
+    rows["publications"] = _rows(
+        user_id=publication_users.tolist(),
+        title=[
+            f"Research Paper {number}: Novel Approach to CS Problem" for number in paper_numbers
+        ],
+        venue=_choice(rng, VENUES, m),
+        year=rng.integers(2020, 2024, m).tolist(),
+        first_author=(rng.random(m) > 0.5).tolist(),
+        url=[f"https://example.com/paper{number}" for number in paper_numbers],
+        created_at=publication_created,
+        updated_at=publication_created,
+    )
+
+    # 90% have two to four recommendation letters.
+    letter_counts = np.where(rng.random(n) > 0.1, rng.integers(2, 5, n), 0)
+    letter_users = np.repeat(user_ids, letter_counts)
+    m = len(letter_users)
+    letter_created = _timestamps(rng, m)
+    rows["recommendation_letters"] = _rows(
+        user_id=letter_users.tolist(),
+        recommender_name=_choice(rng, RECOMMENDER_NAMES, m),
+        relationship=_choice(rng, RECOMMENDATION_TYPES, m),
+        rating=_choice(rng, RECOMMENDATION_RATINGS, m),
+        organization=_choice(rng, COMPANIES + UNIVERSITIES_UNDERGRAD, m),
+        notes=[
+            f"Strong recommendation for {first_names[i]}"
+            for i in (letter_users - first).tolist()
+        ],
+        created_at=letter_created,
+        updated_at=letter_created,
+    )
+
+    # Three to eight applications per user to distinct universities: rank the
+    # universities by a random key per user and keep the first ``count``.
+    counts = rng.integers(3, MAX_APPLICATIONS + 1, n)
+    ranked = rng.random((n, len(UNIVERSITIES))).argsort(axis=1)[:, :MAX_APPLICATIONS]
+    university_index = ranked[np.arange(MAX_APPLICATIONS)[None, :] < counts[:, None]]
+    owner = np.repeat(np.arange(n), counts)
+    m = len(owner)
+    universities = [UNIVERSITIES[i][0] for i in university_index.tolist()]
+    programs = _choice(rng, PROGRAMS, m)
+    # Roughly the original 25% accept / 25% reject / 50% waitlist split, with
+    # stronger GPAs admitted more often so the data has some signal to learn.
+    accept_probability = np.clip(0.25 + 0.1 * (gpa[owner] - 3.6) / 0.3, 0.05, 0.6)
+    draw = rng.random(m)
+    accepted = draw < accept_probability
+    rejected = ~accepted & (draw < accept_probability + (1 - accept_probability) / 3)
+    results = np.where(accepted, "Accept", np.where(rejected, "Reject", "Waitlist"))
+    application_created = _timestamps(rng, m)
+    rows["application_records"] = _rows(
+        user_id=user_ids[owner].tolist(),
+        university=universities,
+        program=programs,
+        country=[UNIVERSITIES[i][1] for i in university_index.tolist()],
+        degree=_choice(rng, ["Master", "PhD"], m),
+        term=_choice(rng, TERMS, m),
+        result=results.tolist(),
+        funding=_optional(np.asarray(_choice(rng, FUNDING, m), dtype=object), accepted),
+        notes=[
+            f"Application for {program} at {university}"
+            for program, university in zip(programs, universities)
+        ],
+        gpa=gpa[owner].tolist(),
+        gpa_scale=[4.0] * m,
+        gre_total=_optional(gre[owner], has_gre[owner]),
+        research_experience=research[owner].tolist(),
+        internship_experience=internship[owner].tolist(),
+        recommendation_strength=[recommendation[i] for i in owner.tolist()],
+        created_at=application_created,
+        updated_at=application_created,
+    )
+    return rows
+
+
+def bulk_indexes() -> List[Index]:
+    """Secondary indexes on the generated tables, built after the load."""
+    indexes = [index for name in LOAD_ORDER for index in db.metadata.tables[name].indexes]
+    # Sorted: Table.indexes is a set, and creation order shows up in snapshots.
+    return sorted(indexes, key=lambda index: index.name)
+
+
+def write_block(connection, rows: Dict[str, List[Dict[str, Any]]]) -> int:
+    """Insert one generated block with a Core executemany (or COPY) per table."""
+    written = 0
+    for name in LOAD_ORDER:
+        written += postgres_backend.insert_rows(connection, db.metadata.tables[name], rows[name])
+    return written
+
+
+def _write_shard(path: str, blocks: List[int], seed: int, num_users: int, block_users: int) -> int:
+    """Worker process: generate ``blocks`` into a fresh SQLite shard file."""
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    written = 0
+    with engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA journal_mode=OFF")
+        connection.exec_driver_sql("PRAGMA synchronous=OFF")
+        for index in bulk_indexes():
+            index.drop(connection)
+        for block in blocks:
+            written += write_block(connection, generate_block(block, seed, num_users, block_users))
+            connection.commit()
+    engine.dispose()
+    return written
+
+
+def merge_shard(path: str) -> None:
+    """Copy a shard's rows into the app database, in id order.
+
+    Child rows get fresh ids from the target; user ids are kept because they
+    were assigned globally when generating.
+    """
+    shard_engine = create_engine(f"sqlite:///{path}")
+    with db.engine.connect() as target:
+        same_dialect = target.dialect.name == "sqlite"
+        if same_dialect:
+            target.exec_driver_sql("ATTACH DATABASE ? AS shard", (path,))
+        for name in LOAD_ORDER:
+            table = db.metadata.tables[name]
+            columns = [
+                column.name for column in table.columns if name == "users" or column.name != "id"
+            ]
+            if same_dialect:
+                column_list = ", ".join(columns)
+                target.exec_driver_sql(
+                    f"INSERT INTO main.{name} ({column_list}) "
+                    f"SELECT {column_list} FROM shard.{name} ORDER BY id"
+                )
+                continue
+            statement = (
+                select(*[table.c[column] for column in columns])
+                .order_by(table.c.id)
+                .execution_options(yield_per=10_000)
+            )
+            with shard_engine.connect() as source:
+                for chunk in source.execute(statement).mappings().partitions():
+                    postgres_backend.insert_rows(target, table, [dict(row) for row in chunk])
+        target.commit()
+        if same_dialect:
+            target.exec_driver_sql("DETACH DATABASE shard")
+    shard_engine.dispose()
+
+
+def generate_synthetic_data(
+    num_users: int, seed: int, workers: int = 1, block_users: int = BLOCK_USERS
+) -> int:
+    """Generate ``num_users`` users with their profiles and applications.
+
+    Must run inside an app context on an empty schema. With ``workers > 1``
+    blocks are generated in a process pool, each worker writing a SQLite
+    shard file that is merged afterwards in block order, so the result is
+    identical to a single-process run with the same seed. Returns the number
+    of rows written.
+    """
+    blocks = list(range(-(-num_users // block_users)))
+    started = time.perf_counter()
+    written = 0
+    # Maintaining a dozen indexes row by row costs more than building them once.
+    with db.engine.begin() as connection:
+        for index in bulk_indexes():
+            index.drop(connection, checkfirst=True)
+
+    def report(done_blocks: int) -> None:
+        elapsed = time.perf_counter() - started
+        users = min(done_blocks * block_users, num_users)
+        print(f"  {users}/{num_users} users, {written} rows ({written / elapsed:,.0f} rows/s)")
+
+    if workers <= 1:
+        for done, block in enumerate(blocks, start=1):
+            with db.engine.begin() as connection:
+                rows = generate_block(block, seed, num_users, block_users)
+                written += write_block(connection, rows)
+            report(done)
     else:
-        return "Waitlist"
-
-
-def create_sample_data():
-    """Create sample data for CS graduate applications."""
-    app = create_app()
+        shards = [shard.tolist() for shard in np.array_split(blocks, workers) if len(shard)]
+        workdir = tempfile.mkdtemp(prefix="init-db-shards-")
+        paths = [os.path.join(workdir, f"shard{index}.db") for index in range(len(shards))]
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_write_shard, path, shard, seed, num_users, block_users)
+                    for path, shard in zip(paths, shards)
+                ]
+                for future in futures:
+                    written += future.result()
+            rate = written / (time.perf_counter() - started)
+            print(f"  generated {written} rows in {len(paths)} shards ({rate:,.0f} rows/s)")
+            for path in paths:
+                merge_shard(path)
+            report(len(blocks))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with db.engine.begin() as connection:
+        for index in bulk_indexes():
+            index.create(connection)
+        # Users were written with explicit ids; move the id sequences past them.
+        postgres_backend.after_bulk_load(
+            connection, [db.metadata.tables[name] for name in LOAD_ORDER]
+        )
+    # Bulk inserts skip the search triggers (dropped with the tables) and the
+    # summary hooks; rebuild both once.
+    search_index.ensure_search_index(db.engine)
+    rebuild_analytics_summaries()
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written} rows in {elapsed:.1f}s ({written / elapsed:,.0f} rows/s)")
+    return written
+
+
+def create_sample_data(
+    num_users: int = 100,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    block_users: int = BLOCK_USERS,
+    snapshot: Optional[str] = None,
+):
+    """Create sample data for CS graduate applications.
+
+    With ``snapshot`` the data is generated into a temporary database and
+    saved as a compressed snapshot instead of replacing the configured one.
+    """
+    workdir = tempfile.mkdtemp(prefix="init-db-") if snapshot else None
+    overrides = None
+    if workdir:
+        overrides = {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(workdir, 'snapshot.db')}",
+            "ANALYTICS_CACHE_BACKEND": "none",
+        }
+    app = create_app(config_overrides=overrides)
 
     with app.app_context():
         # Clear existing data
         db.drop_all()
         db.create_all()
 
-        print("Starting data initialization...")
-
-        # Generate 500 application records with associated user data
-        num_users = 100  # 100 users, each with 5 applications on average
-        applications_created = 0
-
-        for user_idx in range(num_users):
-            # Create user
-            first_name = random.choice(FIRST_NAMES)
-            last_name = random.choice(LAST_NAMES)
-            email = generate_email(first_name, last_name)
-
-            user = User(
-                email=email,
-                password_hash="hashed_password_placeholder",
-            )
-            db.session.add(user)
-            db.session.flush()  # Get user ID
-
-            # Create profile
-            gpa, gpa_scale = generate_gpa()
-            profile = Profile(
-                user_id=user.id,
-                preferred_name=f"{first_name} {last_name}",
-                gpa=gpa,
-                gpa_scale=gpa_scale,
-                gre_total=generate_gre_score() if random.random() > 0.3 else None,
-                toefl_total=generate_toefl_score()
-                if random.random() > 0.5 else None,
-                research_experience=random.random() > 0.4,
-                internship_experience=random.random() > 0.3,
-                recommendation_strength=random.choice(
-                    ["Strongly Recommend", "Recommend"]
-                ),
-                notes=f"Applicant {user_idx + 1}",
+        if seed is None:
+            seed = secrets.randbits(32)
+        print(f"Starting data initialization ({num_users} users, seed {seed})...")
+        generate_synthetic_data(num_users, seed, workers, block_users)
+        if snapshot:
+            manifest = snapshots.write_snapshot(
+                db.engine, snapshot, {"generator": "init_db", "seed": seed, "users": num_users}
             )
-            db.session.add(profile)
-
-            # Create education records
-            edu = Education(
-                user_id=user.id,
-                institution=random.choice(UNIVERSITIES_UNDERGRAD),
-                degree="Bachelor" if random.random() > 0.2 else "Master",
-                field_of_study="Computer Science",
-                start_year=random.randint(2015, 2020),
-                end_year=random.randint(2019, 2023),
-                gpa=round(random.uniform(2.8, 4.0), 2),
-                gpa_scale=4.0,
-                currently_enrolled=False,
-            )
-            db.session.add(edu)
-
-            # Create test scores
-            if random.random() > 0.2:  # 80% have GRE
-                gre = TestScore(
-                    user_id=user.id,
-                    test_type="GRE",
-                    total_score=generate_gre_score(),
-                    section="Quantitative",
-                    score_details=f"Q: {random.randint(150, 170)}, V: {random.randint(150, 170)}, AW: {random.randint(3, 6)}",
-                    test_date=f"{random.randint(2021, 2023)}-{random.randint(1, 12):02d}",
-                )
-                db.session.add(gre)
-
-            if random.random() > 0.4:  # 60% have TOEFL/IELTS
-                test_type = random.choice(["TOEFL", "IELTS"])
-                score = TestScore(
-                    user_id=user.id,
-                    test_type=test_type,
-                    total_score=generate_toefl_score()
-                    if test_type == "TOEFL" else random.randint(6, 9),
-                    test_date=f"{random.randint(2021, 2023)}-{random.randint(1, 12):02d}",
-                )
-                db.session.add(score)
-
-            # Create experience records
-            num_experiences = random.randint(1, 3)
-            for _ in range(num_experiences):
-                exp = Experience(
-                    user_id=user.id,
-                    category=random.choice(["Work", "Research", "Internship"]),
-                    organization=random.choice(COMPANIES),
-                    role_title=random.choice(
-                        [
-                            "Software Engineer",
-                            "Research Assistant",
-                            "Data Scientist",
-                            "Intern",
-                            "ML Engineer",
-                        ]
-                    ),
-                    description="Worked on various projects and tasks",
-                    start_date=f"{random.randint(2019, 2022)}-{random.randint(1, 12):02d}",
-                    end_date=f"{random.randint(2020, 2023)}-{random.randint(1, 12):02d}",
-                    ongoing=random.random() > 0.7,
-                )
-                db.session.add(exp)
-
-            # Create publications (some have them, some don't)
-            if random.random() > 0.6:  # 40% have publications
-                num_pubs = random.randint(1, 3)
-                for pub_idx in range(num_pubs):
-                    pub = Publication(
-                        user_id=user.id,
-                        title=f"Research Paper {pub_idx + 1}: Novel Approach to CS Problem",
-                        venue=random.choice(
-                            ["ICML", "NeurIPS", "ICCV", "CVPR", "ACL", "IEEE"]
-                        ),
-                        year=random.randint(2020, 2023),
-                        first_author=random.random() > 0.5,
-                        url=f"https://example.com/paper{pub_idx + 1}",
-                    )
-                    db.session.add(pub)
-
-            # Create recommendation letters (most applicants have them)
-            if random.random() > 0.1:  # 90% have at least one recommendation letter
-                num_letters = random.randint(2, 4)
-                recommender_names = [
-                    "Prof. Johnson",
-                    "Dr. Chen",
-                    "Prof. Smith",
-                    "Dr. Davis",
-                    "Prof. Kumar",
-                    "Dr. Martinez",
-                ]
-                for letter_idx in range(num_letters):
-                    letter = RecommendationLetter(
-                        user_id=user.id,
-                        recommender_name=random.choice(recommender_names),
-                        relationship=random.choice(
-                            ["Research Advisor", "Course Instructor", "Employer"]
-                        ),
-                        rating=random.choice(
-                            ["Strongly Recommend", "Recommend"]
-                        ),
-                        organization=random.choice(COMPANIES + UNIVERSITIES_UNDERGRAD),
-                        notes=f"Strong recommendation for {first_name}",
-                    )
-                    db.session.add(letter)
-
-            db.session.commit()
-
-            # Create applications for this user
-            num_applications = random.randint(3, 8)
-            applied_universities = random.sample(UNIVERSITIES, num_applications)
-
-            for uni_idx, (university, country) in enumerate(applied_universities):
-                program = random.choice(PROGRAMS)
-                degree = random.choice(["Master", "PhD"])
-                semester = random.choice(
-                    ["Fall 2022", "Spring 2023", "Fall 2023", "Spring 2024", "Fall 2024"]
-                )
-                result = generate_admission_result()
-                funding = (
-                    random.choice(
-                        [
-                            "Full Scholarship",
-                            "Partial Scholarship",
-                            "No Funding",
-                            "TA Position",
-                        ]
-                    )
-                    if result == "Accept"
-                    else None
-                )
-
-                app_record = ApplicationRecord(
-                    user_id=user.id,
-                    university=university,
-                    program=program,
-                    country=country,
-                    degree=degree,
-                    term=semester,
-                    result=result,
-                    funding=funding,
-                    notes=f"Application for {program} at {university}",
-                    gpa=gpa,
-                    gpa_scale=gpa_scale,
-                    gre_total=profile.gre_total,
-                    research_experience=profile.research_experience,
-                    internship_experience=profile.internship_experience,
-                    recommendation_strength=profile.recommendation_strength,
-                )
-                db.session.add(app_record)
-                applications_created += 1
-
-            if (user_idx + 1) % 10 == 0:
-                print(f"Created {user_idx + 1} users, {applications_created} applications")
-                db.session.commit()
-
-        db.session.commit()
-        print(
-            f"\nDatabase initialization complete!"
-        )
-        print(
-            f"Created {num_users} users with {applications_created} total applications"
-        )
+            db.engine.dispose()
+            shutil.rmtree(workdir, ignore_errors=True)
+            print(f"Wrote snapshot {snapshot} (sha256 {manifest['sha256']})")
+            return
 
         # Print some statistics
         total_apps = ApplicationRecord.query.count()
@@ -482,5 +688,50 @@ def create_sample_data():
         print(f"  Unique Programs: {len(progs)}")
 
 
+def restore_database(path: str) -> Dict[str, Any]:
+    """Replace the configured database with a snapshot written by ``--snapshot``."""
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        manifest = snapshots.restore_snapshot(path, db.engine)
+        # Snapshots from an older release pick up newer migrations here.
+        migrations.upgrade(db.engine, db.metadata)
+        bump_dataset_version()
+        print(
+            f"Restored {path} (seed {manifest.get('seed')}, {manifest.get('users')} users) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Reset the database and fill it with synthetic data"
+    )
+    parser.add_argument(
+        "--users", type=int, default=100, help="Applicants to generate (~5.5 applications each)."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Random seed (printed when omitted)."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Generator processes writing shard files."
+    )
+    parser.add_argument(
+        "--block-users", type=int, default=BLOCK_USERS, help="Users per generated batch."
+    )
+    parser.add_argument(
+        "--snapshot", help="Write the generated data to this snapshot file instead of the database."
+    )
+    parser.add_argument(
+        "--restore", help="Replace the database with this snapshot instead of generating."
+    )
+    args = parser.parse_args()
+    if args.restore:
+        restore_database(args.restore)
+    else:
+        create_sample_data(args.users, args.seed, args.workers, args.block_users, args.snapshot)
+
+
 if __name__ == "__main__":
-    create_sample_data()
+    main()
@@ -0,0 +1,95 @@
+"""JSON provider that uses orjson when it is installed.
+
+orjson serializes the analytics and search payloads several times faster than
+the standard library and encodes ``datetime`` values natively, so projected
+rows can be handed over without per-row ``isoformat()`` calls. Without orjson
+the provider falls back to Flask's stdlib implementation with the same
+ISO 8601 datetime format, so responses look identical either way.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+
+def _default(o: Any) -> Any:
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson with a stdlib fallback."""
+
+    default = staticmethod(_default)  # type: ignore[assignment]
+    use_orjson = orjson is not None
+
+    # Keyword arguments orjson can honour; anything else (``cls``,
+    # ``ensure_ascii`` ...) is delegated to the stdlib encoder.
+    _ORJSON_KWARGS = {"indent", "separators", "sort_keys", "default"}
+
+    def _orjson_option(self, sort_keys: bool, indent: Any = None) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj: Any, **kwargs: Any) -> bytes:
+        if not self.use_orjson or not self._ORJSON_KWARGS.issuperset(kwargs):
+            return self.dumps(obj, **kwargs).encode("utf-8")
+        option = self._orjson_option(
+            kwargs.get("sort_keys", self.sort_keys), kwargs.get("indent")
+        )
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=option)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if self.use_orjson and self._ORJSON_KWARGS.issuperset(kwargs):
+            return self.dumps_bytes(obj, **kwargs).decode("utf-8")
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        if not self.use_orjson:
+            return super().response(obj)
+        body = self.dumps_bytes(obj, indent=2 if indent else None)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+    def iter_array(self, items: Iterable[Any], chunk_size: int = 500) -> Iterator[bytes]:
+        """Encode ``items`` as one JSON array, ``chunk_size`` elements at a time.
+
+        Memory stays bounded by the chunk, so large result sets can be
+        streamed straight from a cursor.
+        """
+        yield b"["
+        chunk = []
+        first = True
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield self._encode_chunk(chunk, first)
+                chunk = []
+                first = False
+        if chunk:
+            yield self._encode_chunk(chunk, first)
+        yield b"]\n"
+
+    def _encode_chunk(self, chunk: list, first: bool) -> bytes:
+        encoded = self.dumps_bytes(chunk)[1:-1]  # strip the chunk's own brackets
+        return encoded if first else b"," + encoded
@@ -0,0 +1,223 @@
+"""Vectorized reach/match/safe scoring over per-program admission stats.
+
+``ProgramMatrix`` stores the output of ``aggregate_program_stats`` as NumPy
+columns. It is built once per dataset version (the app caches it alongside
+the analytics), after which scoring profiles against every program is a few
+array operations and each bucket's top-k comes from ``np.partition``.
+Profiles are scored as a ``(profiles, programs)`` matrix, so a batch of
+what-if profiles costs one pass rather than one request each.
+
+When an ``admission_model.AdmissionModel`` is loaded, programs are bucketed
+by its calibrated admit probability instead of the weighted GPA/GRE gap.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+GPA_WEIGHT = 0.7
+GRE_WEIGHT = 0.3
+GRE_SCALE = 340.0
+BUCKET_MARGIN = 0.05
+# Upper bound on profiles x programs scored at once, to cap temporary memory.
+BLOCK_CELLS = 2_000_000
+
+Buckets = Dict[str, List[int]]
+
+
+def top_k_rows(keys: np.ndarray, k: int) -> List[List[int]]:
+    """Per row, the columns of the ``k`` smallest finite ``keys``.
+
+    Excluded cells are ``inf``. Ties are broken by column so results are
+    deterministic.
+    """
+    n_rows, n_columns = keys.shape
+    finite = np.isfinite(keys)
+    if n_columns > k:
+        # Keep every cell tied with the k-th key; the lexsort below decides.
+        kth = np.partition(keys, k - 1, axis=1)[:, k - 1]
+        finite &= keys <= kth[:, None]
+    rows, columns = np.nonzero(finite)
+    order = np.lexsort((columns, keys[rows, columns], rows))
+    rows, columns = rows[order], columns[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    keep = rank < k
+    chosen: List[List[int]] = [[] for _ in range(n_rows)]
+    for row, column in zip(rows[keep].tolist(), columns[keep].tolist()):
+        chosen[row].append(column)
+    return chosen
+
+
+def _bucket_rows(
+    reach: np.ndarray, match: np.ndarray, safe: np.ndarray, k: int
+) -> List[Buckets]:
+    per_bucket = {
+        "reach": top_k_rows(reach, k),
+        "match": top_k_rows(match, k),
+        "safe": top_k_rows(safe, k),
+    }
+    return [
+        {bucket: rows[index] for bucket, rows in per_bucket.items()}
+        for index in range(reach.shape[0])
+    ]
+
+
+class ProgramMatrix:
+    """Columnar snapshot of admitted-applicant statistics per program group."""
+
+    def __init__(self, stats: Dict[str, Dict[str, Any]]):
+        scored = [(key, info) for key, info in stats.items() if info.get("avg_gpa") is not None]
+        self.keys: List[str] = [key for key, _ in scored]
+        self.universities: List[str] = [info["university"] for _, info in scored]
+        self.programs: List[str] = [info["program"] for _, info in scored]
+        self.degrees: List[Optional[str]] = [info["degree"] for _, info in scored]
+        self.avg_gpa = np.array([info["avg_gpa"] for _, info in scored], dtype=np.float64)
+        self.avg_gre = np.array(
+            [info.get("avg_gre") or np.nan for _, info in scored], dtype=np.float64
+        )
+        self.admit_rate = np.array([info.get("admit_rate") or 0.0 for _, info in scored])
+        self.total = np.array([info["total"] for _, info in scored], dtype=np.int64)
+        self._aligned: Dict[Tuple[Optional[str], str], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _blocks(self, n_profiles: int) -> Iterator[slice]:
+        step = max(1, BLOCK_CELLS // max(len(self), 1))
+        for start in range(0, n_profiles, step):
+            yield slice(start, min(start + step, n_profiles))
+
+    def scores(self, gpa_norm: np.ndarray, gre_total: np.ndarray) -> np.ndarray:
+        """Composite gap of each profile against every program (higher = safer).
+
+        ``gpa_norm`` and ``gre_total`` hold one value per profile; a GRE of 0
+        means "not reported" and contributes no gap.
+        """
+        gpa_norm = np.asarray(gpa_norm, dtype=np.float64)[:, None]
+        gre_total = np.asarray(gre_total, dtype=np.float64)[:, None]
+        gpa_gap = gpa_norm - self.avg_gpa
+        gre_gap = np.where(
+            np.isnan(self.avg_gre) | (gre_total == 0), 0.0, (gre_total - self.avg_gre) / GRE_SCALE
+        )
+        return gpa_gap * GPA_WEIGHT + gre_gap * GRE_WEIGHT
+
+    def entry(
+        self, index: int, score_gap: float, probability: Optional[float] = None
+    ) -> Dict[str, Any]:
+        avg_gre = self.avg_gre[index]
+        entry = {
+            "program_key": self.keys[index],
+            "university": self.universities[index],
+            "program": self.programs[index],
+            "degree": self.degrees[index],
+            "avg_gpa": round(float(self.avg_gpa[index]), 3),
+            "avg_gre": None if np.isnan(avg_gre) else int(avg_gre),
+            "admit_rate": float(self.admit_rate[index]),
+            "sample_size": int(self.total[index]),
+            "score_gap": score_gap,
+        }
+        if probability is not None:
+            entry["admit_probability"] = probability
+        return entry
+
+    def buckets(self, composite: np.ndarray, k: int = 5) -> List[Buckets]:
+        """Indices of the top ``k`` reach, match and safe programs per profile."""
+        gaps = np.round(composite, 3)
+        safe = composite >= BUCKET_MARGIN
+        reach = composite <= -BUCKET_MARGIN
+        match = ~(safe | reach)
+        return _bucket_rows(
+            np.where(reach, gaps, np.inf),
+            np.where(match, np.abs(gaps), np.inf),
+            np.where(safe, -gaps, np.inf),
+            k,
+        )
+
+    def probability_buckets(
+        self, probabilities: np.ndarray, cutoffs: Tuple[float, float], k: int = 5
+    ) -> List[Buckets]:
+        """Like ``buckets`` but split on calibrated admit probability at ``(reach, safe)``."""
+        reach_cutoff, safe_cutoff = cutoffs
+        rounded = np.round(probabilities, 3)
+        safe = probabilities >= safe_cutoff
+        reach = probabilities < reach_cutoff
+        match = ~(safe | reach)
+        middle = (reach_cutoff + safe_cutoff) / 2
+        return _bucket_rows(
+            np.where(reach, rounded, np.inf),
+            np.where(match, np.abs(rounded - middle), np.inf),
+            np.where(safe, -rounded, np.inf),
+            k,
+        )
+
+    def suggest_batch(
+        self, gpa_norm: Sequence[float], gre_total: Sequence[float], k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Reach/match/safe suggestions for each profile using the GPA/GRE gap."""
+        gpa_norm = np.asarray(gpa_norm, dtype=np.float64)
+        gre_total = np.asarray(gre_total, dtype=np.float64)
+        results: List[Dict[str, Any]] = []
+        for block in self._blocks(len(gpa_norm)):
+            composite = self.scores(gpa_norm[block], gre_total[block])
+            gaps = np.round(composite, 3)
+            for row, chosen in enumerate(self.buckets(composite, k)):
+                results.append(
+                    {
+                        bucket: [self.entry(index, float(gaps[row, index])) for index in indices]
+                        for bucket, indices in chosen.items()
+                    }
+                )
+        return results
+
+    def suggest(self, gpa_norm: float, gre_total: Optional[float], k: int = 5) -> Dict[str, Any]:
+        return self.suggest_batch([gpa_norm], [gre_total or 0], k)[0]
+
+    def _alignment(self, model: Any) -> Tuple[np.ndarray, np.ndarray]:
+        cache_key = (model.path, model.trained_at)
+        if cache_key not in self._aligned:
+            self._aligned = {cache_key: model.align(self.keys, self.degrees)}
+        return self._aligned[cache_key]
+
+    def suggest_batch_with_model(
+        self,
+        model: Any,
+        features: Sequence[Sequence[float]],
+        k: int = 5,
+        cutoffs: Optional[Tuple[float, float]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Bucket programs by ``model``'s admit probability for each feature row.
+
+        ``cutoffs`` overrides the model's own ``(reach, safe)`` probabilities.
+        """
+        cutoffs = cutoffs or model.cutoffs
+        offsets, phd = self._alignment(model)
+        features = np.asarray(features, dtype=np.float64)
+        gre_total = np.where(features[:, 2] > 0, 0.0, features[:, 1] * GRE_SCALE)
+        results: List[Dict[str, Any]] = []
+        for block in self._blocks(len(features)):
+            probabilities = model.predict(features[block], offsets, phd)
+            gaps = np.round(self.scores(features[block, 0], gre_total[block]), 3)
+            rounded = np.round(probabilities, 3)
+            for row, chosen in enumerate(self.probability_buckets(probabilities, cutoffs, k)):
+                results.append(
+                    {
+                        bucket: [
+                            self.entry(index, float(gaps[row, index]), float(rounded[row, index]))
+                            for index in indices
+                        ]
+                        for bucket, indices in chosen.items()
+                    }
+                )
+        return results
+
+    def suggest_with_model(
+        self,
+        model: Any,
+        features: List[float],
+        k: int = 5,
+        cutoffs: Optional[Tuple[float, float]] = None,
+    ) -> Dict[str, Any]:
+        return self.suggest_batch_with_model(model, [features], k, cutoffs)[0]
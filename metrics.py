@@ -0,0 +1,378 @@
+"""Prometheus metrics shared by all worker processes.
+
+Every process records into its own memory-mapped file in ``METRICS_DIR``
+(``metrics-<pid>.db``), an append-only table of ``key -> float64`` that only
+that process writes. Recording a sample is therefore a dict lookup and a
+struct write, with no locking between gunicorn workers. ``/metrics`` reads
+every file in the directory and sums the samples.
+
+``gunicorn.conf.py`` keeps the directory in step with the workers: its
+``on_starting`` hook calls ``clear`` so a restart looks like an ordinary
+counter reset to Prometheus, and ``child_exit`` calls ``mark_process_dead``,
+which folds an exited worker's counters and histograms into
+``metrics-archive.db`` and removes its file. Gauges (requests in flight) only
+count the files of running processes, so a killed worker's in-flight
+requests vanish with it even if its pid is reused.
+
+Histograms store one count per bucket and are made cumulative when
+rendered; p50/p95/p99 come from ``histogram_quantile`` over the
+``_bucket`` series.
+"""
+
+from __future__ import annotations
+
+import bisect
+import glob
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+HEADER_BYTES = 8
+INITIAL_BYTES = 1 << 16
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+_FILE_PATTERN = re.compile(r"metrics-(\d+)\.db$")
+ARCHIVE_FILE = "metrics-archive.db"
+
+
+def _padded(length: int) -> int:
+    """Key bytes plus padding so the value after the 4-byte length is 8-aligned."""
+    return length + (-(4 + length) % 8)
+
+
+class ValueFile:
+    """Append-only ``key -> float64`` table in a memory-mapped file, one writer."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a+b")
+        capacity = max(os.fstat(self._file.fileno()).st_size, INITIAL_BYTES)
+        self._file.truncate(capacity)
+        self._capacity = capacity
+        self._map = mmap.mmap(self._file.fileno(), capacity)
+        self._used = struct.unpack_from("<I", self._map, 0)[0] or HEADER_BYTES
+        struct.pack_into("<I", self._map, 0, self._used)
+        self._positions = {key: position for key, position, _ in _entries(self._map, self._used)}
+
+    def add(self, key: str, amount: float) -> None:
+        position = self._position(key)
+        value = struct.unpack_from("<d", self._map, position)[0]
+        struct.pack_into("<d", self._map, position, value + amount)
+
+    def _position(self, key: str) -> int:
+        position = self._positions.get(key)
+        if position is None:
+            position = self._append(key)
+        return position
+
+    def _append(self, key: str) -> int:
+        encoded = key.encode("utf-8")
+        padded = _padded(len(encoded))
+        size = 4 + padded + 8
+        while self._used + size > self._capacity:
+            self._map.close()
+            self._capacity *= 2
+            self._file.truncate(self._capacity)
+            self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        struct.pack_into(f"<I{padded}sd", self._map, self._used, len(encoded), encoded, 0.0)
+        position = self._used + 4 + padded
+        # Publish the entry only after it is fully written, for readers.
+        self._used += size
+        struct.pack_into("<I", self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+def _entries(data: Any, used: int) -> Iterator[Tuple[str, int, float]]:
+    position = HEADER_BYTES
+    while position < used:
+        length = struct.unpack_from("<I", data, position)[0]
+        key = bytes(data[position + 4 : position + 4 + length]).decode("utf-8")
+        value_position = position + 4 + _padded(length)
+        yield key, value_position, struct.unpack_from("<d", data, value_position)[0]
+        position = value_position + 8
+
+
+def read_values(path: str) -> Iterator[Tuple[str, float]]:
+    with open(path, "rb") as handle:
+        data = handle.read()
+    if len(data) < HEADER_BYTES:
+        return
+    used = min(struct.unpack_from("<I", data, 0)[0], len(data))
+    for key, _, value in _entries(data, used):
+        yield key, value
+
+
+def process_file(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"metrics-{pid}.db")
+
+
+def clear(directory: str) -> None:
+    """Remove every value file, e.g. when the server (re)starts."""
+    for path in glob.glob(os.path.join(directory, "metrics-*.db")):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def mark_process_dead(directory: str, pid: int) -> None:
+    """Fold an exited process's samples into the archive file and remove its file.
+
+    Call from a single process (the gunicorn master); the archive has one
+    writer like every other value file. Gauge samples are carried over too but
+    never rendered from the archive.
+    """
+    path = process_file(directory, pid)
+    try:
+        samples = list(read_values(path))
+    except FileNotFoundError:
+        return
+    archive = ValueFile(os.path.join(directory, ARCHIVE_FILE))
+    try:
+        for key, value in samples:
+            if value:
+                archive.add(key, value)
+    finally:
+        archive.close()
+    os.remove(path)
+
+
+def _alive(pid: int) -> bool:
+    # Fallback for servers without a child_exit hook; a reused pid looks alive.
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _number(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(
+        self, registry: "MetricsRegistry", name: str, documentation: str, labelnames=()
+    ):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._keys: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+
+    def _key(self, suffix: str, values: Tuple[str, ...]) -> str:
+        key = self._keys.get((suffix, values))
+        if key is None:
+            key = self._keys[(suffix, values)] = json.dumps([self.name, suffix, list(values)])
+        return key
+
+    def _values(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        self.registry.add([(self._key("", self._values(labels)), amount)])
+
+
+class Gauge(Metric):
+    """Sum over live processes, e.g. requests in flight."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        self.registry.add([(self._key("", self._values(labels)), amount)])
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        values = self._values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        self.registry.add(
+            [
+                (self._key("_bucket", values + (str(index),)), 1.0),
+                (self._key("_sum", values), value),
+                (self._key("_count", values), 1.0),
+            ]
+        )
+
+
+class MetricsRegistry:
+    """Metric families backed by one value file per process in ``directory``."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+        self._file: Optional[ValueFile] = None
+        self._pid: Optional[int] = None
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DURATION_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add(self, increments: List[Tuple[str, float]]) -> None:
+        with self._lock:
+            if self._pid != os.getpid():
+                # A file inherited from a preloading parent belongs to the parent.
+                self._pid = os.getpid()
+                self._file = ValueFile(process_file(self.directory, self._pid))
+            for key, amount in increments:
+                self._file.add(key, amount)
+
+    def collect(self) -> Dict[Tuple[str, str, Tuple[str, ...]], float]:
+        """Sum the samples of every process file in the directory."""
+        totals: Dict[Tuple[str, str, Tuple[str, ...]], float] = defaultdict(float)
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.db")):
+            match = _FILE_PATTERN.search(path)
+            live = match is not None and _alive(int(match.group(1)))
+            try:
+                for key, value in read_values(path):
+                    name, suffix, values = json.loads(key)
+                    metric = self.metrics.get(name)
+                    if metric is None or (metric.kind == "gauge" and not live):
+                        continue
+                    totals[(name, suffix, tuple(values))] += value
+            except (OSError, ValueError, struct.error):
+                continue  # Removed or half-written by a dying process.
+        return totals
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        samples: Dict[str, List[Tuple[str, Tuple[str, ...], float]]] = defaultdict(list)
+        for (name, suffix, values), value in self.collect().items():
+            samples[name].append((suffix, values, value))
+        lines: List[str] = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            rows = sorted(samples.get(name, []))
+            if isinstance(metric, Histogram):
+                lines.extend(_histogram_lines(metric, rows))
+                continue
+            for _, values, value in rows:
+                lines.append(f"{name}{_labels(metric.labelnames, values)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(metric: Histogram, rows) -> List[str]:
+    series: Dict[Tuple[str, ...], Dict[str, Any]] = defaultdict(
+        lambda: {"buckets": [0.0] * (len(metric.buckets) + 1), "_sum": 0.0, "_count": 0.0}
+    )
+    label_count = len(metric.labelnames)
+    for suffix, values, value in rows:
+        if suffix == "_bucket":
+            series[values[:label_count]]["buckets"][int(values[label_count])] += value
+        else:
+            series[values][suffix] = value
+    lines = []
+    names = metric.labelnames + ("le",)
+    for values, data in sorted(series.items()):
+        cumulative = 0.0
+        bounds = [_number(bound) for bound in metric.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, data["buckets"]):
+            cumulative += count
+            labels = _labels(names, values + (bound,))
+            lines.append(f"{metric.name}_bucket{labels} {_number(cumulative)}")
+        labels = _labels(metric.labelnames, values)
+        lines.append(f"{metric.name}_sum{labels} {_number(data['_sum'])}")
+        lines.append(f"{metric.name}_count{labels} {_number(data['_count'])}")
+    return lines
+
+
+class AppMetrics:
+    """The metric families recorded by the app's request hooks."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.requests = registry.counter(
+            "http_requests_total", "Requests handled.", ["endpoint", "method", "status"]
+        )
+        self.latency = registry.histogram(
+            "http_request_duration_seconds",
+            "Time to produce the response (streamed bodies excluded).",
+            ["endpoint", "method"],
+        )
+        self.response_size = registry.histogram(
+            "http_response_size_bytes",
+            "Response body size, when known up front.",
+            ["endpoint"],
+            SIZE_BUCKETS,
+        )
+        self.db_time = registry.histogram(
+            "http_request_db_seconds", "SQL time spent per request.", ["endpoint"]
+        )
+        self.queries = registry.counter(
+            "db_queries_total", "SQL statements run by requests.", ["endpoint"]
+        )
+        self.in_flight = registry.gauge("http_requests_in_flight", "Requests being handled.")
+        self.cache_lookups = registry.counter(
+            "analytics_cache_lookups_total",
+            "Analytics cache lookups by result (hit or miss).",
+            ["function", "result"],
+        )
+        self.compute_time = registry.histogram(
+            "analytics_compute_seconds",
+            "Time to compute an analytics result on a cache miss.",
+            ["function"],
+        )
+
+
+def build_metrics(enabled: bool, directory: Optional[str]) -> Optional[AppMetrics]:
+    """Create the metrics configured by ``METRICS_*`` settings, or ``None`` when disabled."""
+    if not enabled:
+        return None
+    if not directory:
+        raise ValueError("METRICS_DIR is required when metrics are enabled")
+    return AppMetrics(MetricsRegistry(directory))
@@ -0,0 +1,158 @@
+"""Versioned schema migrations.
+
+``db.create_all()`` only creates tables that are missing; it never touches
+tables that already exist, so databases created by an older release would
+never pick up new indexes. Changes to existing tables ship here as numbered
+steps, recorded in ``schema_migrations`` and applied once, in order.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable, Iterable, List, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+
+_migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    _migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _create_indexes(names: Iterable[str]) -> Callable[[Connection, MetaData], None]:
+    """Build a step creating the named indexes declared on the models."""
+    wanted = set(names)
+
+    def step(connection: Connection, metadata: MetaData) -> None:
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name in wanted:
+                    index.create(connection, checkfirst=True)
+
+    return step
+
+
+def _add_columns(table_name: str, names: Iterable[str]) -> Callable[[Connection, MetaData], None]:
+    """Build a step adding columns declared on a model to an existing table."""
+    names = list(names)
+
+    def step(connection: Connection, metadata: MetaData) -> None:
+        table = metadata.tables[table_name]
+        existing = {column["name"] for column in inspect(connection).get_columns(table_name)}
+        for name in names:
+            if name in existing:
+                continue
+            column_type = table.c[name].type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {column_type}"))
+
+    return step
+
+
+def _drop_indexes(names: Iterable[str]) -> Callable[[Connection, MetaData], None]:
+    """Build a step dropping indexes that are no longer declared."""
+    names = list(names)
+
+    def step(connection: Connection, metadata: MetaData) -> None:
+        for name in names:
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+    return step
+
+
+def _chain(*steps: Callable[[Connection, MetaData], None]) -> Callable[[Connection, MetaData], None]:
+    def step(connection: Connection, metadata: MetaData) -> None:
+        for inner in steps:
+            inner(connection, metadata)
+
+    return step
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection, MetaData], None]]] = [
+    (
+        1,
+        "Index application_records filter/sort columns and child user_id foreign keys",
+        _create_indexes(
+            [
+                "ix_application_records_program",
+                "ix_application_records_country",
+                "ix_application_records_degree",
+                "ix_application_records_term",
+                "ix_application_records_result",
+                "ix_application_records_university_program_degree",
+                "ix_application_records_created_at_desc",
+                "ix_application_records_user_id",
+                "ix_educations_user_id",
+                "ix_test_scores_user_id",
+                "ix_experiences_user_id",
+                "ix_publications_user_id",
+                "ix_recommendation_letters_user_id",
+            ]
+        ),
+    ),
+    (
+        2,
+        "Add (university, id) and (program, id) indexes for keyset pagination",
+        _chain(
+            _create_indexes(
+                [
+                    "ix_application_records_university_id",
+                    "ix_application_records_program_id",
+                ]
+            ),
+            _drop_indexes(["ix_application_records_program"]),
+        ),
+    ),
+    (
+        3,
+        "Add application_records.import_key with a unique index for deduplicated imports",
+        _chain(
+            _add_columns("application_records", ["import_key"]),
+            _create_indexes(["ix_application_records_import_key"]),
+        ),
+    ),
+]
+
+
+def current_version(engine: Engine) -> int:
+    """Return the highest applied migration version (0 for none)."""
+    _migration_metadata.create_all(engine)
+    with engine.connect() as connection:
+        versions = connection.execute(select(schema_migrations.c.version)).scalars().all()
+    return max(versions, default=0)
+
+
+def upgrade(engine: Engine, metadata: MetaData) -> List[int]:
+    """Apply every pending migration and return the versions applied."""
+    _migration_metadata.create_all(engine)
+    applied: List[int] = []
+    for version, description, step in MIGRATIONS:
+        try:
+            with engine.begin() as connection:
+                already = connection.execute(
+                    select(schema_migrations.c.version).where(
+                        schema_migrations.c.version == version
+                    )
+                ).first()
+                if already is not None:
+                    continue
+                step(connection, metadata)
+                connection.execute(
+                    schema_migrations.insert().values(
+                        version=version,
+                        description=description,
+                        applied_at=datetime.utcnow(),
+                    )
+                )
+        except IntegrityError:
+            # Another worker recorded this version between our check and insert.
+            continue
+        applied.append(version)
+    return applied
@@ -0,0 +1,245 @@
+"""In-memory nearest-neighbour index over application records.
+
+Each record becomes a point of standardised applicant features (normalised
+GPA, GRE, research and internship flags, recommendation strength). Points
+live in a NumPy matrix searched through a KD-tree; inserts and updates are
+appended to a small brute-forced buffer and tombstone the old point, and the
+tree is rebuilt once the buffer grows past a fraction of the index.
+
+The module only knows about arrays and ids; ``app`` feeds it rows and turns
+the ids it returns into public records.
+"""
+
+from __future__ import annotations
+
+import heapq
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from admission_model import applicant_features
+
+
+# Columns of ``applicant_features`` used for similarity (GRE-missing and
+# degree are left out; a missing GRE is imputed with the index mean instead).
+FEATURE_COLUMNS = [0, 1, 3, 4, 5]
+FEATURE_NAMES = ["gpa_norm", "gre", "research", "internship", "recommendation"]
+LEAF_SIZE = 32
+REBUILD_FRACTION = 0.05
+MIN_REBUILD = 256
+
+
+def record_features(
+    gpa: Optional[float],
+    gpa_scale: Optional[float],
+    gre_total: Optional[float],
+    research: Optional[bool],
+    internship: Optional[bool],
+    recommendation: Optional[str],
+) -> Optional[np.ndarray]:
+    """Raw similarity features; ``nan`` GRE when missing, ``None`` without a GPA."""
+    vector = applicant_features(gpa, gpa_scale, gre_total, research, internship, recommendation)
+    if vector is None:
+        return None
+    values = np.array([vector[column] for column in FEATURE_COLUMNS], dtype=np.float64)
+    if not gre_total:
+        values[1] = np.nan
+    return values
+
+
+class KDTree:
+    """Static KD-tree with per-node bounding boxes."""
+
+    def __init__(self, points: np.ndarray, leaf_size: int = LEAF_SIZE):
+        self.points = points
+        self.order = np.arange(len(points))
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.children: List[Tuple[int, int]] = []
+        self.lower: List[np.ndarray] = []
+        self.upper: List[np.ndarray] = []
+        if len(points):
+            self._build(0, len(points), leaf_size)
+
+    def _build(self, start: int, end: int, leaf_size: int) -> int:
+        node = len(self.starts)
+        block = self.points[self.order[start:end]]
+        self.starts.append(start)
+        self.ends.append(end)
+        self.children.append((-1, -1))
+        self.lower.append(block.min(axis=0))
+        self.upper.append(block.max(axis=0))
+        spread = self.upper[node] - self.lower[node]
+        if end - start <= leaf_size or not spread.any():
+            return node
+        dim = int(np.argmax(spread))
+        middle = (end - start) // 2
+        partitioned = np.argpartition(block[:, dim], middle)
+        self.order[start:end] = self.order[start:end][partitioned]
+        left = self._build(start, start + middle, leaf_size)
+        right = self._build(start + middle, end, leaf_size)
+        self.children[node] = (left, right)
+        return node
+
+    def _box_distance(self, node: int, point: np.ndarray) -> float:
+        gap = np.maximum(self.lower[node] - point, 0) + np.maximum(point - self.upper[node], 0)
+        return float(gap @ gap)
+
+    def query(
+        self, point: np.ndarray, k: int, valid: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Squared distances and positions of the ``k`` nearest valid points."""
+        best_distance = np.empty(0)
+        best_position = np.empty(0, dtype=np.int64)
+        if not self.starts:
+            return best_distance, best_position
+        frontier = [(0.0, 0)]
+        while frontier:
+            bound, node = heapq.heappop(frontier)
+            if len(best_distance) == k and bound > best_distance.max():
+                break
+            left, right = self.children[node]
+            if left >= 0:
+                for child in (left, right):
+                    heapq.heappush(frontier, (self._box_distance(child, point), child))
+                continue
+            positions = self.order[self.starts[node] : self.ends[node]]
+            if valid is not None:
+                positions = positions[valid[positions]]
+            if not len(positions):
+                continue
+            offsets = self.points[positions] - point
+            distances = np.einsum("ij,ij->i", offsets, offsets)
+            best_distance = np.concatenate([best_distance, distances])
+            best_position = np.concatenate([best_position, positions])
+            if len(best_distance) > k:
+                keep = np.argpartition(best_distance, k - 1)[:k]
+                best_distance, best_position = best_distance[keep], best_position[keep]
+        return best_distance, best_position
+
+
+class NeighborIndex:
+    """KD-tree plus an append buffer, keyed by application record id."""
+
+    def __init__(self, rows: Iterable[Tuple[int, int, Optional[np.ndarray]]]):
+        """``rows`` are ``(record_id, user_id, record_features(...))`` tuples;
+        rows without features only advance ``max_id``."""
+        self._lock = threading.Lock()
+        rows = list(rows)
+        self.max_id = max((record_id for record_id, _, _ in rows), default=0)
+        rows = [row for row in rows if row[2] is not None]
+        raw = np.array([features for _, _, features in rows], dtype=np.float64).reshape(
+            -1, len(FEATURE_NAMES)
+        )
+        self.means = np.nanmean(raw, axis=0) if len(raw) else np.zeros(len(FEATURE_NAMES))
+        self.means = np.nan_to_num(self.means)
+        self.scales = np.nanstd(raw, axis=0) if len(raw) else np.ones(len(FEATURE_NAMES))
+        self.scales = np.where(np.nan_to_num(self.scales) > 0, self.scales, 1.0)
+        self._reset(
+            np.array([record_id for record_id, _, _ in rows], dtype=np.int64),
+            np.array([user_id for _, user_id, _ in rows], dtype=np.int64),
+            self._standardise(raw),
+        )
+
+    def _standardise(self, raw: np.ndarray) -> np.ndarray:
+        raw = np.where(np.isnan(raw), self.means, raw)
+        return (raw - self.means) / self.scales
+
+    def _reset(self, ids: np.ndarray, user_ids: np.ndarray, points: np.ndarray) -> None:
+        self.ids = ids
+        self.user_ids = user_ids
+        self.alive = np.ones(len(ids), dtype=bool)
+        self.tree = KDTree(points)
+        self.position: Dict[int, Tuple[str, int]] = {
+            int(record_id): ("tree", index) for index, record_id in enumerate(ids.tolist())
+        }
+        self.pending_ids: List[int] = []
+        self.pending_user_ids: List[int] = []
+        self.pending_points: List[np.ndarray] = []
+        self.pending_alive: List[bool] = []
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    def _remove(self, record_id: int) -> None:
+        located = self.position.pop(record_id, None)
+        if located is None:
+            return
+        where, index = located
+        if where == "tree":
+            self.alive[index] = False
+        else:
+            self.pending_alive[index] = False
+        self.dead += 1
+
+    def apply(self, changes: Dict[int, Optional[Tuple[int, Optional[np.ndarray]]]]) -> None:
+        """Apply ``{record_id: (user_id, features) or None}``; ``None`` deletes."""
+        with self._lock:
+            for record_id, change in changes.items():
+                self._remove(record_id)
+                if change is None:
+                    if record_id >= self.max_id:
+                        # SQLite hands the highest rowid out again once it is deleted.
+                        self.max_id = max(self.position, default=0)
+                    continue
+                self.max_id = max(self.max_id, record_id)
+                user_id, features = change
+                if features is None:
+                    continue
+                self.position[record_id] = ("pending", len(self.pending_ids))
+                self.pending_ids.append(record_id)
+                self.pending_user_ids.append(user_id)
+                self.pending_points.append(self._standardise(features[None, :])[0])
+                self.pending_alive.append(True)
+            backlog = len(self.pending_ids) + self.dead
+            if backlog > max(MIN_REBUILD, REBUILD_FRACTION * len(self.ids)):
+                self._compact()
+
+    def _compact(self) -> None:
+        """Fold the buffer into a fresh tree and drop tombstoned points."""
+        alive = self.alive
+        pending_alive = np.array(self.pending_alive, dtype=bool)
+        pending_ids = np.array(self.pending_ids, dtype=np.int64)
+        pending_user_ids = np.array(self.pending_user_ids, dtype=np.int64)
+        points = self.tree.points[alive]
+        if len(self.pending_points):
+            points = np.vstack([points, np.array(self.pending_points)[pending_alive]])
+        self._reset(
+            np.concatenate([self.ids[alive], pending_ids[pending_alive]]),
+            np.concatenate([self.user_ids[alive], pending_user_ids[pending_alive]]),
+            points.reshape(-1, len(FEATURE_NAMES)),
+        )
+
+    def query(
+        self, features: np.ndarray, k: int, exclude_user: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """``(record_id, distance)`` of the ``k`` nearest records, closest first."""
+        point = self._standardise(features[None, :])[0]
+        with self._lock:
+            valid = self.alive
+            if exclude_user is not None:
+                valid = valid & (self.user_ids != exclude_user)
+            distances, positions = self.tree.query(point, k, valid)
+            found = list(zip(self.ids[positions].tolist(), distances.tolist()))
+            if self.pending_ids:
+                pending = np.array(self.pending_points)
+                mask = np.array(self.pending_alive, dtype=bool)
+                if exclude_user is not None:
+                    mask &= np.array(self.pending_user_ids) != exclude_user
+                offsets = pending[mask] - point
+                pending_ids = np.array(self.pending_ids)[mask]
+                found.extend(
+                    zip(pending_ids.tolist(), np.einsum("ij,ij->i", offsets, offsets).tolist())
+                )
+        found.sort(key=lambda item: (item[1], item[0]))
+        return [(record_id, float(np.sqrt(distance))) for record_id, distance in found[:k]]
+
+
+def build_rows(rows: Iterable[Sequence[Any]]) -> List[Tuple[int, int, Optional[np.ndarray]]]:
+    """Turn ``(id, user_id, gpa, gpa_scale, gre_total, research, internship,
+    recommendation)`` rows into index rows."""
+    return [
+        (record_id, user_id, record_features(*values)) for record_id, user_id, *values in rows
+    ]
@@ -0,0 +1,137 @@
+"""Connection pooling and bulk loading for server databases (PostgreSQL).
+
+``pool_options`` sizes SQLAlchemy's ``QueuePool`` from the deployment shape:
+``DB_MAX_CONNECTIONS`` is the number of server connections this app may use
+in total, split evenly between the ``WEB_CONCURRENCY`` worker processes. Each
+worker keeps one pooled connection per request thread (``WEB_THREADS``) and
+may open as many again as overflow, never more than its share. Connections
+are pinged on checkout and recycled before server or proxy idle timeouts cut
+them.
+
+``insert_rows`` is the bulk-insert path shared by the importer and
+``init_db``: on psycopg2 / psycopg it streams the rows through ``COPY ...
+FROM STDIN`` in CSV format, elsewhere it falls back to a Core executemany
+(which SQLAlchemy batches into multi-row ``INSERT ... VALUES`` on
+PostgreSQL drivers without COPY).
+"""
+
+from __future__ import annotations
+
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import Table, text
+from sqlalchemy.engine import Connection
+
+
+COPY_DRIVERS = ("psycopg2", "psycopg")
+
+
+def pool_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    """``SQLALCHEMY_ENGINE_OPTIONS`` for a pooled server database."""
+    workers = max(1, int(config.get("WEB_CONCURRENCY") or 1))
+    threads = max(1, int(config.get("WEB_THREADS") or 1))
+    budget = max(1, int(config.get("DB_MAX_CONNECTIONS") or 1) // workers)
+    pool_size = config.get("DB_POOL_SIZE")
+    pool_size = int(pool_size) if pool_size not in (None, "") else min(threads, budget)
+    overflow = config.get("DB_MAX_OVERFLOW")
+    overflow = int(overflow) if overflow not in (None, "") else min(threads, budget - pool_size)
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max(0, overflow),
+        "pool_pre_ping": True,
+        "pool_recycle": int(config.get("DB_POOL_RECYCLE") or -1),
+        "pool_timeout": float(config.get("DB_POOL_TIMEOUT") or 30),
+    }
+
+
+def supports_copy(connection: Connection) -> bool:
+    return connection.dialect.name == "postgresql" and connection.dialect.driver in COPY_DRIVERS
+
+
+def insert_rows(connection: Connection, table: Table, rows: List[Dict[str, Any]]) -> int:
+    """Insert ``rows`` (dicts with identical keys) and return how many were written."""
+    if not rows:
+        return 0
+    if supports_copy(connection):
+        copy_rows(connection, table, rows)
+    else:
+        connection.execute(table.insert(), rows)
+    return len(rows)
+
+
+def _csv_field(value: Any) -> str:
+    # COPY's CSV format reads an unquoted empty field as NULL and a quoted
+    # one as the empty string, so every string is quoted.
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif isinstance(value, (datetime, date)):
+        return value.isoformat()
+    elif not isinstance(value, str):
+        return str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _column_defaults(table: Table, present: Iterable[str]) -> Dict[str, Any]:
+    """Python-side defaults that a Core insert would add but COPY does not."""
+    defaults = {}
+    present = set(present)
+    for column in table.columns:
+        default = column.default
+        if column.name in present or default is None or column.primary_key:
+            continue
+        if default.is_scalar:
+            defaults[column.name] = default.arg
+        elif default.is_callable:
+            defaults[column.name] = default.arg(None)
+    return defaults
+
+
+def copy_rows(connection: Connection, table: Table, rows: List[Dict[str, Any]]) -> None:
+    """Load ``rows`` into ``table`` with ``COPY FROM STDIN`` in the current transaction."""
+    defaults = _column_defaults(table, rows[0])
+    columns = list(rows[0]) + list(defaults)
+    preparer = connection.dialect.identifier_preparer
+    statement = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        preparer.format_table(table), ", ".join(preparer.quote(name) for name in columns)
+    )
+    lines = (
+        ",".join(
+            _csv_field(row[name] if name in row else defaults[name]) for name in columns
+        )
+        + "\n"
+        for row in rows
+    )
+    cursor = connection.connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(statement, io.StringIO("".join(lines)))
+        else:  # psycopg 3 buffers writes itself
+            with cursor.copy(statement) as copy:
+                for line in lines:
+                    copy.write(line)
+    finally:
+        cursor.close()
+
+
+def after_bulk_load(connection: Connection, tables: Iterable[Table]) -> None:
+    """Resync id sequences past explicitly written ids and refresh planner stats."""
+    if connection.dialect.name != "postgresql":
+        return
+    for table in tables:
+        column = table.autoincrement_column
+        if column is not None:
+            connection.execute(
+                text(
+                    "SELECT setval(pg_get_serial_sequence(:table, :column), "
+                    f"coalesce((SELECT max({column.name}) FROM {table.name}), 0) + 1, false)"
+                ),
+                {"table": table.name, "column": column.name},
+            )
+        connection.exec_driver_sql(f"ANALYZE {table.name}")
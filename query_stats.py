@@ -0,0 +1,107 @@
+"""Per-request SQL statistics and the slow-query log.
+
+``instrument_engine`` hooks an engine's ``before_cursor_execute`` and
+``after_cursor_execute`` events. Inside a request every statement adds to
+``g.query_count`` and its wall time to ``g.query_time`` (seconds), which the
+app reports in ``X-Query-Count`` / ``Server-Timing`` headers and checks
+against the development query budget (for streamed bodies, once the body
+has been sent). Statements slower than the threshold are logged, with the
+database's plan for SELECTs (``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN``
+elsewhere) run on the same connection and parameters, inside a savepoint.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from typing import Any, List
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+_START_TIMES = "query_started"
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.I)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request ran more SQL statements than ``QUERY_BUDGET`` allows."""
+
+
+def instrument_engine(engine: Engine, slow_query_ms: float, logger: logging.Logger) -> None:
+    """Install the counting, timing and slow-query hooks on ``engine``."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault(_START_TIMES, []).append(time.perf_counter())
+        if has_request_context():
+            g.query_count = g.get("query_count", 0) + 1
+
+    @event.listens_for(engine, "handle_error")
+    def _discard(context) -> None:
+        if context.connection is not None:
+            starts = context.connection.info.get(_START_TIMES)
+            if starts:
+                starts.pop()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info[_START_TIMES].pop()
+        if has_request_context():
+            g.query_time = g.get("query_time", 0.0) + elapsed
+        if slow_query_ms and elapsed * 1000 >= slow_query_ms:
+            plan = None
+            if not executemany and _EXPLAINABLE.match(statement):
+                plan = explain(cursor, engine.dialect.name, statement, parameters)
+            logger.warning(
+                "Slow query (%.1f ms)%s: %s\nParameters: %r%s",
+                elapsed * 1000,
+                f" in {request.method} {request.path}" if has_request_context() else "",
+                statement,
+                parameters,
+                f"\nPlan:\n{plan}" if plan else "",
+            )
+
+
+def explain(cursor: Any, dialect: str, statement: str, parameters: Any) -> str:
+    """Return the plan of ``statement``, or the error that prevented it."""
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    # The plan runs on the request's connection and transaction. A failed
+    # statement aborts the whole transaction on PostgreSQL, so a savepoint
+    # confines a failing EXPLAIN to itself.
+    savepoint = dialect != "sqlite"
+    plan_cursor = cursor.connection.cursor()
+    try:
+        if savepoint:
+            plan_cursor.execute("SAVEPOINT query_plan")
+        try:
+            plan_cursor.execute(prefix + statement, parameters)
+            rows = plan_cursor.fetchall()
+        except Exception:
+            if savepoint:
+                plan_cursor.execute("ROLLBACK TO SAVEPOINT query_plan")
+            raise
+        if savepoint:
+            plan_cursor.execute("RELEASE SAVEPOINT query_plan")
+    except Exception as exc:  # The plan is diagnostic; never fail the request for it.
+        return f"(EXPLAIN failed: {exc})"
+    finally:
+        plan_cursor.close()
+    lines: List[str] = []
+    for row in rows:
+        if dialect == "sqlite":
+            # (id, parent, notused, detail)
+            lines.append(f"  {row[3]}")
+        else:
+            lines.append("  " + " | ".join(str(value) for value in row))
+    return "\n".join(lines)
+
+
+def server_timing(count: int, query_time: float, total: float) -> str:
+    """``Server-Timing`` value with the request's SQL count, DB time and total time."""
+    return (
+        f'db;dur={query_time * 1000:.1f};desc="{count} queries", '
+        f"total;dur={total * 1000:.1f}"
+    )
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Compare query plans and timings before and after the index migration.
+
+Builds a throwaway database with synthetic application records, drops the
+indexes added by migration 1, captures ``EXPLAIN`` output and timings for the
+hot public queries, then applies the migration and measures again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+QUERIES = [
+    (
+        "public stats: recent applications",
+        "SELECT id, university, program FROM application_records "
+        "ORDER BY created_at DESC, id DESC LIMIT 5",
+        {},
+    ),
+    (
+        "search: result filter, recent sort",
+        "SELECT id, university, program FROM application_records "
+        "WHERE result = :result ORDER BY created_at DESC LIMIT 50",
+        {"result": "Accept"},
+    ),
+    (
+        "search: university sort",
+        "SELECT id, university, program FROM application_records "
+        "ORDER BY university ASC LIMIT 50",
+        {},
+    ),
+    (
+        "program stats: group by university/program/degree",
+        "SELECT university, program, degree, count(*) FROM application_records "
+        "GROUP BY university, program, degree",
+        {},
+    ),
+    (
+        "owner lookup: application_records.user_id",
+        "SELECT id FROM application_records WHERE user_id = :user_id",
+        {"user_id": 42},
+    ),
+    (
+        "profile: educations.user_id",
+        "SELECT id FROM educations WHERE user_id = :user_id",
+        {"user_id": 42},
+    ),
+]
+
+UNIVERSITIES = [f"University {i:03d}" for i in range(150)]
+PROGRAMS = ["MS CS", "PhD CS", "MS DS", "MEng CS", "MS AI", "MS SE", "MS HCI", "MS Robotics"]
+COUNTRIES = ["USA", "Canada", "UK", "Germany", "Switzerland", "China", "Singapore", "Japan"]
+RESULTS = ["Accept", "Reject", "Waitlist"]
+TERMS = ["Fall 2023", "Spring 2024", "Fall 2024", "Fall 2025"]
+
+
+def populate(db, rows: int, users: int, seed: int) -> None:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    users_table = db.metadata.tables["users"]
+    records_table = db.metadata.tables["application_records"]
+    educations_table = db.metadata.tables["educations"]
+
+    with db.engine.begin() as connection:
+        connection.execute(
+            users_table.insert(),
+            [{"id": i, "email": f"bench{i}@example.com", "password_hash": "x"} for i in range(1, users + 1)],
+        )
+        connection.execute(
+            educations_table.insert(),
+            [{"user_id": i, "institution": "Bench University"} for i in range(1, users + 1)],
+        )
+        batch = []
+        for i in range(rows):
+            batch.append(
+                {
+                    "user_id": rng.randint(1, users),
+                    "university": rng.choice(UNIVERSITIES),
+                    "program": rng.choice(PROGRAMS),
+                    "country": rng.choice(COUNTRIES),
+                    "degree": rng.choice(["MS", "PhD"]),
+                    "term": rng.choice(TERMS),
+                    "result": rng.choice(RESULTS),
+                    "gpa": round(rng.uniform(3.0, 4.0), 2),
+                    "gpa_scale": 4.0,
+                    "gre_total": rng.randint(300, 340),
+                    "created_at": now - timedelta(minutes=rng.randint(0, 500_000)),
+                }
+            )
+            if len(batch) == 10_000:
+                connection.execute(records_table.insert(), batch)
+                batch = []
+        if batch:
+            connection.execute(records_table.insert(), batch)
+
+
+def explain(connection, sql: str, params: dict) -> list[str]:
+    from sqlalchemy import text
+
+    if connection.dialect.name == "sqlite":
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).all()
+        return [row[-1] for row in rows]
+    return [row[0] for row in connection.execute(text(f"EXPLAIN {sql}"), params).all()]
+
+
+def measure(db, repeat: int) -> dict:
+    from sqlalchemy import text
+
+    report = {}
+    with db.engine.connect() as connection:
+        for label, sql, params in QUERIES:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                connection.execute(text(sql), params).all()
+                timings.append((time.perf_counter() - start) * 1000)
+            report[label] = (explain(connection, sql, params), statistics.median(timings))
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="Application records to generate.")
+    parser.add_argument("--users", type=int, default=5_000, help="Users to spread records across.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query (median reported).")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-indexes-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["ANALYTICS_CACHE_BACKEND"] = "none"
+    os.environ["METRICS_ENABLED"] = "0"
+
+    import migrations
+    from app import create_app, db
+    from sqlalchemy import text
+
+    app = create_app()
+    with app.app_context():
+        print(f"Generating {args.rows} application records in {workdir} ...")
+        populate(db, args.rows, args.users, args.seed)
+
+        # Rewind to the pre-migration schema.
+        with db.engine.begin() as connection:
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.drop(connection, checkfirst=True)
+            connection.execute(migrations.schema_migrations.delete())
+            connection.execute(text("ANALYZE"))
+        before = measure(db, args.repeat)
+
+        migrations.upgrade(db.engine, db.metadata)
+        with db.engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+        after = measure(db, args.repeat)
+
+    for label, _, _ in QUERIES:
+        plan_before, ms_before = before[label]
+        plan_after, ms_after = after[label]
+        print(f"\n== {label}")
+        print(f"   before ({ms_before:8.2f} ms): " + " | ".join(plan_before))
+        print(f"   after  ({ms_after:8.2f} ms): " + " | ".join(plan_after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Micro-benchmark JSON encoding of the analytics and search payloads.
+
+Compares Flask's stdlib provider with ``FastJSONProvider`` (orjson when it
+is installed) on the real payload shapes produced by the analytics functions
+and the projected search rows, plus the chunked streaming encoder.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000, help="Application records to generate.")
+    parser.add_argument("--number", type=int, default=20, help="Encodings per measurement.")
+    parser.add_argument(
+        "--snapshot", help="Restore this init_db.py snapshot instead of generating --rows."
+    )
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-json-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["ANALYTICS_CACHE_BACKEND"] = "none"
+    os.environ["METRICS_ENABLED"] = "0"
+
+    from flask.json.provider import DefaultJSONProvider
+
+    from app import (
+        PUBLIC_APPLICATION_FIELDS,
+        ApplicationRecord,
+        create_app,
+        db,
+        get_program_distribution,
+        get_regional_data,
+        get_university_distribution,
+        public_columns,
+        public_rows_to_dicts,
+        rebuild_analytics_summaries,
+    )
+    from bench_indexes import populate
+    from json_provider import FastJSONProvider
+    from snapshots import restore_snapshot
+
+    app = create_app()
+    with app.app_context():
+        if args.snapshot:
+            restore_snapshot(args.snapshot, db.engine)
+        else:
+            populate(db, args.rows, max(args.rows // 20, 1), seed=7)
+            rebuild_analytics_summaries()
+        rows = (
+            ApplicationRecord.query.with_entities(*public_columns(PUBLIC_APPLICATION_FIELDS))
+            .limit(10_000)
+            .all()
+        )
+        search_rows = public_rows_to_dicts(rows, PUBLIC_APPLICATION_FIELDS)
+        # The stdlib provider renders datetimes as HTTP dates; feed it the
+        # ISO strings to_public_dict would have produced so the work matches.
+        search_rows_iso = [
+            {**row, "created_at": row["created_at"].isoformat()} for row in search_rows
+        ]
+        payloads = {
+            "analytics/universities": (get_university_distribution(),) * 2,
+            "analytics/programs": (get_program_distribution(),) * 2,
+            "analytics/regional": (get_regional_data(),) * 2,
+            "search (200 rows)": (search_rows_iso[:200], search_rows[:200]),
+            "search (10k rows)": (search_rows_iso, search_rows),
+        }
+
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    print(f"orjson available: {fast.use_orjson}")
+    print(f"{'payload':<24}{'stdlib ms':>12}{'fast ms':>12}{'stream ms':>12}{'speedup':>10}")
+    for label, (iso_payload, native_payload) in payloads.items():
+        stdlib_ms = timeit.timeit(lambda: stdlib.dumps(iso_payload), number=args.number) * 1000 / args.number
+        fast_ms = timeit.timeit(lambda: fast.dumps_bytes(native_payload), number=args.number) * 1000 / args.number
+        if isinstance(native_payload, list):
+            stream_ms = timeit.timeit(
+                lambda: b"".join(fast.iter_array(native_payload)), number=args.number
+            ) * 1000 / args.number
+            stream = f"{stream_ms:12.3f}"
+        else:
+            stream = f"{'-':>12}"
+        print(f"{label:<24}{stdlib_ms:12.3f}{fast_ms:12.3f}{stream}{stdlib_ms / fast_ms:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
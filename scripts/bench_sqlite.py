@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Concurrent read/write benchmark for the SQLite engine settings.
+
+Seeds a throwaway database, then for each configuration starts ``--workers``
+processes (standing in for gunicorn workers) that hammer the app through its
+test client for ``--seconds``: mostly public searches, plus
+``POST /api/applications`` writes. Reports throughput, write latency and the
+number of failed requests ("database is locked") for SQLite's defaults, the
+tuned pragmas, and the tuned pragmas with serialized writes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+DEFAULT_PRAGMAS = {
+    "SQLITE_JOURNAL_MODE": "delete",
+    "SQLITE_SYNCHRONOUS": "",
+    "SQLITE_BUSY_TIMEOUT_MS": "",
+    "SQLITE_MMAP_SIZE": "",
+    "SQLITE_CACHE_SIZE": "",
+    "SQLITE_SERIALIZE_WRITES": "0",
+}
+CONFIGURATIONS = {
+    "sqlite defaults": DEFAULT_PRAGMAS,
+    "tuned pragmas": {"SQLITE_SERIALIZE_WRITES": "0"},
+    "tuned + serialized writes": {"SQLITE_SERIALIZE_WRITES": "1"},
+}
+PROGRAMS = ["MS CS", "PhD CS", "MS DS", "MEng CS", "MS AI", "MS SE", "MS HCI", "MS Robotics"]
+
+
+def seed(path: str, rows: int) -> None:
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ["ANALYTICS_CACHE_BACKEND"] = "none"
+    os.environ["METRICS_ENABLED"] = "0"
+    from app import app, db, rebuild_analytics_summaries
+    from bench_indexes import populate
+
+    with app.app_context():
+        populate(db, rows, max(rows // 20, 1), seed=7)
+        rebuild_analytics_summaries()
+        # Fold the WAL into the main file so each run can start from a copy.
+        db.session.execute(db.text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        db.session.remove()
+        db.engine.dispose()
+
+
+def worker(index: int, start_at: float, seconds: float, write_ratio: float) -> None:
+    """Run requests until the deadline and print one JSON line of results."""
+    from app import app
+
+    client = app.test_client()
+    client.post("/api/register", json={"email": f"worker{index}@bench.local", "password": "x"})
+    rng = random.Random(index)
+    reads = writes = errors = 0
+    write_latency = []
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        started = time.perf_counter()
+        if rng.random() < write_ratio:
+            response = client.post(
+                "/api/applications",
+                json={
+                    "university": f"University {rng.randrange(150):03d}",
+                    "program": rng.choice(PROGRAMS),
+                    "result": rng.choice(["Accept", "Reject", "Waitlist"]),
+                    "gpa": round(rng.uniform(3.0, 4.0), 2),
+                    "gpa_scale": 4.0,
+                },
+            )
+            if response.status_code == 201:
+                writes += 1
+                write_latency.append(time.perf_counter() - started)
+            else:
+                errors += 1
+        else:
+            response = client.get(
+                "/api/search/applications",
+                query_string={"program": rng.choice(PROGRAMS), "limit": 20},
+            )
+            if response.status_code == 200:
+                reads += 1
+            else:
+                errors += 1
+    print(json.dumps({"reads": reads, "writes": writes, "errors": errors, "latency": write_latency}))
+
+
+def run_configuration(
+    template: str, overrides: dict, workers: int, seconds: float, write_ratio: float
+) -> dict:
+    workdir = tempfile.mkdtemp(prefix="bench-sqlite-run-")
+    path = os.path.join(workdir, "bench.db")
+    shutil.copy(template, path)
+    env = {
+        **os.environ,
+        **overrides,
+        "DATABASE_URL": f"sqlite:///{path}",
+        "ANALYTICS_CACHE_BACKEND": "none",
+        "METRICS_ENABLED": "0",
+    }
+    start_at = time.time() + 3 + workers * 0.5
+    processes = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                __file__,
+                "--worker",
+                str(index),
+                "--start-at",
+                str(start_at),
+                "--seconds",
+                str(seconds),
+                "--write-ratio",
+                str(write_ratio),
+            ],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        for index in range(workers)
+    ]
+    totals = {"reads": 0, "writes": 0, "errors": 0, "latency": []}
+    for process in processes:
+        output, _ = process.communicate()
+        result = json.loads(output.strip().splitlines()[-1])
+        for key in totals:
+            totals[key] += result[key]
+    shutil.rmtree(workdir, ignore_errors=True)
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000, help="Application records to seed.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent worker processes.")
+    parser.add_argument("--seconds", type=float, default=10, help="Duration of each run.")
+    parser.add_argument(
+        "--write-ratio", type=float, default=0.2, help="Share of requests that write."
+    )
+    parser.add_argument("--worker", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        worker(args.worker, args.start_at, args.seconds, args.write_ratio)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="bench-sqlite-")
+    template = os.path.join(workdir, "template.db")
+    seed(template, args.rows)
+    print(
+        f"{args.workers} workers, {args.seconds:g}s per run, "
+        f"{args.write_ratio:.0%} writes, {args.rows} seeded rows"
+    )
+    print(f"{'configuration':<28}{'reads/s':>10}{'writes/s':>10}{'errors':>8}{'p95 write ms':>14}")
+    for label, overrides in CONFIGURATIONS.items():
+        totals = run_configuration(
+            template, overrides, args.workers, args.seconds, args.write_ratio
+        )
+        latency = totals["latency"]
+        p95 = statistics.quantiles(latency, n=20)[-1] * 1000 if len(latency) > 1 else float("nan")
+        print(
+            f"{label:<28}{totals['reads'] / args.seconds:10.1f}"
+            f"{totals['writes'] / args.seconds:10.1f}{totals['errors']:8d}{p95:14.1f}"
+        )
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,8 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+import init_db as synthetic
+import search_index
 from app import (
     ApplicationRecord,
     Education,
@@ -21,6 +23,7 @@ from app import (
     User,
     create_app,
     db,
+    rebuild_analytics_summaries,
 )
 
 
@@ -471,6 +474,29 @@ def main() -> None:
         action="store_true",
         help="Drop all tables before creating them (destructive).",
     )
+    parser.add_argument(
+        "--rebuild-summaries",
+        action="store_true",
+        help="Recompute the analytics summary tables from existing application records.",
+    )
+    parser.add_argument(
+        "--synthetic-users",
+        type=int,
+        default=0,
+        help="Generate this many synthetic applicants (~5.5 applications each) in bulk.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed for --synthetic-users.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes generating --synthetic-users shards.",
+    )
     args = parser.parse_args()
 
     app = create_app()
@@ -478,8 +504,16 @@ def main() -> None:
         if args.reset:
             db.drop_all()
         db.create_all()
+        search_index.ensure_search_index(db.engine)
         if args.with_sample:
             seed_sample_data()
+        if args.synthetic_users:
+            if db.session.query(User.id).first() is not None:
+                parser.error("--synthetic-users needs an empty database; add --reset")
+            synthetic.generate_synthetic_data(args.synthetic_users, args.seed, args.workers)
+        if args.rebuild_summaries:
+            counts = rebuild_analytics_summaries()
+            print(f"Rebuilt analytics summaries: {counts}")
 
     print("Database ready at instance/app.db")
 
@@ -0,0 +1,162 @@
+"""Full-text search over application records.
+
+SQLite gets an external-content FTS5 table kept in sync by triggers, so rows
+written through the ORM, Core bulk inserts or raw SQL are all indexed.
+PostgreSQL gets a GIN ``tsvector`` expression index for free-text queries and
+``pg_trgm`` indexes that let the per-field ``ILIKE`` filters use an index.
+
+Only SQL lives here; ``app.search_applications`` decides how to combine the
+clauses with the rest of the query.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import literal_column, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+
+FTS_TABLE = "application_search"
+SEARCH_COLUMNS = ["university", "program", "country", "term", "notes"]
+FIELD_COLUMNS = ["university", "program", "country", "term"]
+
+_SQLITE_TRIGGERS = {
+    "application_search_ai": """
+        CREATE TRIGGER application_search_ai AFTER INSERT ON application_records BEGIN
+            INSERT INTO application_search(rowid, university, program, country, term, notes)
+            VALUES (new.id, new.university, new.program, new.country, new.term, new.notes);
+        END
+    """,
+    "application_search_ad": """
+        CREATE TRIGGER application_search_ad AFTER DELETE ON application_records BEGIN
+            INSERT INTO application_search(application_search, rowid, university, program, country, term, notes)
+            VALUES ('delete', old.id, old.university, old.program, old.country, old.term, old.notes);
+        END
+    """,
+    "application_search_au": """
+        CREATE TRIGGER application_search_au AFTER UPDATE ON application_records BEGIN
+            INSERT INTO application_search(application_search, rowid, university, program, country, term, notes)
+            VALUES ('delete', old.id, old.university, old.program, old.country, old.term, old.notes);
+            INSERT INTO application_search(rowid, university, program, country, term, notes)
+            VALUES (new.id, new.university, new.program, new.country, new.term, new.notes);
+        END
+    """,
+}
+
+# Must match the index expression character for character for the planner
+# to use ix_application_records_search.
+PG_DOCUMENT = (
+    "to_tsvector('simple', coalesce(university, '') || ' ' || coalesce(program, '')"
+    " || ' ' || coalesce(country, '') || ' ' || coalesce(term, '')"
+    " || ' ' || coalesce(notes, ''))"
+)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(value: Optional[str]) -> List[str]:
+    return _TOKEN.findall(value or "")
+
+
+def ensure_search_index(engine: Engine) -> Optional[str]:
+    """Create (or repair) the search index and return the backend name.
+
+    Returns ``"fts5"``, ``"postgresql"`` or ``None`` when the database offers
+    neither, in which case callers keep using plain ``ILIKE`` filters.
+    Safe to run on every startup: it only does work when something is missing,
+    e.g. after ``db.drop_all()`` removed the triggers.
+    """
+    if engine.dialect.name == "sqlite":
+        return _ensure_sqlite(engine)
+    if engine.dialect.name == "postgresql":
+        return _ensure_postgresql(engine)
+    return None
+
+
+def _ensure_sqlite(engine: Engine) -> Optional[str]:
+    expected = {FTS_TABLE, *_SQLITE_TRIGGERS}
+    with engine.connect() as connection:
+        present = set(
+            connection.execute(
+                text("SELECT name FROM sqlite_master WHERE name IN (%s)" % ", ".join(
+                    f"'{name}'" for name in sorted(expected)
+                ))
+            ).scalars()
+        )
+    if present == expected:
+        return "fts5"
+
+    try:
+        with engine.begin() as connection:
+            for trigger in _SQLITE_TRIGGERS:
+                connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+            connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+            connection.execute(
+                text(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                    f"{', '.join(SEARCH_COLUMNS)}, "
+                    "content='application_records', content_rowid='id', "
+                    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                )
+            )
+            for ddl in _SQLITE_TRIGGERS.values():
+                connection.execute(text(ddl))
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    except DBAPIError:
+        # SQLite built without FTS5.
+        return None
+    return "fts5"
+
+
+def _ensure_postgresql(engine: Engine) -> Optional[str]:
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_application_records_search "
+                f"ON application_records USING GIN (({PG_DOCUMENT}))"
+            )
+        )
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for column in FIELD_COLUMNS:
+                connection.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS ix_application_records_{column}_trgm "
+                        f"ON application_records USING GIN ({column} gin_trgm_ops)"
+                    )
+                )
+    except DBAPIError:
+        # pg_trgm needs CREATE privileges; field filters then fall back to scans.
+        pass
+    return "postgresql"
+
+
+def fts5_match_expression(filters: Dict[str, Optional[str]], query: Optional[str]) -> Optional[str]:
+    """Build an FTS5 MATCH string from per-field filters and a free-text query.
+
+    Every word becomes a quoted prefix term, so user input can never inject
+    FTS5 operators. Returns ``None`` when there is nothing to match.
+    """
+    clauses = []
+    for column, value in filters.items():
+        terms = [f'"{token}"*' for token in _tokens(value)]
+        if terms:
+            clauses.append(f"{column} : ({' AND '.join(terms)})")
+    terms = [f'"{token}"*' for token in _tokens(query)]
+    if terms:
+        clauses.append(f"({' AND '.join(terms)})")
+    return " AND ".join(clauses) or None
+
+
+def pg_tsquery(query: Optional[str]) -> Optional[str]:
+    """Build a prefix ``to_tsquery`` string (``stan:* & cs:*``) from user input."""
+    terms = [f"{token}:*" for token in _tokens(query)]
+    return " & ".join(terms) or None
+
+
+def pg_document():
+    return literal_column(PG_DOCUMENT)
@@ -0,0 +1,144 @@
+"""Versioned, compressed SQLite snapshots of generated datasets.
+
+A snapshot is a gzip-compressed copy of a SQLite database (written with
+``VACUUM INTO``) that carries a ``snapshot_manifest`` table describing how it
+was produced: format version, generator seed and scale, schema version and
+row counts. Restoring decompresses it and copies the pages into the target
+with SQLite's backup API, which works the same for ``sqlite:///:memory:``
+(the single connection held by ``StaticPool``) and for file databases, so
+benchmarks and tests can load a million-row dataset in seconds instead of
+regenerating it.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from typing import Any, Dict
+
+from sqlalchemy.engine import Engine
+
+
+# Bump when the file layout or manifest keys change incompatibly.
+SNAPSHOT_FORMAT = 1
+MANIFEST_TABLE = "snapshot_manifest"
+# Fixed timestamps keep snapshots of the same seed byte-for-byte identical.
+NORMALISED_APPLIED_AT = "2000-01-01 00:00:00.000000"
+CHUNK_BYTES = 1 << 20
+
+
+def _require_sqlite(engine: Engine) -> None:
+    if engine.dialect.name != "sqlite":
+        raise ValueError("Snapshots are SQLite databases; the target engine is not SQLite")
+
+
+def write_snapshot(engine: Engine, path: str, info: Dict[str, Any]) -> Dict[str, Any]:
+    """Write the database behind ``engine`` to ``path`` and return its manifest.
+
+    ``info`` (e.g. seed and user count) is stored alongside the format
+    version and per-table row counts.
+    """
+    _require_sqlite(engine)
+    workdir = tempfile.mkdtemp(prefix="snapshot-")
+    copy = os.path.join(workdir, "snapshot.db")
+    try:
+        with engine.connect() as connection:
+            connection.exec_driver_sql("VACUUM INTO ?", (copy,))
+        with sqlite3.connect(copy) as database:
+            tables = [
+                name
+                for (name,) in database.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' "
+                    "AND name NOT LIKE 'sqlite_%' AND name NOT LIKE 'application_search_%' "
+                    "ORDER BY name"
+                )
+            ]
+            manifest = {
+                **info,
+                "format": SNAPSHOT_FORMAT,
+                "sqlite_version": sqlite3.sqlite_version,
+                "row_counts": {
+                    table: database.execute(f'SELECT count(*) FROM "{table}"').fetchone()[0]
+                    for table in tables
+                },
+            }
+            if "schema_migrations" in tables:
+                manifest["schema_version"] = database.execute(
+                    "SELECT coalesce(max(version), 0) FROM schema_migrations"
+                ).fetchone()[0]
+                database.execute(
+                    "UPDATE schema_migrations SET applied_at = ?", (NORMALISED_APPLIED_AT,)
+                )
+            database.execute(f"CREATE TABLE {MANIFEST_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+            database.executemany(
+                f"INSERT INTO {MANIFEST_TABLE} VALUES (?, ?)",
+                [(key, json.dumps(value, sort_keys=True)) for key, value in manifest.items()],
+            )
+        database.close()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        partial = f"{path}.partial"
+        with open(copy, "rb") as source, open(partial, "wb") as raw:
+            # mtime=0 and no file name keep the gzip header reproducible.
+            with gzip.GzipFile(filename="", fileobj=raw, mode="wb", mtime=0) as target:
+                shutil.copyfileobj(source, target, CHUNK_BYTES)
+        os.replace(partial, path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    manifest["sha256"] = file_digest(path)
+    return manifest
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(database: sqlite3.Connection) -> Dict[str, Any]:
+    try:
+        rows = database.execute(f"SELECT key, value FROM {MANIFEST_TABLE}").fetchall()
+    except sqlite3.DatabaseError:
+        raise ValueError("Not a dataset snapshot") from None
+    return {key: json.loads(value) for key, value in rows}
+
+
+def restore_snapshot(path: str, engine: Engine) -> Dict[str, Any]:
+    """Replace the contents of the SQLite database behind ``engine`` with a snapshot.
+
+    Returns the snapshot's manifest. Raises ``ValueError`` for files that are
+    not snapshots or were written in an unsupported format.
+    """
+    _require_sqlite(engine)
+    workdir = tempfile.mkdtemp(prefix="snapshot-")
+    copy = os.path.join(workdir, "snapshot.db")
+    try:
+        try:
+            with gzip.open(path, "rb") as source, open(copy, "wb") as target:
+                shutil.copyfileobj(source, target, CHUNK_BYTES)
+        except (OSError, EOFError) as exc:
+            raise ValueError(f"Cannot read snapshot {path}: {exc}") from None
+        source = sqlite3.connect(copy)
+        try:
+            manifest = read_manifest(source)
+            if manifest.get("format") != SNAPSHOT_FORMAT:
+                raise ValueError(
+                    f"Snapshot format {manifest.get('format')} is not supported "
+                    f"(expected {SNAPSHOT_FORMAT})"
+                )
+            source.execute(f"DROP TABLE {MANIFEST_TABLE}")
+            source.commit()
+            with engine.connect() as connection:
+                source.backup(connection.connection.dbapi_connection)
+        finally:
+            source.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return manifest
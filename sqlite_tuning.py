@@ -0,0 +1,135 @@
+"""SQLite connection tuning and write serialization.
+
+``configure_sqlite`` applies pragmas on every new DBAPI connection (WAL
+journal so readers never block the writer, ``synchronous=NORMAL``, memory
+map, page cache, busy timeout) and can install a ``WriteLock``: each write
+transaction takes it at its first INSERT/UPDATE/DELETE/DDL statement and
+drops it when the connection returns to the pool after the commit or
+rollback. Within a process that is a lock handed to one thread at a time;
+across gunicorn workers it is an ``flock`` on a file next to the database. Writers therefore queue in order instead of spinning in
+SQLite's busy handler until the timeout and failing with "database is
+locked", while readers are never serialized.
+
+pysqlite only opens a transaction right before the first DML statement, so
+holding the lock from that statement until checkin covers the whole window
+in which SQLite itself holds the write lock.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process serialization only.
+    fcntl = None
+
+
+_WRITE_STATEMENT = re.compile(r"^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b", re.I)
+_HOLDS_LOCK = "sqlite_write_lock"
+
+
+class WriteLock:
+    """Exclusive writer slot shared by the threads and processes of one database.
+
+    Re-entrant per thread, so a thread that writes through two connections
+    behaves as it would without the lock; may be released from any thread.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._owner: Optional[int] = None
+        self._depth = 0
+        self._file = None
+        self._pid = os.getpid()
+
+    def acquire(self) -> None:
+        me = threading.get_ident()
+        if self._owner == me:
+            self._depth += 1
+            return
+        self._lock.acquire()
+        try:
+            if self.path and fcntl is not None:
+                if self._pid != os.getpid():
+                    # flock is per open file; a descriptor inherited from a
+                    # preloading parent would be shared with sibling workers.
+                    self._file, self._pid = None, os.getpid()
+                if self._file is None:
+                    self._file = open(self.path, "a+b")
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+        except BaseException:
+            self._lock.release()
+            raise
+        self._owner = me
+        self._depth = 1
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth:
+            return
+        self._owner = None
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._lock.release()
+
+
+def pragmas_from_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Map the ``SQLITE_*`` settings to pragma values, skipping empty ones."""
+    pragmas = {
+        "journal_mode": config.get("SQLITE_JOURNAL_MODE"),
+        "synchronous": config.get("SQLITE_SYNCHRONOUS"),
+        "busy_timeout": config.get("SQLITE_BUSY_TIMEOUT_MS"),
+        "mmap_size": config.get("SQLITE_MMAP_SIZE"),
+        "cache_size": config.get("SQLITE_CACHE_SIZE"),
+    }
+    return {name: value for name, value in pragmas.items() if value not in (None, "")}
+
+
+def configure_sqlite(
+    engine: Engine, pragmas: Dict[str, Any], serialize_writes: bool = False
+) -> Optional[WriteLock]:
+    """Install the pragma and write-lock hooks on a SQLite ``engine``.
+
+    Must run before the engine opens its first connection. Returns the
+    ``WriteLock`` when ``serialize_writes`` is set.
+    """
+    if engine.dialect.name != "sqlite":
+        return None
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    if not serialize_writes:
+        return None
+
+    database = engine.url.database
+    in_memory = database in (None, "", ":memory:")
+    lock = WriteLock(None if in_memory else f"{os.path.abspath(database)}-writer.lock")
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _take_write_lock(conn, cursor, statement, parameters, context, executemany) -> None:
+        if not conn.info.get(_HOLDS_LOCK) and _WRITE_STATEMENT.match(statement):
+            lock.acquire()
+            conn.info[_HOLDS_LOCK] = True
+
+    # Released when the connection goes back to the pool: the engine's
+    # "commit" event fires before the DBAPI commit, and checkin also covers
+    # the rollback the pool issues for connections returned mid-transaction.
+    @event.listens_for(engine, "checkin")
+    def _drop_write_lock(dbapi_connection, connection_record) -> None:
+        if connection_record.info.pop(_HOLDS_LOCK, False):
+            lock.release()
+
+    return lock
@@ -73,7 +73,7 @@
 
   async function loadProfile() {
     try {
-      const data = await apiFetch('/api/profile');
+      const data = await apiFetch('/api/profile?include=profile');
       const profile = data.profile || {};
       Object.entries(profile).forEach(([key, value]) => {
         const field = profileForm.elements[key];
@@ -207,7 +207,11 @@
               (item) => `
                 <div class="mb-2">
                   <div>${item.university} · ${item.program}</div>
-                  <small class="text-muted">Admit rate: ${(item.admit_rate * 100 || 0).toFixed(1)}% · Avg GPA: ${
+                  <small class="text-muted">${
+                    item.admit_probability != null
+                      ? `Your chance: ${(item.admit_probability * 100).toFixed(0)}% · `
+                      : ''
+                  }Admit rate: ${(item.admit_rate * 100 || 0).toFixed(1)}% · Avg GPA: ${
                     item.avg_gpa ?? 'N/A'
                   }</small>
                 </div>